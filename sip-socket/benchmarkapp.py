@@ -0,0 +1,51 @@
+import argparse
+import json
+import sys
+
+from xsocket import benchmark
+from xsocket import log
+
+def main():
+	parser = argparse.ArgumentParser(description='a loopback benchmark of the socket transports (udp/tcp/tls)')
+
+	parser.add_argument('-output', type=str, nargs='?', const='benchmark.json', default='benchmark.json', help='the json file to write the results to')
+	parser.add_argument('-baseline', type=str, nargs='?', const=None, default=None, help='a json results file to compare the results with')
+	parser.add_argument('-port', type=int, nargs='?', const=5070, default=5070, help='the port number of the echo servers')
+	parser.add_argument('-transports', type=str, nargs='?', const='udp,tcp,tls', default='udp,tcp,tls', help='comma separated transports to benchmark')
+	parser.add_argument('-sizes', type=str, nargs='?', const='200,512,1024,2048,4096', default='200,512,1024,2048,4096', help='comma separated payload sizes in bytes')
+	parser.add_argument('-duration', type=float, nargs='?', const=2.0, default=2.0, help='seconds of message exchange per case')
+	parser.add_argument('-connections', type=int, nargs='?', const=200, default=200, help='connections set up per stream case')
+	parser.add_argument('-certfile', type=str, nargs='?', const=None, default=None, help='the certificate of the tls server, tls is skipped without it')
+	parser.add_argument('-keyfile', type=str, nargs='?', const=None, default=None, help='the private key of the tls server')
+	parser.add_argument('-sslversion', type=str, nargs='?', const='tlsv12', default='tlsv12', help='ssl/tls version of the tls client')
+	parser.add_argument('-loglevel', type=str, choices=['debug', 'info', 'warning', 'error'], default='warning', help='minimum level of the logged records')
+
+	args = parser.parse_args()
+
+	transports = args.transports.split(',')
+	for transport in transports:
+		if transport not in benchmark.Benchmark.TRANSPORTS:
+			sys.exit('unknown transport: {0}'.format(transport))
+
+	log.start(args.loglevel)
+
+	bench = benchmark.Benchmark(args.port, [int(size) for size in args.sizes.split(',')], transports)
+	bench.duration = args.duration
+	bench.connections = args.connections
+	bench.certfile = args.certfile
+	bench.keyfile = args.keyfile
+	bench.sslversion = args.sslversion
+
+	results = bench.run()
+
+	log.stop()
+
+	with open(args.output, 'w') as f:
+		json.dump(results, f, indent=4, sort_keys=True)
+
+	if args.baseline is not None:
+		with open(args.baseline) as f:
+			benchmark.compare(json.load(f), results)
+
+if __name__ == '__main__':
+	main()
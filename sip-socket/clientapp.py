@@ -2,55 +2,113 @@ import argparse
 import os
 import sys
 
+from xsocket import loadgen
+from xsocket import log
 from xsocket import udpclient
 from xsocket import tcpclient
+from xsocket import unixdgramclient
+from xsocket import unixstreamclient
 
 NEW_LINE = '\r\n'
 
+LOOP_MESSAGE = '''INVITE sip:13@10.178.20.130 SIP/2.0
+Via: SIP/2.0/TCP 10.178.20.130:20036
+From: "Test 15" <sip:15@10.178.20.130>tag=as58f4201b
+To: <sip:13@10.178.20.130>
+Call-ID: 326371826c80e17e6cf6c29861eb2933@10.178.20.130
+Contact: <sip:15@10.178.20.130>
+CSeq: 102 INVITE
+User-Agent: Asterisk PBX
+Max-Forwards: 70
+Content-Type: application/sdp
+Content-Length: 14
+
+Hello, World!'''
+
 def main():
-	parser = argparse.ArgumentParser(description='a configurable socket client (udp/tcp)')
+	parser = argparse.ArgumentParser(description='a configurable socket client (udp/tcp/unix/unixdgram)')
 
-	parser.add_argument('protocol', type=str, choices=['udp', 'tcp'], help='the protocol type')
-	parser.add_argument('ip', type=str, help='the ip address of the server')
-	parser.add_argument('port', type=int, help='the port number of the server')
+	parser.add_argument('protocol', type=str, choices=['udp', 'tcp', 'unix', 'unixdgram'], help='the protocol type, unix/unixdgram are unix domain stream/datagram sockets')
+	parser.add_argument('ip', type=str, help='the ip address of the server, or its socket path (unix/unixdgram)')
+	parser.add_argument('port', type=int, nargs='?', default=None, help='the port number of the server (udp/tcp)')
 
 	parser.add_argument('-request', type=str, nargs='?', const='Hello, World!', default='Hello, World!', help='the message to be sent to the server periodically')
 	parser.add_argument('-period', type=int, nargs='?', const=-1, default=-1, help='the period of message sending/receiving')
 	parser.add_argument('-timeout', type=int, nargs='?', const=5, default=5, help='timeout duration for connect/send/receive')
 	parser.add_argument('-buffersize', type=int, nargs='?', const=1024, default=1024, help='maximum size of the receiving buffer')
 	parser.add_argument('-sslversion', type=str, nargs='?', const=None, default=None, help='ssl/tls version')
+	parser.add_argument('-loglevel', type=str, choices=['debug', 'info', 'warning', 'error'], default='debug', help='minimum level of the logged records, per message records are debug')
 	parser.add_argument('-trialcount', type=int, nargs='?', const=10, default=10, help='maximum trial count to connect to server')
+	parser.add_argument('-keepalive', type=float, nargs='?', const=30.0, default=0.0, help='period of the double CRLF keep-alive pings in seconds, disabled if 0 (implies --timerwheel)')
+	parser.add_argument('-capture', type=str, nargs='?', const=None, default=None, help='file to append the sent and received messages to (see replayapp)')
 
 	parser.add_argument('--sendloop', dest='sendloop', action='store_true', default=False, help='enable message sending loop')
 	parser.add_argument('--recvloop', dest='recvloop', action='store_true', default=False, help='enable message receiving loop')
 	parser.add_argument('--sendrecvloop', dest='sendrecvloop', action='store_true', default=False, help='enable message sending/receiving loop')
+	parser.add_argument('--framing', dest='framing', action='store_true', default=False, help='receive exactly one complete sip message at a time (tcp/unix)')
+	parser.add_argument('--timerwheel', dest='timerwheel', action='store_true', default=False, help='run the send/sendrecv loops as timers of a shared timer wheel instead of threads')
+
+	parser.add_argument('--load', dest='load', action='store_true', default=False, help='generate load with concurrent virtual clients instead of a single client')
+	parser.add_argument('-clients', type=int, nargs='?', const=1, default=1, help='number of virtual clients in load mode')
+	parser.add_argument('-rate', type=float, nargs='?', const=1.0, default=1.0, help='target messages per second over all virtual clients in load mode')
+	parser.add_argument('-duration', type=float, nargs='?', const=10.0, default=10.0, help='duration of the load in seconds')
+	parser.add_argument('-reportperiod', type=float, nargs='?', const=1.0, default=1.0, help='period of the interim load reports in seconds')
 
 	args = parser.parse_args()
 
+	log.start(args.loglevel)
+
 	if args.protocol == 'udp':
 		c = udpclient
 	elif args.protocol == 'tcp':
 		c = tcpclient
+	elif args.protocol == 'unix':
+		c = unixstreamclient
+	elif args.protocol == 'unixdgram':
+		c = unixdgramclient
 	else:
 		sys.exit('unknown protocol: {0}'.format(args.protocol))
 
-	client = c.Client(args.ip, args.port, args.timeout, args.sendloop, args.recvloop, args.sendrecvloop, args.sslversion, args.trialcount)
+	local = args.protocol in ('unix', 'unixdgram')
 
-	client.loop_message = '''INVITE sip:13@10.178.20.130 SIP/2.0
-Via: SIP/2.0/TCP 10.178.20.130:20036
-From: "Test 15" <sip:15@10.178.20.130>tag=as58f4201b
-To: <sip:13@10.178.20.130>
-Call-ID: 326371826c80e17e6cf6c29861eb2933@10.178.20.130
-Contact: <sip:15@10.178.20.130>
-CSeq: 102 INVITE
-User-Agent: Asterisk PBX
-Max-Forwards: 70
-Content-Type: application/sdp
-Content-Length: 14
+	if not local and args.port is None:
+		sys.exit('the port number is required by {0}'.format(args.protocol))
 
-Hello, World!'''
+	if local and args.load:
+		sys.exit('load mode is supported only by udp/tcp')
+
+	if args.load:
+		generator = loadgen.LoadGenerator(args.protocol, args.ip, args.port, args.timeout, LOOP_MESSAGE, args.buffersize)
+		generator.clients = args.clients
+		generator.rate = args.rate
+		generator.duration = args.duration
+		generator.report_period = args.reportperiod
+		generator.run()
+		log.stop()
+		return
+
+	if local:
+		client = c.Client(args.ip, args.timeout, args.sendloop, args.recvloop, args.sendrecvloop, args.sslversion, args.trialcount)
+	else:
+		client = c.Client(args.ip, args.port, args.timeout, args.sendloop, args.recvloop, args.sendrecvloop, args.sslversion, args.trialcount)
+
+	client.loop_buffersize = args.buffersize
+
+	if args.framing:
+		client.use_framing()
+
+	if args.capture is not None:
+		client.use_capture(args.capture)
+
+	if args.timerwheel or args.keepalive > 0:
+		client.use_timer_wheel()
+		client.keepalive_period = args.keepalive or None
+
+	client.loop_message = LOOP_MESSAGE
 
 	client.run()
 
+	log.stop()
+
 if __name__ == '__main__':
 	main()
@@ -0,0 +1,42 @@
+import argparse
+import os
+import sys
+
+from xsocket import capture
+from xsocket import log
+from xsocket import replay
+
+def main():
+	parser = argparse.ArgumentParser(description='replay a traffic capture against a server (udp/tcp)')
+
+	parser.add_argument('path', type=str, help='the capture file')
+	parser.add_argument('protocol', type=str, choices=['udp', 'tcp'], help='the protocol type')
+	parser.add_argument('ip', type=str, help='the ip address of the server')
+	parser.add_argument('port', type=int, help='the port number of the server')
+
+	parser.add_argument('-direction', type=str, choices=sorted(capture.DIRECTIONS), default='received', help='the captured direction to replay, received for a server capture, sent for a client capture')
+	parser.add_argument('-speed', type=float, nargs='?', const=1.0, default=1.0, help='time scale of the replay, e.g. 10 replays ten times faster than captured')
+	parser.add_argument('-repeat', type=int, nargs='?', const=1, default=1, help='number of passes over the capture')
+	parser.add_argument('-timeout', type=int, nargs='?', const=5, default=5, help='timeout duration for connect/send, and for the responses after the last send')
+	parser.add_argument('-buffersize', type=int, nargs='?', const=65536, default=65536, help='maximum size of the receiving buffer')
+	parser.add_argument('-loglevel', type=str, choices=['debug', 'info', 'warning', 'error'], default='warning', help='minimum level of the logged records')
+
+	parser.add_argument('--max', dest='max', action='store_true', default=False, help='send back to back at the maximum speed, ignoring the captured timing')
+
+	args = parser.parse_args()
+
+	if args.speed <= 0 and not args.max:
+		sys.exit('speed must be positive, use --max for the maximum speed')
+
+	log.start(args.loglevel)
+
+	replayer = replay.Replayer(args.path, args.protocol, args.ip, args.port, args.timeout, args.buffersize)
+	replayer.direction = capture.DIRECTIONS[args.direction]
+	replayer.speed = 0 if args.max else args.speed
+	replayer.repeat = args.repeat
+	replayer.run()
+
+	log.stop()
+
+if __name__ == '__main__':
+	main()
@@ -2,19 +2,45 @@ import argparse
 import os
 import sys
 
+from xsocket import dispatcher
+from xsocket import log
+from xsocket import prefork
+from xsocket import stats
 from xsocket import udpserver
 from xsocket import tcpserver
+from xsocket import unixdgramserver
+from xsocket import unixstreamserver
 
 def main():
-	parser = argparse.ArgumentParser(description='a configurable socket client (udp/tcp)')
+	parser = argparse.ArgumentParser(description='a configurable socket client (udp/tcp/unix/unixdgram)')
 
-	parser.add_argument('protocol', type=str, choices=['udp', 'tcp'], help='the protocol type')
-	parser.add_argument('port', type=int, help='the port number of the server')
+	parser.add_argument('protocol', type=str, choices=['udp', 'tcp', 'unix', 'unixdgram'], help='the protocol type, unix/unixdgram are unix domain stream/datagram sockets')
+	parser.add_argument('port', type=str, help='the port number of the server, or its socket path (unix/unixdgram)')
 
 	parser.add_argument('-buffersize', type=int, nargs='?', const=1024, default=1024, help='maximum size of the receiving buffer')
+	parser.add_argument('-loglevel', type=str, choices=['debug', 'info', 'warning', 'error'], default='debug', help='minimum level of the logged records, per message records are debug')
+	parser.add_argument('-workers', '--workers', type=int, nargs='?', const=1, default=0, help='number of worker processes sharing the port (SO_REUSEPORT)')
+	parser.add_argument('-highwatermark', type=int, nargs='?', const=65536, default=65536, help='queued bytes per session pausing the writers (with --writequeue)')
+	parser.add_argument('-lowwatermark', type=int, nargs='?', const=16384, default=16384, help='queued bytes per session resuming the writers (with --writequeue)')
+	parser.add_argument('-keepalive', type=float, nargs='?', const=30.0, default=0.0, help='period of the double CRLF keep-alive pings per session in seconds, disabled if 0 (implies --timerwheel)')
+	parser.add_argument('-recvtimeout', type=float, nargs='?', const=300.0, default=0.0, help='drop sessions receiving nothing for this many seconds, disabled if 0 (implies --timerwheel)')
+	parser.add_argument('-stats', type=float, nargs='?', const=5.0, default=0.0, help='period of the stats reports in seconds, disabled if 0 (single process)')
+	parser.add_argument('-statsformat', type=str, choices=['json', 'prometheus'], default='json', help='format of the stats reports')
+	parser.add_argument('-statsfile', type=str, nargs='?', const=None, default=None, help='file to write the stats reports to, stdout if not given')
+	parser.add_argument('-capture', type=str, nargs='?', const=None, default=None, help='file to append the sent and received messages to (see replayapp), suffixed by the pid of every worker')
+	parser.add_argument('-bufferpool', type=int, nargs='?', const=256, default=0, help='number of idle receive buffers recycled across sessions, disabled if 0 (ignored with --dispatch)')
+	parser.add_argument('-sessionrate', type=float, nargs='?', const=100.0, default=0.0, help='received messages per second per session, beyond which messages are dropped, disabled if 0')
+	parser.add_argument('-sessionburst', type=float, nargs='?', const=0.0, default=0.0, help='burst of received messages per session above the rate, the rate if 0')
+	parser.add_argument('-sourcerate', type=float, nargs='?', const=100.0, default=0.0, help='connections (udp: datagrams) per second per source address, beyond which they are rejected, disabled if 0')
+	parser.add_argument('-sourceburst', type=float, nargs='?', const=0.0, default=0.0, help='burst of connections (udp: datagrams) per source address above the rate, the rate if 0')
 
 	parser.add_argument('--sendloop', dest='sendloop', action='store_true', default=False, help='enable message sending loop')
 	parser.add_argument('--recvloop', dest='recvloop', action='store_true', default=False, help='enable message receiving loop')
+	parser.add_argument('--select', dest='select', action='store_true', default=False, help='serve all sessions from a single-threaded event loop')
+	parser.add_argument('--framing', dest='framing', action='store_true', default=False, help='deliver exactly one complete sip message per receive (tcp/unix)')
+	parser.add_argument('--dispatch', dest='dispatch', action='store_true', default=False, help='deliver events to observers on a background thread')
+	parser.add_argument('--timerwheel', dest='timerwheel', action='store_true', default=False, help='run the session loops as timers of a shared timer wheel instead of threads')
+	parser.add_argument('--writequeue', dest='writequeue', action='store_true', default=False, help='queue outbound messages per session instead of sending them synchronously (tcp/unix)')
 
 	args = parser.parse_args()
 
@@ -22,11 +48,85 @@ def main():
 		s = udpserver
 	elif args.protocol == 'tcp':
 		s = tcpserver
+	elif args.protocol == 'unix':
+		s = unixstreamserver
+	elif args.protocol == 'unixdgram':
+		s = unixdgramserver
 	else:
 		sys.exit('unknown protocol: {0}'.format(args.protocol))
 
-	server = s.Server(args.port, args.buffersize, args.sendloop, args.recvloop)
-	server.run()
+	if args.protocol in ('unix', 'unixdgram'):
+		if args.workers > 0:
+			sys.exit('worker processes are supported only by udp/tcp')
+		address = args.port
+	elif args.port.isdigit():
+		address = int(args.port)
+	else:
+		sys.exit('invalid port: {0}'.format(args.port))
+
+	if args.writequeue and args.protocol not in ('tcp', 'unix'):
+		sys.exit('write queues are supported only by tcp/unix')
+
+	def create_server():
+		# once per (worker) process, threads do not survive a fork
+		log.start(args.loglevel)
+
+		server = s.Server(address, args.buffersize, args.sendloop, args.recvloop)
+
+		if args.select:
+			server.use_eventloop()
+
+		if args.framing:
+			server.use_framing()
+
+		if args.writequeue:
+			server.use_write_queue(args.highwatermark, args.lowwatermark)
+
+		if args.sessionrate > 0:
+			server.use_session_limit(args.sessionrate, args.sessionburst or None)
+
+		if args.sourcerate > 0:
+			server.use_source_limit(args.sourcerate, args.sourceburst or None)
+
+		if args.bufferpool > 0:
+			server.use_buffer_pool(args.bufferpool)
+
+		if args.capture is not None:
+			if args.workers > 0:
+				server.use_capture('{path}.{pid}'.format(path=args.capture, pid=os.getpid()))
+			else:
+				server.use_capture(args.capture)
+
+		if args.timerwheel or args.keepalive > 0 or args.recvtimeout > 0:
+			server.use_timer_wheel()
+			server.keepalive_period = args.keepalive or None
+			server.recv_timeout = args.recvtimeout or None
+
+		if args.dispatch:
+			event_dispatcher = dispatcher.Dispatcher()
+			event_dispatcher.start()
+			server.use_dispatcher(event_dispatcher)
+
+		return server
+
+	if args.workers > 0:
+		supervisor = prefork.Supervisor(create_server, args.workers)
+		supervisor.run()
+	else:
+		server = create_server()
+
+		reporter = None
+		if args.stats > 0:
+			reporter = stats.Reporter(server.stats, args.stats, args.statsformat, args.statsfile)
+			reporter.start()
+
+		server.run()
+
+		if reporter is not None:
+			reporter.stop()
+			reporter.report()
+
+		log.stop()
 
 if __name__ == '__main__':
 	main()
@@ -0,0 +1,113 @@
+import argparse
+import gc
+import sys
+import types
+
+from xsip import sipdecoder
+from xsip import siprequest
+from xsip import sipresponse
+
+MESSAGE = '\r\n'.join([
+    'INVITE sip:13@10.178.20.130 SIP/2.0',
+    'Via: SIP/2.0/TCP 10.178.20.130:20036;branch=z9hG4bK776asdhds',
+    'From: "Test 15" <sip:15@10.178.20.130>;tag=as58f4201b',
+    'To: <sip:13@10.178.20.130>',
+    'Call-ID: 326371826c80e17e6cf6c29861eb2933@10.178.20.130',
+    'Contact: <sip:15@10.178.20.130>',
+    'CSeq: 102 INVITE',
+    'User-Agent: Asterisk PBX',
+    'Max-Forwards: 70',
+    'Content-Type: application/sdp',
+    'Content-Length: 14',
+    '',
+    'Hello, World!',
+])
+
+# shared by all messages, not counted
+SHARED_TYPES = (type, types.ModuleType, types.CodeType)
+
+def deep_size(objects):
+    """return the size of the objects and everything they reference,
+    except for classes, modules, code and module globals
+    """
+
+    seen = set(id(vars(module)) for module in list(sys.modules.values()) if module is not None)
+
+    size = 0
+    stack = list(objects)
+
+    while stack:
+        obj = stack.pop()
+
+        if id(obj) in seen or isinstance(obj, SHARED_TYPES):
+            continue
+
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        stack.extend(gc.get_referents(obj))
+
+    return size
+
+def read(message):
+    for header in message.headers:
+        header.value
+    message.content
+    return message
+
+def build(message):
+    if message.message_type == message.MESSAGE_TYPE_REQUEST:
+        built = siprequest.SipRequest()
+        built.decode_intro(message.method, message.uri, message.sip_version)
+    else:
+        built = sipresponse.SipResponse()
+        built.decode_intro(message.sip_version, message.response_code, message.reason_phrase)
+
+    for header in message.headers:
+        built.add_header(header.name, header.value)
+
+    built.set_content(message.content)
+
+    return built
+
+VARIANTS = [
+    ('decoded', 'decoded, nothing read', lambda data: sipdecoder.decode(data)),
+    ('read', 'decoded, all headers and the content read', lambda data: read(sipdecoder.decode(data))),
+    ('dropped', 'decoded without keeping the raw message', lambda data: read(sipdecoder.decode(data, keep_raw=False))),
+    ('built', 'built by the setters', lambda data: build(read(sipdecoder.decode(data, keep_raw=False)))),
+]
+
+def main():
+    parser = argparse.ArgumentParser(description='measure the memory held per decoded sip message')
+
+    parser.add_argument('filepath', type=str, nargs='?', default=None, help='path to the file containing sip message, a sample INVITE if not given')
+
+    parser.add_argument('-count', type=int, nargs='?', const=1000, default=1000, help='number of messages kept alive per variant')
+
+    args = parser.parse_args()
+
+    if args.filepath is None:
+        content = MESSAGE
+    else:
+        with open(args.filepath) as file:
+            content = file.read()
+
+    content = bytearray(content.encode('utf-8') if not isinstance(content, bytes) else content)
+
+    if sipdecoder.decode(bytes(content)) is None:
+        sys.exit('invalid sip content')
+
+    print('{count} messages of {size} bytes'.format(count=args.count, size=len(content)))
+
+    for name, description, function in VARIANTS:
+        # a received copy per message, as read from a socket
+        messages = [function(bytes(content)) for i in range(args.count)]
+
+        size = deep_size(messages) - sys.getsizeof(messages)
+
+        print('{name:>8}: {size:>6} bytes per message ({description})'.format(
+            name=name,
+            size=size // args.count,
+            description=description))
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,107 @@
 import argparse
+import time
 
 from xsip import sipdecoder
+from xsip import sipstream
+
+def decode_stream(filepath, chunksize):
+    decoder = sipstream.SipStreamDecoder()
+
+    with open(filepath, 'rb') as file:
+        while True:
+            chunk = file.read(chunksize)
+            if not chunk:
+                break
+
+            for message in decoder.feed(chunk):
+                message.describe()
+
+    if decoder.errors > 0 or decoder.pending() > 0:
+        print('{errors} invalid sip messages, {discarded} bytes discarded, {pending} bytes incomplete'.format(
+            errors=decoder.errors,
+            discarded=decoder.discarded,
+            pending=decoder.pending()))
+
+def route(message):
+    # what a proxy reads to match a transaction
+    message.get_call_id()
+    message.headers.get_value('CSeq')
+    message.headers.get_value('Via')
+
+def read_all(message):
+    for header in message.headers:
+        header.name
+        header.value
+
+CASES = [
+    ('decode', 'decoded, nothing read', None),
+    ('route', 'Call-ID, CSeq and Via read', route),
+    ('all', 'every header read', read_all),
+]
+
+DECODERS = [
+    ('parser', 'text', sipdecoder.decode),
+    ('parser', 'bytes', sipdecoder.decode),
+    ('lines', 'text', sipdecoder.decode_lines),
+]
+
+def benchmark(content, count, repeat=5):
+    data = {
+        'text'  : content,
+        'bytes' : content.encode('utf-8') if not isinstance(content, bytes) else content,
+    }
+
+    for case, description, read in CASES:
+        for decoder, kind, decode in DECODERS:
+            message = data[kind]
+
+            # the best run, the others were disturbed
+            best = None
+            for i in range(repeat):
+                start = time.time()
+                if read is None:
+                    for j in range(count):
+                        decode(message)
+                else:
+                    for j in range(count):
+                        read(decode(message))
+                elapsed = time.time() - start
+                if best is None or elapsed < best:
+                    best = elapsed
+
+            print('{case:>6} {decoder:>6} {kind:>5}: {rate:>8.0f} messages/s ({description})'.format(
+                case=case,
+                decoder=decoder,
+                kind=kind,
+                rate=count / best if best > 0 else 0,
+                description=description))
 
 def main():
     parser = argparse.ArgumentParser(description='decode sip message read from a given file')
 
     parser.add_argument('filepath', type=str, help='path to the file containing sip message')
 
+    parser.add_argument('-benchmark', type=int, nargs='?', const=20000, default=0, help='time this many decodes of the message per case instead of describing it, disabled if 0')
+
+    parser.add_argument('-chunksize', type=int, nargs='?', const=4096, default=4096, help='size of the chunks read from the file (with --stream)')
+
+    parser.add_argument('--stream', dest='stream', action='store_true', default=False, help='decode every message of a file holding a stream of messages, e.g. a tcp dump')
+
     args = parser.parse_args()
 
+    if args.stream:
+        decode_stream(args.filepath, args.chunksize)
+        return
+
     with open(args.filepath) as file:
         content = file.read()
 
     message = sipdecoder.decode(content)
 
+    if message is not None and args.benchmark > 0:
+        benchmark(content, args.benchmark)
+        return
+
     if message is None:
         print('invalid sip content')
     else:
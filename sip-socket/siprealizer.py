@@ -1,3 +1,5 @@
+from xsocket import asynctcpclient
+from xsocket import asyncudpclient
 from xsocket import udpclient
 from xsocket import tcpclient
 from xsocket import tcpserver
@@ -10,10 +12,13 @@ from xsip import sipscenario
 
 class SipRealizer(object):
 
-    def __init__(self):
+    def __init__(self, pool=None):
         self.scenario = None
         self.agent    = None
 
+        # optional xsocket.pool.ConnectionPool reused by tcp clients
+        self.pool     = pool
+
     def init_scenario(self, filepath):
         self.scenario = sipscenario.Scenario()
         self.scenario.parsef(filepath)
@@ -58,6 +63,18 @@ class SipRealizer(object):
         args.append(False) # sendloop
         args.append(False) # recvloop
 
+        if self.scenario.agent.type == sipscenario.AGENT_CLIENT:
+            args.append(False) # sendrecvloop
+            args.append(None)  # sslversion
+            args.append(1)     # maximum_trial_count
+
+        if self.pool is not None and agent is tcpclient.Client:
+            self.agent = self.pool.acquire(
+                self.scenario.agent.ip,
+                self.scenario.agent.port,
+                self.scenario.agent.timeout)
+            return
+
         self.agent = agent(*args)
 
         if self.scenario.agent.type == sipscenario.AGENT_CLIENT:
@@ -79,8 +96,7 @@ class SipRealizer(object):
 
         if message.action == sipscenario.ACTION_SEND:
             print('sending...')
-            content = sip_message.encode()
-            self.agent.send(content)
+            self.agent.send(sip_message.encode_buffers())
             print('sent')
         elif message.action == sipscenario.ACTION_RECV:
             print('receiving...')
@@ -89,8 +105,7 @@ class SipRealizer(object):
             print('received')
 
             print('checking...')
-            # TODO
-            # compare sip_message and sip_message2
+            message.check(sip_message2)
             print('checked')
 
     def handle_messages(self):
@@ -100,4 +115,64 @@ class SipRealizer(object):
     def realize(self, filepath):
         self.init_scenario(filepath)
         self.init_agent()
-        self.handle_messages()
+
+        if self.pool is None or not isinstance(self.agent, tcpclient.Client):
+            self.handle_messages()
+            return
+
+        try:
+            self.handle_messages()
+        except Exception:
+            self.pool.discard(self.agent)
+            raise
+        else:
+            self.pool.release(self.agent)
+
+    def init_async_agent(self, loop):
+        # server mode has no direct send/recv, see handle_message
+        if self.scenario.agent.type != sipscenario.AGENT_CLIENT:
+            raise Exception('asynchronous realization supports only client agents')
+
+        if self.scenario.agent.protocol == sipscenario.PROTOCOL_UDP:
+            agent = asyncudpclient.AsyncClient
+
+        elif self.scenario.agent.protocol == sipscenario.PROTOCOL_TCP:
+            agent = asynctcpclient.AsyncClient
+
+        else:
+            raise Exception('unknown protocol: {protocol}'.format(protocol=self.scenario.agent.protocol))
+
+        self.agent = agent(
+            loop,
+            self.scenario.agent.ip,
+            self.scenario.agent.port,
+            self.scenario.agent.timeout,
+            None, # sslversion
+            1)    # maximum_trial_count
+
+        yield self.agent.connect()
+
+    def handle_message_async(self, message):
+        sip_message = message.build()
+
+        if message.action == sipscenario.ACTION_SEND:
+            content = sip_message.encode()
+            yield self.agent.send(content)
+        elif message.action == sipscenario.ACTION_RECV:
+            content = yield self.agent.recv(self.scenario.agent.buffersize)
+            sip_message2 = sipdecoder.decode(content)
+            message.check(sip_message2)
+
+    def realize_async(self, filepath, loop):
+        """coroutine realizing the scenario on the given event loop,
+        so that many dialogs can be driven from a single thread
+        """
+
+        self.init_scenario(filepath)
+        yield self.init_async_agent(loop)
+
+        try:
+            for message in self.scenario.messages:
+                yield self.handle_message_async(message)
+        finally:
+            yield self.agent.disconnect()
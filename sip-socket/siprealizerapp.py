@@ -2,15 +2,37 @@ import argparse
 
 import siprealizer
 
+from xsocket import eventloop
+from xsocket import pool
+
 def main():
     parser = argparse.ArgumentParser(description='realizes a given scenario file')
 
     parser.add_argument('filepath', type=str, help='path to the scenario file')
 
+    parser.add_argument('-dialogs', type=int, nargs='?', const=1, default=None, help='number of concurrent dialogs to drive from a single event loop')
+    parser.add_argument('-repeat', type=int, nargs='?', const=1, default=1, help='number of times to realize the scenario, reusing tcp connections')
+
     args = parser.parse_args()
 
-    realizer = siprealizer.SipRealizer()
-    realizer.realize(filepath)
+    if args.dialogs is None:
+        connection_pool = pool.ConnectionPool()
+        for i in range(args.repeat):
+            realizer = siprealizer.SipRealizer(connection_pool)
+            realizer.realize(args.filepath)
+        connection_pool.close()
+        return
+
+    loop = eventloop.EventLoop()
+    tasks = []
+    for i in range(args.dialogs):
+        realizer = siprealizer.SipRealizer()
+        tasks.append(loop.spawn(realizer.realize_async(args.filepath, loop)))
+
+    loop.run_until(tasks)
+
+    failures = [task for task in tasks if task.error is not None]
+    print('{count} dialogs realized, {failed} failed'.format(count=len(tasks), failed=len(failures)))
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,50 @@
+import os
+import socket
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'xsocket'))
+
+import asynctcpserver
+import asyncudpserver
+import eventloop
+
+class Observer(object):
+
+    def __init__(self):
+        self.events = []
+
+    def did_stop(self, server):
+        self.events.append(server.DID_STOP)
+
+    def did_run(self, server):
+        self.events.append(server.DID_RUN)
+
+class AsyncServerTest(unittest.TestCase):
+
+    def run_and_stop(self, module):
+        loop = eventloop.EventLoop()
+        server = module.AsyncServer(loop, 0, 1024)
+
+        observer = Observer()
+        server.register(observer)
+
+        task = server.run()
+        loop.call_later(0.05, server.stop)
+        loop.run_until([task])
+
+        self.assertTrue(task.done)
+        self.assertIsNone(task.error)
+        self.assertEqual(observer.events, [server.DID_STOP, server.DID_RUN])
+        self.assertEqual(loop.handlers, {})
+
+        loop.close()
+
+    def test_tcp_run_completes_when_stopped(self):
+        self.run_and_stop(asynctcpserver)
+
+    def test_udp_run_completes_when_stopped(self):
+        self.run_and_stop(asyncudpserver)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'xsocket'))
+
+import eventloop
+
+class EventLoopTest(unittest.TestCase):
+
+    def test_call_soon_threadsafe_wakes_the_loop(self):
+        loop = eventloop.EventLoop()
+        loop.poll_timeout = 10
+        calls = []
+
+        def call():
+            calls.append(threading.current_thread())
+            loop.stop()
+
+        thread = threading.Thread(target=lambda: loop.call_soon_threadsafe(call))
+        loop.call_later(0.05, thread.start)
+
+        start = time.time()
+        loop.run()
+        elapsed = time.time() - start
+
+        thread.join()
+        loop.close()
+
+        self.assertEqual(calls, [threading.current_thread()])
+        self.assertLess(elapsed, 5)
+        self.assertEqual(loop.handlers, {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'xsocket'))
+
+import notifier
+
+class Observer(object):
+
+    def __init__(self):
+        self.calls = []
+
+    def on_event(self, source, value):
+        self.calls.append(value)
+
+class NotifierTest(unittest.TestCase):
+
+    def test_resolving_replaces_the_handler_table(self):
+        source = notifier.Notifier()
+        observer = Observer()
+        source.register(observer)
+
+        table = source.handlers
+        source.notify_all('on_event', 1)
+
+        self.assertIsNot(source.handlers, table)
+        self.assertNotIn('on_event', table)
+        self.assertEqual(observer.calls, [1])
+
+        # resolved once
+        table = source.handlers
+        source.notify_all('on_event', 2)
+        self.assertIs(source.handlers, table)
+        self.assertEqual(observer.calls, [1, 2])
+
+if __name__ == '__main__':
+    unittest.main()
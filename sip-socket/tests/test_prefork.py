@@ -0,0 +1,92 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'xsocket'))
+
+import capture
+import prefork
+
+def failing_factory():
+    # e.g. the port is taken
+    os._exit(1)
+
+class CountingServer(object):
+
+    def __init__(self):
+        self.reuseport = False
+        self.capture   = None
+
+    def stats(self):
+        return {'accepted': 3}
+
+    def run(self):
+        time.sleep(60)
+
+class SupervisorTest(unittest.TestCase):
+
+    def test_failing_workers_back_off_and_are_given_up(self):
+        supervisor = prefork.Supervisor(failing_factory, 2)
+        supervisor.backoff = 0.05
+        supervisor.maximum_failures = 4
+
+        start = time.time()
+        supervisor.run()
+        elapsed = time.time() - start
+
+        # 3 restarts per worker, after 0.05 + 0.1 + 0.2 seconds
+        self.assertEqual(supervisor.restarts, 6)
+        self.assertEqual(supervisor.failures, {0: 4, 1: 4})
+        self.assertGreaterEqual(elapsed, 0.35)
+        self.assertEqual(supervisor.processes, {})
+
+    def test_terminated_workers_send_a_final_report(self):
+        supervisor = prefork.Supervisor(CountingServer, 2)
+        supervisor.report_period = 60
+
+        supervisor.running = True
+        supervisor.spawn(0)
+        supervisor.spawn(1)
+
+        # the workers install their SIGTERM handler first
+        time.sleep(0.2)
+        supervisor.stop()
+
+        self.assertEqual(supervisor.totals()['accepted'], 6)
+        self.assertEqual(supervisor.processes, {})
+
+    def test_terminated_workers_flush_their_capture(self):
+        directory = tempfile.mkdtemp()
+
+        class CapturingServer(CountingServer):
+
+            def run(self):
+                self.capture = capture.Capture(capture.Writer(os.path.join(directory, str(os.getpid()))))
+                self.capture.writer.write(capture.RECEIVED, ('127.0.0.1', 5060), b'OPTIONS')
+                time.sleep(60)
+
+        supervisor = prefork.Supervisor(CapturingServer, 2)
+        supervisor.report_period = 60
+
+        supervisor.running = True
+        supervisor.spawn(0)
+        supervisor.spawn(1)
+
+        time.sleep(0.2)
+        supervisor.stop()
+
+        paths = [os.path.join(directory, name) for name in os.listdir(directory)]
+        self.assertEqual(len(paths), 2)
+
+        for path in paths:
+            reader = capture.Reader(path)
+            self.assertEqual([record[1] for record in reader.records()], [capture.RECEIVED])
+            reader.close()
+            os.remove(path)
+
+        os.rmdir(directory)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'xsocket'))
+
+import sessiontable
+
+class SessionTableTest(unittest.TestCase):
+
+    def test_idle_sessions_expire_on_activity_of_others(self):
+        evicted = []
+        table = sessiontable.SessionTable(None, 0.05, evicted.append)
+        table.expire_period = 0
+
+        table['idle'] = 'idle session'
+        table['busy'] = 'busy session'
+
+        time.sleep(0.1)
+        table.touch('busy')
+
+        # the stable peer is expired too, it was idle as long
+        self.assertEqual(evicted, ['idle session', 'busy session'])
+
+        table['busy'] = 'busy session'
+        for i in range(3):
+            time.sleep(0.02)
+            self.assertEqual(table.touch('busy'), 'busy session')
+        self.assertEqual(table.keys(), ['busy'])
+
+    def test_expiry_on_activity_is_rate_limited(self):
+        evicted = []
+        table = sessiontable.SessionTable(None, 0.05, evicted.append)
+        table.expire_period = 10
+
+        table['idle'] = 'idle session'
+        table['busy'] = 'busy session'
+
+        time.sleep(0.1)
+        table.touch('busy')
+        self.assertEqual(evicted, [])
+
+        table.expire()
+        self.assertEqual(evicted, ['idle session'])
+
+    def test_size_bound(self):
+        evicted = []
+        table = sessiontable.SessionTable(2, None, evicted.append)
+
+        for address in ('a', 'b', 'c'):
+            table[address] = address
+
+        self.assertEqual(evicted, ['a'])
+        self.assertEqual(table.keys(), ['b', 'c'])
+
+if __name__ == '__main__':
+    unittest.main()
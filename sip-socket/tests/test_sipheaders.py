@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'xsip'))
+
+import sipheaders
+
+class SipHeadersTest(unittest.TestCase):
+
+    def test_key(self):
+        self.assertEqual(sipheaders.key('Call-ID'), 'call-id')
+        self.assertEqual(sipheaders.key(' i '), 'call-id')
+        self.assertEqual(sipheaders.key(u'Content-Length'), 'content-length')
+        self.assertEqual(sipheaders.key(u'X-Ünicode'), u'x-ünicode')
+        self.assertEqual(sipheaders.canonical('v'), 'Via')
+
+    def test_lookup_by_any_spelling(self):
+        headers = sipheaders.SipHeaders()
+        headers.add('Via', 'SIP/2.0/UDP a')
+        headers.add(u'v', u'SIP/2.0/UDP b')
+        headers.add('From', '<sip:a@b>')
+
+        self.assertEqual(headers.get_value(u'VIA'), 'SIP/2.0/UDP a')
+        self.assertEqual([header.value for header in headers.get_all('via')], ['SIP/2.0/UDP a', 'SIP/2.0/UDP b'])
+        self.assertIn(u'f', headers)
+
+        headers.remove('Via')
+        self.assertEqual(len(headers), 1)
+        self.assertIsNone(headers.get('v'))
+
+    def test_malformed_value_parsed_once(self):
+        calls = []
+
+        def parser(value):
+            calls.append(value)
+            return None
+
+        header = sipheaders.SipHeaders().add('CSeq', 'malformed')
+        self.assertIsNone(header.get_parsed(parser))
+        self.assertIsNone(header.get_parsed(parser))
+        self.assertEqual(calls, ['malformed'])
+
+        header.set_value('102 INVITE')
+        self.assertIsNone(header.get_parsed(parser))
+        self.assertEqual(calls, ['malformed', '102 INVITE'])
+
+if __name__ == '__main__':
+    unittest.main()
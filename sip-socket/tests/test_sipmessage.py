@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'xsip'))
+
+import siprequest
+
+def join(buffers):
+    return b''.join(bytes(buffer) if not isinstance(buffer, memoryview) else buffer.tobytes() for buffer in buffers)
+
+class EncodeBuffersTest(unittest.TestCase):
+
+    def build(self, content):
+        message = siprequest.SipRequest()
+        message.decode_intro('MESSAGE', 'sip:a@b', 'SIP/2.0')
+        message.add_header('Content-Length', str(len(content)))
+        message.set_content(content)
+        return message
+
+    def test_text_content(self):
+        message = self.build(u'Hello, Wörld!')
+        buffers = message.encode_buffers()
+        self.assertTrue(join(buffers).endswith(u'\r\n\r\nHello, Wörld!\r\n'.encode('utf-8')))
+
+    def test_bytes_content_is_referenced(self):
+        content = bytearray(b'Hello, World!')
+        message = self.build(content)
+        buffers = message.encode_buffers()
+        self.assertEqual(join(buffers), join([message.encode_head_bytes(), content, b'\r\n']))
+
+    def test_bytes_content_is_not_copied(self):
+        content = bytearray(b'Hello, World!')
+        buffers = self.build(content).encode_buffers()
+        content[0:1] = b'J'
+        self.assertEqual(buffers[1].tobytes(), b'Jello, World!')
+
+    def test_no_content(self):
+        message = self.build('')
+        self.assertEqual(len(message.encode_buffers()), 2)
+
+if __name__ == '__main__':
+    unittest.main()
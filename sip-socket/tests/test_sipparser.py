@@ -0,0 +1,133 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'xsip'))
+
+import sipparser
+
+REQUEST = b'\r\n'.join([
+    b'INVITE sip:13@10.178.20.130 SIP/2.0',
+    b'Via: SIP/2.0/TCP 10.178.20.130:20036;branch=z9hG4bK776asdhds',
+    b'From: "Test 15" <sip:15@10.178.20.130>;tag=as58f4201b',
+    b'To: <sip:13@10.178.20.130>',
+    b'Call-ID: 326371826c80e17e6cf6c29861eb2933@10.178.20.130',
+    b'CSeq: 102 INVITE',
+    b'Subject: first line',
+    b'  second line',
+    b'Content-Length: 13',
+    b'',
+    b'Hello, World!',
+    b'',
+])
+
+RESPONSE = b'\r\n'.join([
+    b'SIP/2.0 486 Busy Here',
+    b'Via: SIP/2.0/UDP 10.178.20.130:5060;branch=z9hG4bK776asdhds',
+    b'CSeq: 102 INVITE',
+    b'Content-Length: 0',
+    b'',
+    b'',
+    b'',
+])
+
+class SipParserTest(unittest.TestCase):
+
+    def inputs(self, data):
+        return [data, bytearray(data), memoryview(data), memoryview(bytearray(data)), data.decode('utf-8')]
+
+    def test_request(self):
+        for data in self.inputs(REQUEST):
+            message = sipparser.decode(data)
+
+            self.assertEqual(message.method, 'INVITE')
+            self.assertEqual(message.uri, 'sip:13@10.178.20.130')
+            self.assertEqual(message.headers.get_value('v'), 'SIP/2.0/TCP 10.178.20.130:20036;branch=z9hG4bK776asdhds')
+            self.assertEqual(message.headers.get_value('call-id'), '326371826c80e17e6cf6c29861eb2933@10.178.20.130')
+            self.assertEqual(message.headers.get_value('Subject'), 'first line second line')
+            self.assertEqual(message.content, 'Hello, World!')
+
+    def test_response(self):
+        for data in self.inputs(RESPONSE):
+            message = sipparser.decode(data)
+
+            self.assertEqual(message.response_code, '486')
+            self.assertEqual(message.reason_phrase, 'Busy Here')
+            self.assertEqual(len(message.headers), 3)
+            self.assertFalse(message.content)
+
+    def test_round_trip(self):
+        for data in (REQUEST, RESPONSE):
+            for received in self.inputs(data):
+                buffer = bytearray()
+                sipparser.decode(received).encode_into(buffer)
+                self.assertEqual(bytes(buffer), data)
+
+    def test_changed_header_is_encoded(self):
+        message = sipparser.decode(REQUEST)
+        message.headers.get('CSeq').set_value('103 INVITE')
+
+        buffer = bytearray()
+        message.encode_into(buffer)
+
+        # the folded header is sent unfolded once the head is rebuilt
+        encoded = sipparser.decode(bytes(buffer))
+        self.assertEqual(encoded.headers.get_value('CSeq'), '103 INVITE')
+        self.assertEqual(encoded.headers.get_value('Subject'), 'first line second line')
+        self.assertEqual(encoded.content, 'Hello, World!')
+        self.assertEqual(len(encoded.headers), len(message.headers))
+
+    def test_header_setters(self):
+        message = sipparser.decode(REQUEST)
+        subject = message.headers.get('Subject')
+
+        subject.set_name('s')
+        self.assertEqual(subject.value, 'first line second line')
+
+        subject.set_value('other')
+        self.assertEqual((subject.name, subject.value), ('s', 'other'))
+        self.assertEqual(subject.encode_line(), b's: other\r\n')
+
+    def test_lookup_before_split(self):
+        data = REQUEST.replace(b'CSeq', b'v: SIP/2.0/UDP b\r\nCSeq')
+        message = sipparser.decode(data)
+        headers = message.headers
+
+        self.assertEqual(headers.get_value('i'), '326371826c80e17e6cf6c29861eb2933@10.178.20.130')
+        self.assertEqual([header.value for header in headers.get_all('VIA')], [
+            'SIP/2.0/TCP 10.178.20.130:20036;branch=z9hG4bK776asdhds',
+            'SIP/2.0/UDP b',
+        ])
+        self.assertNotIn('Route', headers)
+
+        # only the headers looked up are built
+        self.assertIsNotNone(headers.block)
+        self.assertEqual(sorted(headers.found), ['call-id', 'route', 'via'])
+
+        subject = headers.get('subject')
+        self.assertEqual(subject.value, 'first line second line')
+        headers.get('Via').set_value('SIP/2.0/TCP c')
+
+        # the headers built are kept by the split
+        self.assertEqual(len(headers), 8)
+        self.assertIsNone(headers.block)
+        self.assertIs(headers[6], subject)
+
+        buffer = bytearray()
+        message.encode_into(buffer)
+        self.assertEqual(bytes(buffer), data.replace(b'SIP/2.0/TCP 10.178.20.130:20036;branch=z9hG4bK776asdhds', b'SIP/2.0/TCP c'))
+
+    def test_lookup_of_unicode_block(self):
+        # lower() changes the length of some unicode text
+        data = REQUEST.replace(b'first line', u'\u0130stanbul'.encode('utf-8'))
+        message = sipparser.decode(data)
+
+        self.assertEqual(message.headers.get_value('CSeq'), '102 INVITE')
+        self.assertEqual(message.headers.get_value('Subject').split()[1], 'second')
+
+    def test_invalid(self):
+        self.assertIsNone(sipparser.decode(b'INVITE\r\n\r\n'))
+        self.assertIsNone(sipparser.decode(b''))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'xsip'))
+
+import sipparser
+import sipscenario
+
+RESPONSE = b'\r\n'.join([
+    b'SIP/2.0 200 OK',
+    b'Via: SIP/2.0/UDP 10.0.0.2:5060;branch=z9hG4bKpeer;received=10.0.0.9',
+    b'From: <sip:a@b>;tag=1234',
+    b'To: <sip:c@d>;tag=peer-tag',
+    b'Call-ID: abc@10.0.0.1',
+    b'CSeq: 1 INVITE',
+    b'Contact: <sip:c@10.0.0.2>',
+    b'Content-Length: 0',
+    b'',
+    b'',
+])
+
+def header(name, value):
+    h = sipscenario.Header()
+    h.name  = name
+    h.value = value
+    return h
+
+def response(code, headers):
+    message = sipscenario.MessageResponse()
+    message.response_code = code
+    message.reason_phrase = 'OK'
+    message.headers = [header(name, value) for name, value in headers]
+    return message
+
+class CheckTest(unittest.TestCase):
+
+    def test_peer_specific_headers_are_not_compared(self):
+        message = response(200, [
+            ('Via', 'SIP/2.0/UDP 10.0.0.1:5060;branch=z9hG4bKmine'),
+            ('To', '<sip:c@d>'),
+            ('Contact', '<sip:c@10.0.0.1>'),
+            ('i', 'abc@10.0.0.1'),
+            ('CSeq', '1 INVITE'),
+        ])
+
+        message.check(sipparser.decode(RESPONSE))
+
+    def test_mismatches(self):
+        received = sipparser.decode(RESPONSE)
+
+        self.assertRaises(Exception, response(180, []).check, received)
+        self.assertRaises(Exception, response(200, [('Call-ID', 'other@10.0.0.1')]).check, received)
+        self.assertRaises(Exception, response(200, [('CSeq', '2 INVITE')]).check, received)
+        self.assertRaises(Exception, response(200, []).check, None)
+
+    def test_request_expected(self):
+        message = sipscenario.MessageRequest()
+        message.method = 'INVITE'
+
+        self.assertRaises(Exception, message.check, sipparser.decode(RESPONSE))
+
+        request = sipparser.decode(b'INVITE sip:c@d SIP/2.0\r\nCall-ID: abc@10.0.0.1\r\n\r\n')
+        message.check(request)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'xsip'))
+
+import sipstream
+
+def request(cseq, content=b''):
+    return b'\r\n'.join([
+        b'OPTIONS sip:a@b SIP/2.0',
+        b'Via: SIP/2.0/TCP a:5060;branch=z9hG4bK' + str(cseq).encode('ascii'),
+        b'CSeq: ' + str(cseq).encode('ascii') + b' OPTIONS',
+        b'Content-Length: ' + str(len(content)).encode('ascii'),
+        b'',
+        content,
+    ])
+
+def cseqs(messages):
+    return [message.headers.get_value('CSeq') for message in messages]
+
+class SipStreamDecoderTest(unittest.TestCase):
+
+    def feed(self, decoder, data, sizes):
+        messages = []
+        start = 0
+        while start < len(data):
+            size = sizes()
+            messages.extend(decoder.feed(data[start:start + size]))
+            start += size
+        return messages
+
+    def test_pipelined_messages_in_random_chunks(self):
+        data = b''.join(request(i, b'x' * (i % 7)) for i in range(50))
+
+        for seed in range(10):
+            generator = random.Random(seed)
+            decoder = sipstream.SipStreamDecoder()
+            messages = self.feed(decoder, data, lambda: generator.randint(1, 200))
+
+            self.assertEqual(cseqs(messages), ['%d OPTIONS' % i for i in range(50)])
+            self.assertEqual([message.content for message in messages], ['x' * (i % 7) for i in range(50)])
+            self.assertEqual(decoder.pending(), 0)
+            self.assertEqual(decoder.errors, 0)
+
+    def test_single_chunk(self):
+        decoder = sipstream.SipStreamDecoder()
+        messages = decoder.feed(request(1, b'abc') + request(2) + request(3)[:20])
+
+        self.assertEqual(cseqs(messages), ['1 OPTIONS', '2 OPTIONS'])
+        self.assertEqual(decoder.pending(), 20)
+
+    def test_keep_alives(self):
+        decoder = sipstream.SipStreamDecoder()
+        data = b'\r\n\r\n' + request(1) + b'\r\n\r\n\r\n' + request(2) + b'\r\n'
+
+        messages = self.feed(decoder, data, lambda: 1)
+
+        self.assertEqual(cseqs(messages), ['1 OPTIONS', '2 OPTIONS'])
+        self.assertEqual(decoder.errors, 0)
+        self.assertEqual(decoder.discarded, 0)
+
+    def test_resync_after_garbage(self):
+        decoder = sipstream.SipStreamDecoder()
+        garbage = b'garbage\r\nmore garbage\r\n'
+        data = request(1) + garbage + request(2)
+
+        messages = self.feed(decoder, data, lambda: 7)
+
+        self.assertEqual(cseqs(messages), ['1 OPTIONS', '2 OPTIONS'])
+        self.assertGreater(decoder.errors, 0)
+        self.assertEqual(decoder.discarded, len(garbage))
+
+    def test_oversized_header(self):
+        decoder = sipstream.SipStreamDecoder(maximum_header_size=256)
+        oversized = request(1).replace(b'CSeq:', b'X-Padding: ' + b'p' * 512 + b'\r\nCSeq:')
+
+        messages = decoder.feed(oversized) + decoder.feed(request(2))
+
+        self.assertEqual(cseqs(messages), ['2 OPTIONS'])
+        self.assertGreater(decoder.errors, 0)
+
+    def test_oversized_header_without_end(self):
+        decoder = sipstream.SipStreamDecoder(maximum_header_size=256)
+
+        decoder.feed(b'OPTIONS sip:a@b SIP/2.0\r\n')
+        for i in range(100):
+            decoder.feed(b'X-Padding: ' + b'p' * 32 + b'\r\n')
+
+        # the buffer does not grow without bound
+        self.assertLessEqual(decoder.pending(), 256 + 64)
+
+        messages = decoder.feed(b'\r\n' + request(2))
+        self.assertEqual(cseqs(messages), ['2 OPTIONS'])
+
+    def test_oversized_body(self):
+        decoder = sipstream.SipStreamDecoder(maximum_body_size=16)
+
+        # the body is skipped up to the next start line, like SDP it ends with a line break
+        messages = decoder.feed(request(1, b'b' * 30 + b'\r\n') + request(2, b'b' * 16))
+
+        self.assertEqual(cseqs(messages), ['2 OPTIONS'])
+        self.assertEqual(messages[0].method, 'OPTIONS')
+        self.assertGreater(decoder.errors, 0)
+
+if __name__ == '__main__':
+    unittest.main()
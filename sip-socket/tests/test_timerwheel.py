@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'xsocket'))
+
+import timerwheel
+
+class TimerWheelTest(unittest.TestCase):
+
+    def drive(self, wheel, start, duration):
+        for i in range(1, int(round(duration / wheel.tick)) + 1):
+            wheel.advance(start + i * wheel.tick)
+
+    def test_period_not_multiple_of_tick(self):
+        wheel = timerwheel.TimerWheel(tick=0.05)
+        calls = []
+
+        start = time.time()
+        wheel.call_every(0.3, lambda: calls.append(wheel.current))
+        self.drive(wheel, start, 30.0)
+
+        self.assertIn(len(calls), (99, 100))
+
+    def test_period_shorter_than_tick(self):
+        wheel = timerwheel.TimerWheel(tick=0.05)
+        calls = []
+
+        start = time.time()
+        wheel.call_every(0.01, lambda: calls.append(wheel.current))
+        self.drive(wheel, start, 1.0)
+
+        # at most once per tick
+        self.assertEqual(len(calls), len(set(calls)))
+        self.assertGreaterEqual(len(calls), 19)
+
+    def test_one_shot_and_cancel(self):
+        wheel = timerwheel.TimerWheel(tick=0.05)
+        calls = []
+
+        start = time.time()
+        wheel.call_later(0.2, lambda: calls.append('later'))
+        timer = wheel.call_every(0.1, lambda: calls.append('every'))
+        timer.cancel()
+        self.drive(wheel, start, 1.0)
+
+        self.assertEqual(calls, ['later'])
+        self.assertEqual(wheel.count, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'xsocket'))
+
+import bufferpool
+import writequeue
+
+class WriteQueueTest(unittest.TestCase):
+
+    def test_pooled_buffers_are_copied(self):
+        queue = writequeue.WriteQueue()
+        pool = bufferpool.BufferPool(6)
+        buffer = pool.borrow()
+        buffer[:] = b'INVITE'
+
+        queue.push(memoryview(buffer)[:3])
+        queue.push([b'OK ', buffer])
+        pool.release(buffer)
+        buffer[:] = b'xxxxxx'
+
+        self.assertEqual(b''.join(view.tobytes() for view in queue.peek()), b'INVOK INVITE')
+
+        # the send handlers get the copies as well
+        completed, resumed = queue.consume(12)
+        self.assertEqual(completed, [b'INV', [b'OK ', b'INVITE']])
+
+    def test_other_buffers_are_referenced(self):
+        queue = writequeue.WriteQueue()
+        content = bytearray(b'Hello')
+
+        queue.push([b'head ', content])
+        content[:] = b'World'
+
+        self.assertEqual(b''.join(view.tobytes() for view in queue.peek()), b'head World')
+
+    def test_watermarks(self):
+        queue = writequeue.WriteQueue(high_watermark=8, low_watermark=4)
+
+        self.assertFalse(queue.push(b'12345'))
+        self.assertTrue(queue.push([b'123', b'45']))
+        self.assertTrue(queue.paused)
+
+        completed, resumed = queue.consume(5)
+        self.assertEqual(completed, [b'12345'])
+        self.assertFalse(resumed)
+
+        completed, resumed = queue.consume(2)
+        self.assertEqual(completed, [])
+        self.assertTrue(resumed)
+        self.assertFalse(queue.paused)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,12 @@
 import sipdecoder
+import sipfields
 import siphandler
 import sipheader
+import sipheaders
 import sipmessage
+import sipparser
 import siprequest
 import sipresponse
 import sipscenario
+import sipstream
 import jobject
@@ -3,6 +3,9 @@ import os
 
 class JObject(object):
 
+    # scenarios hold a message object per step, kept without instance dicts
+    __slots__ = ('file_path', 'content', 'jcontent')
+
     def __init__(self):
         self.file_path = None
         self.content   = None
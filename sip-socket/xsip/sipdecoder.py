@@ -1,8 +1,18 @@
 import sipmessage
+import sipparser
 import siprequest
 import sipresponse
 
-def decode(content):
+def decode(content, keep_raw=True):
+    # single pass offset parser, headers are materialized on access
+    message = sipparser.decode(content)
+
+    if message is not None and not keep_raw:
+        message.drop_raw()
+
+    return message
+
+def decode_lines(content):
     lines = content.splitlines()
 
     if len(lines) == 0:
@@ -10,17 +20,16 @@ def decode(content):
 
     intro = lines[0]
 
-    s = intro.strip().split()
+    # the reason phrase may contain spaces
+    s = intro.strip().split(None, 2)
 
     if len(s) != 3:
         return
 
-    try:
-        int(s[0])
-    except ValueError:
-        message_type = sipmessage.SipMessage.MESSAGE_TYPE_REQUEST
-    else:
+    if s[0].startswith('SIP/'):
         message_type = sipmessage.SipMessage.MESSAGE_TYPE_RESPONSE
+    else:
+        message_type = sipmessage.SipMessage.MESSAGE_TYPE_REQUEST
 
     if message_type == sipmessage.SipMessage.MESSAGE_TYPE_REQUEST:
         message = siprequest.SipRequest()
@@ -0,0 +1,223 @@
+"""provides parsers of structured SIP header values
+
+Every parser takes the raw header value and returns its typed form, or
+None if the value is malformed. SipHeader.get_parsed caches the result,
+so a header is parsed at most once until its value is set again.
+
+Classes:
+    Via: a single Via entry (RFC 3261 20.42)
+    Address: a name-addr or addr-spec with parameters, e.g. From/To/Contact
+    CSeq: the sequence number and method of a CSeq header
+
+Functions:
+    split_values: split a comma separated header value
+    parse_params: return the parameters of a ;name=value list
+    parse_int: return the integer of e.g. a Content-Length header value
+    parse_via: return the Via of a single Via entry
+    parse_vias: return the Via entries of a Via header value
+    parse_address: return the Address of a From/To header value
+    parse_addresses: return the Addresses of a Contact header value
+    parse_cseq: return the CSeq of a CSeq header value
+"""
+
+
+class Via(object):
+    """Via Entry
+
+    Attributes:
+        protocol: protocol name and version, e.g. SIP/2.0
+        transport: transport of the hop, e.g. UDP
+        host: host of the sent-by
+        port: port of the sent-by, None if not given
+        params: lower case name -> value, None for flags (e.g. a bare rport)
+
+    Methods:
+        branch: return the branch parameter
+        received: return the received parameter
+        rport: return the rport parameter, None if absent or a bare flag
+    """
+
+    __slots__ = ('protocol', 'transport', 'host', 'port', 'params')
+
+    def __init__(self, protocol, transport, host, port, params):
+        self.protocol  = protocol
+        self.transport = transport
+        self.host      = host
+        self.port      = port
+        self.params    = params
+
+    def branch(self):
+        return self.params.get('branch')
+
+    def received(self):
+        return self.params.get('received')
+
+    def rport(self):
+        return parse_int(self.params.get('rport'))
+
+class Address(object):
+    """Address with Parameters
+
+    Attributes:
+        display_name: display name without quotes, '' if not given
+        uri: the URI without angle brackets
+        params: lower case name -> value of the header parameters
+
+    Methods:
+        tag: return the tag parameter
+    """
+
+    __slots__ = ('display_name', 'uri', 'params')
+
+    def __init__(self, display_name, uri, params):
+        self.display_name = display_name
+        self.uri          = uri
+        self.params       = params
+
+    def tag(self):
+        return self.params.get('tag')
+
+class CSeq(object):
+    """CSeq Value
+
+    Attributes:
+        number: sequence number
+        method: request method
+    """
+
+    __slots__ = ('number', 'method')
+
+    def __init__(self, number, method):
+        self.number = number
+        self.method = method
+
+def split_values(value):
+    """split the value at commas outside quotes and angle brackets
+    """
+
+    if ',' not in value:
+        return [value]
+
+    values = []
+    start = 0
+    quoted = False
+    bracketed = False
+
+    for i, c in enumerate(value):
+        if c == '"':
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif c == '<':
+            bracketed = True
+        elif c == '>':
+            bracketed = False
+        elif c == ',' and not bracketed:
+            values.append(value[start:i])
+            start = i + 1
+
+    values.append(value[start:])
+
+    return [v for v in values if v.strip()]
+
+def parse_params(value):
+    params = {}
+
+    for param in value.split(';'):
+        name, splitter, v = param.partition('=')
+
+        name = name.strip().lower()
+        if not name:
+            continue
+
+        params[name] = v.strip() if splitter else None
+
+    return params
+
+def parse_int(value):
+    if value is None:
+        return None
+
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+def parse_via(value):
+    s = value.strip().split(None, 1)
+    if len(s) != 2:
+        return None
+
+    protocol, splitter, transport = s[0].rpartition('/')
+    if not splitter:
+        return None
+
+    sent_by, splitter, params = s[1].partition(';')
+    sent_by = sent_by.strip()
+
+    # bracketed IPv6 references contain colons
+    if sent_by.startswith('['):
+        end = sent_by.find(']')
+        host = sent_by[:end + 1]
+        port = sent_by[end + 1:].lstrip(':')
+    else:
+        host, splitter, port = sent_by.partition(':')
+
+    return Via(protocol, transport.upper(), host, parse_int(port.strip() or None), parse_params(params))
+
+def parse_vias(value):
+    # one header may carry several hops
+    vias = []
+
+    for v in split_values(value):
+        via = parse_via(v)
+        if via is not None:
+            vias.append(via)
+
+    return vias
+
+def parse_address(value):
+    value = value.strip()
+
+    # the display name may be quoted and contain angle brackets
+    search = 0
+    if value.startswith('"'):
+        search = value.find('"', 1) + 1
+        if search == 0:
+            return None
+
+    start = value.find('<', search)
+
+    if start == -1:
+        # addr-spec, the parameters belong to the header, not the URI
+        uri, splitter, params = value.partition(';')
+        return Address('', uri.strip(), parse_params(params))
+
+    end = value.find('>', start)
+    if end == -1:
+        return None
+
+    display_name = value[:start].strip().strip('"')
+
+    return Address(display_name, value[start + 1:end], parse_params(value[end + 1:]))
+
+def parse_addresses(value):
+    addresses = []
+
+    for v in split_values(value):
+        address = parse_address(v)
+        if address is not None:
+            addresses.append(address)
+
+    return addresses
+
+def parse_cseq(value):
+    s = value.split()
+    if len(s) != 2:
+        return None
+
+    number = parse_int(s[0])
+    if number is None:
+        return None
+
+    return CSeq(number, s[1])
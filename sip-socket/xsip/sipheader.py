@@ -1,25 +1,66 @@
+def to_bytes(value):
+    # the inverse of sipparser.text, python 2 str is bytes already
+    if isinstance(value, bytes):
+        return value
+
+    if isinstance(value, memoryview):
+        return value.tobytes()
+
+    if isinstance(value, bytearray):
+        return bytes(value)
+
+    return value.encode('utf-8', 'surrogateescape')
+
+# parsed until the value is parsed, None is a result, parsers return it for malformed values
+_UNPARSED = object()
+
 class SipHeader(object):
 
+    # no per instance dict, messages are kept by the hundred thousand
+    __slots__ = ('name', 'value', 'parsed', 'encoded')
+
     SPLITTER = ':'
 
+    NEW_LINE = b'\r\n'
+
+    # received line of a decoded header, until the header is set
+    line = None
+
     def __init__(self):
-        self.name  = None
-        self.value = None
+        self.name    = None
+        self.value   = None
+        self.parsed  = _UNPARSED
+        self.encoded = None
 
     def set_name(self, name):
         self.name = name
 
+        # serialized with the previous name
+        self.encoded = None
+
     def set_value(self, value):
         self.value = value
 
+        # parsed and serialized from the previous value
+        self.parsed  = _UNPARSED
+        self.encoded = None
+
+    def get_parsed(self, parser):
+        # parsed once, routing code asks the same headers over and over
+        if self.parsed is _UNPARSED:
+            self.parsed = parser(self.value)
+
+        return self.parsed
+
     def decode(self, line):
         if self.SPLITTER not in line:
             return
 
-        s = line.split(self.SPLITTER)
+        # values (e.g. URIs) may contain the splitter
+        s = line.split(self.SPLITTER, 1)
 
         self.name = s[0].strip()
-        self.value = ''.join(s[1:]).strip()
+        self.value = s[1].strip()
 
     def encode(self):
         return '{name}{splitter} {value}'.format(
@@ -27,6 +68,13 @@ class SipHeader(object):
             splitter=self.SPLITTER,
             value=self.value)
 
+    def encode_line(self):
+        # serialized once, a forwarded or retransmitted header is reused
+        if self.encoded is None:
+            self.encoded = to_bytes(self.encode()) + self.NEW_LINE
+
+        return self.encoded
+
     def describe(self):
         print('--- {name} ---'.format(name=self.name))
         print(self.value)
@@ -0,0 +1,221 @@
+"""provides an indexed header container of SIP messages
+
+Header names are case-insensitive (RFC 3261 7.3.1) and most have a
+compact form (RFC 3261 7.3.3), so every name is reduced to a single
+interned key: the lower case name of the full form. Lookups by any
+spelling of a name then cost a dict access, instead of a scan of the
+headers comparing strings.
+
+Classes:
+    SipHeaders: case-insensitive multimap of headers kept in wire order
+
+Functions:
+    key: return the interned lookup key of a header name
+    canonical: return the conventional spelling of a header name
+    spellings: return the lower case names of a key, full and compact form
+
+Constants:
+    COMPACT_FORMS: compact form -> key of the full form
+    CANONICAL_NAMES: key -> conventional spelling of the full form
+"""
+
+
+import sys
+
+import sipheader
+
+try:
+    intern
+except NameError:
+    intern = sys.intern
+
+COMPACT_FORMS = {
+    'a' : 'accept-contact',
+    'b' : 'referred-by',
+    'c' : 'content-type',
+    'e' : 'content-encoding',
+    'f' : 'from',
+    'i' : 'call-id',
+    'k' : 'supported',
+    'l' : 'content-length',
+    'm' : 'contact',
+    'o' : 'event',
+    'r' : 'refer-to',
+    's' : 'subject',
+    't' : 'to',
+    'u' : 'allow-events',
+    'v' : 'via',
+    'x' : 'session-expires',
+}
+
+CANONICAL_NAMES = {
+    'accept-contact'   : 'Accept-Contact',
+    'allow-events'     : 'Allow-Events',
+    'call-id'          : 'Call-ID',
+    'contact'          : 'Contact',
+    'content-encoding' : 'Content-Encoding',
+    'content-length'   : 'Content-Length',
+    'content-type'     : 'Content-Type',
+    'cseq'             : 'CSeq',
+    'event'            : 'Event',
+    'from'             : 'From',
+    'max-forwards'     : 'Max-Forwards',
+    'record-route'     : 'Record-Route',
+    'refer-to'         : 'Refer-To',
+    'referred-by'      : 'Referred-By',
+    'route'            : 'Route',
+    'session-expires'  : 'Session-Expires',
+    'subject'          : 'Subject',
+    'supported'        : 'Supported',
+    'to'               : 'To',
+    'via'              : 'Via',
+    'www-authenticate' : 'WWW-Authenticate',
+}
+
+# spelling -> key, names repeat in every message, so they are reduced once
+KEYS = {}
+
+def key(name):
+    try:
+        return KEYS[name]
+    except KeyError:
+        pass
+
+    lowered = (name or '').strip().lower()
+    k = COMPACT_FORMS.get(lowered, lowered)
+
+    # python 2 interns byte strings only, scenario names are unicode
+    if isinstance(k, str):
+        k = intern(k)
+
+    # bounded, a peer may send any number of distinct names
+    if len(KEYS) < 4096:
+        KEYS[name] = k
+
+    return k
+
+def canonical(name):
+    k = key(name)
+    return CANONICAL_NAMES.get(k, name)
+
+# key -> names, e.g. 'call-id' -> ('call-id', 'i')
+SPELLINGS = {}
+for compact, full in COMPACT_FORMS.items():
+    SPELLINGS[full] = (full, compact)
+
+def spellings(k):
+    return SPELLINGS.get(k) or (k,)
+
+class SipHeaders(object):
+    """SIP Header Multimap
+
+    Behaves as the list of headers it replaces (iteration, len, indexing,
+    append) and adds lookups by name. The index is built on the first
+    lookup, so the headers of a parsed message are not split into names
+    and values unless somebody looks for one of them. Headers are indexed
+    by the name they have when added, renaming one afterwards is not seen.
+
+    Attributes:
+        headers: headers in wire order
+        index: key -> headers of that name in wire order, None until a lookup
+        version: number of times headers were added or removed
+
+    Methods:
+        build_index: index the headers by key, from their names only
+        append: add a header after the existing ones
+        add: add a header of the given name and value
+        get: return the first header of the given name
+        get_all: return all headers of the given name
+        get_value: return the value of the first header of the given name
+        remove: remove all headers of the given name
+        changed: return whether headers were added, removed or set since the given version
+    """
+
+    __slots__ = ('headers', 'index', 'version')
+
+    def __init__(self, headers=None):
+        self.headers = list(headers or [])
+        self.index   = None
+        self.version = 0
+
+    def __iter__(self):
+        return iter(self.headers)
+
+    def __len__(self):
+        return len(self.headers)
+
+    def __getitem__(self, i):
+        return self.headers[i]
+
+    def __contains__(self, name):
+        return key(name) in self.build_index()
+
+    def build_index(self):
+        if self.index is None:
+            index = {}
+            keys = KEYS
+
+            # names only, the values of decoded headers are not read
+            for header in self.headers:
+                name = header.name
+                k = keys.get(name)
+                if k is None:
+                    k = key(name)
+
+                headers = index.get(k)
+                if headers is None:
+                    index[k] = [header]
+                else:
+                    headers.append(header)
+
+            self.index = index
+
+        return self.index
+
+    def append(self, header):
+        self.headers.append(header)
+        self.version += 1
+
+        if self.index is not None:
+            self.index.setdefault(key(header.name), []).append(header)
+
+    def add(self, name, value):
+        header = sipheader.SipHeader()
+        header.set_name(name)
+        header.set_value(value)
+        self.append(header)
+        return header
+
+    def get(self, name, default=None):
+        headers = self.build_index().get(key(name))
+        if not headers:
+            return default
+        return headers[0]
+
+    def get_all(self, name):
+        return list(self.build_index().get(key(name), ()))
+
+    def get_value(self, name, default=None):
+        header = self.get(name)
+        if header is None:
+            return default
+        return header.value
+
+    def remove(self, name):
+        removed = self.build_index().pop(key(name), [])
+        if removed:
+            ids = set(id(header) for header in removed)
+            self.headers = [header for header in self.headers if id(header) not in ids]
+            self.version += 1
+        return removed
+
+    def changed(self, version):
+        if self.version != version:
+            return True
+
+        # set by their setters, decoded headers keep their line until then
+        for header in self.headers:
+            if header.encoded is None and header.line is None:
+                return True
+
+        return False
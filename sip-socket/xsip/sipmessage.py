@@ -1,7 +1,25 @@
+import sipfields
 import sipheader
+import sipheaders
 
 class SipMessage(object):
 
+    # no per instance dict, messages are kept by the hundred thousand
+    __slots__ = (
+        'message_type',
+        'sip_version',
+        'method',
+        'uri',
+        'response_code',
+        'reason_phrase',
+        'headers',
+        'content',
+        'raw',
+        'head',
+        'head_version',
+        'deferred',
+    )
+
     NEW_LINE = '\r\n'
 
     MESSAGE_TYPE_REQUEST  = 'REQUEST'
@@ -23,8 +41,8 @@ class SipMessage(object):
         self.response_code = None
         self.reason_phrase = None
 
-        # header list
-        self.headers = []
+        # headers in wire order, indexed by name
+        self.headers = sipheaders.SipHeaders()
 
         # message content
         self.content = None
@@ -32,11 +50,59 @@ class SipMessage(object):
         # raw message
         self.raw = None
 
+        # serialized start line and headers, see encode_head_bytes
+        self.head         = None
+        self.head_version = None
+
+        # attribute -> function building it on first access
+        self.deferred = None
+
+    def __getattr__(self, attribute):
+        # only called for attributes not set, i.e. deferred ones
+        if attribute == 'deferred':
+            raise AttributeError(attribute)
+
+        deferred = self.deferred
+        if deferred is None or attribute not in deferred:
+            raise AttributeError(attribute)
+
+        value = deferred.pop(attribute)()
+        setattr(self, attribute, value)
+        return value
+
+    def defer(self, attribute, function):
+        """build the attribute by calling the function on its first access,
+        e.g. the headers of a parsed message nobody looks at are never split
+        """
+
+        if self.deferred is None:
+            self.deferred = {}
+
+        try:
+            delattr(self, attribute)
+        except AttributeError:
+            pass
+
+        self.deferred[attribute] = function
+
+    def drop_raw(self):
+        """build the deferred headers and content, and drop the raw message
+        they would keep alive, as well as the cached head copied from it
+        """
+
+        self.headers
+        self.content
+
+        self.deferred = None
+        self.head     = None
+        self.raw      = None
+
     def set_message_type(self, message_type):
         self.message_type = message_type
 
     def set_sip_version(self, sip_version):
         self.sip_version = sip_version
+        self.head = None
 
     def set_content(self, content):
         self.content = content
@@ -50,6 +116,59 @@ class SipMessage(object):
         header.set_value(value)
         self.add_headerx(header)
 
+    def get_header(self, name):
+        # any case or compact form of the name, e.g. 'v' for Via
+        return self.headers.get(name)
+
+    def get_headers(self, name):
+        return self.headers.get_all(name)
+
+    def get_parsed(self, name, parser):
+        header = self.headers.get(name)
+        if header is None:
+            return None
+        return header.get_parsed(parser)
+
+    def get_vias(self):
+        vias = []
+        for header in self.headers.get_all('Via'):
+            vias.extend(header.get_parsed(sipfields.parse_vias))
+        return vias
+
+    def get_via(self):
+        # the topmost entry, i.e. the previous hop
+        vias = self.get_parsed('Via', sipfields.parse_vias)
+        if not vias:
+            return None
+        return vias[0]
+
+    def get_from(self):
+        return self.get_parsed('From', sipfields.parse_address)
+
+    def get_to(self):
+        return self.get_parsed('To', sipfields.parse_address)
+
+    def get_contacts(self):
+        contacts = []
+        for header in self.headers.get_all('Contact'):
+            contacts.extend(header.get_parsed(sipfields.parse_addresses))
+        return contacts
+
+    def get_contact(self):
+        contacts = self.get_parsed('Contact', sipfields.parse_addresses)
+        if not contacts:
+            return None
+        return contacts[0]
+
+    def get_call_id(self):
+        return self.headers.get_value('Call-ID')
+
+    def get_cseq(self):
+        return self.get_parsed('CSeq', sipfields.parse_cseq)
+
+    def get_content_length(self):
+        return self.get_parsed('Content-Length', sipfields.parse_int)
+
     def decode_intro(self, s1, s2, s3):
         raise NotImplementedError
 
@@ -71,7 +190,7 @@ class SipMessage(object):
         intro = lines[i]
         i += 1
 
-        intro_s = intro.strip().split()
+        intro_s = intro.strip().split(None, 2)
 
         if len(intro_s) != 3:
             return
@@ -91,13 +210,13 @@ class SipMessage(object):
                 else:
                     header = sipheader.SipHeader()
                     header.decode(line)
-                    self.headers.append(header)
+                    self.add_headerx(header)
 
             i += 1
 
         self.content = self.NEW_LINE.join(content_lines)
 
-    def encode(self):
+    def encode_head(self):
         lines = []
 
         line = self.encode_intro()
@@ -111,11 +230,74 @@ class SipMessage(object):
 
         lines.append(self.NEW_LINE)
 
-        lines.append(self.content or '')
+        return ''.join(lines)
 
-        lines.append(self.NEW_LINE)
+    def encode(self):
+        return ''.join([self.encode_head(), self.content or '', self.NEW_LINE])
 
-        return ''.join(lines)
+    def head_changed(self):
+        deferred = self.deferred
+
+        # headers never split can not have been changed
+        if deferred is not None and 'headers' in deferred:
+            return False
+
+        return self.headers.changed(self.head_version)
+
+    def encode_head_bytes(self):
+        """return the serialized start line and headers, rebuilt only if
+        the start line, a header or the header list was set since, headers
+        assigned to directly instead of by their setters are not noticed
+        """
+
+        head = self.head
+        if head is not None and not self.head_changed():
+            return head
+
+        lines = [sipheader.to_bytes(self.encode_intro()), sipheader.SipHeader.NEW_LINE]
+
+        # only the changed headers are serialized again
+        for header in self.headers:
+            lines.append(header.encode_line())
+
+        lines.append(sipheader.SipHeader.NEW_LINE)
+
+        self.head         = b''.join(lines)
+        self.head_version = self.headers.version
+
+        return self.head
+
+    def encode_into(self, buffer):
+        """append the serialized message to the bytearray,
+        return the number of bytes appended
+        """
+
+        size = len(buffer)
+
+        buffer += self.encode_head_bytes()
+
+        if self.content:
+            buffer += sipheader.to_bytes(self.content)
+
+        buffer += sipheader.SipHeader.NEW_LINE
+
+        return len(buffer) - size
+
+    def encode_buffers(self):
+        # the content is referenced, not copied, so a sender
+        # supporting scatter-gather never copies a large body
+        buffers = [self.encode_head_bytes()]
+
+        # text (scenario unicode, python 3 str) has no buffer to reference
+        if self.content:
+            content = self.content
+            if not isinstance(content, (bytes, bytearray, memoryview)):
+                content = sipheader.to_bytes(content)
+            buffers.append(memoryview(content))
+
+        buffers.append(sipheader.SipHeader.NEW_LINE)
+
+        return buffers
 
     def describe_field(self, name, value):
         print('### {name} ###'.format(name=name))
@@ -0,0 +1,359 @@
+"""provides a single pass offset parser of SIP messages
+
+Decoding only locates the start line and the empty line ending the
+headers, a few find() calls running in C, and records their offsets.
+The header block is decoded and split into lines on the first access
+of the headers, in the same pass every header records the offset of its
+colon and takes its name, the value is read from the line only when
+asked for. Messages routed on their start line never build a header,
+and a lookup before the block is split searches the block for the name
+and builds only the headers found.
+
+Classes:
+    ParsedHeader: header reading its name and value from its received line
+    ParsedHeaders: headers of a received header block, split when needed
+
+Functions:
+    split_headers: return the headers of the given header block
+    decode: return the parsed SipRequest or SipResponse, None if invalid
+"""
+
+
+import sipheader
+import sipheaders
+import siprequest
+import sipresponse
+
+# searched per type, python 3 text and bytes do not mix
+SEPARATORS = {
+    str   : ('\n', '\r', '\n\r\n', '\n\n'),
+    bytes : (b'\n', b'\r', b'\n\r\n', b'\n\n'),
+}
+
+# first characters of folded lines
+FOLDING = (' ', '\t')
+
+def separators(data):
+    return SEPARATORS[str if isinstance(data, str) else bytes]
+
+def searchable(data):
+    """return data itself if find() can run on it, a memoryview spanning
+    its whole object (e.g. a received bytes object) is not copied
+    """
+
+    if not isinstance(data, memoryview):
+        return data
+
+    # a bytearray (e.g. a pooled receive buffer) may be reused under the
+    # deferred headers and content, bytes can not
+    obj = getattr(data, 'obj', None)
+    if isinstance(obj, bytes) and len(obj) == len(data):
+        return obj
+
+    return data.tobytes()
+
+def text(value):
+    if isinstance(value, str):
+        return value
+
+    # python 2 bytearray slices
+    if str is bytes:
+        return bytes(value)
+
+    return value.decode('utf-8', 'surrogateescape')
+
+class ParsedHeader(sipheader.SipHeader):
+    """SipHeader reading its value from its received line,
+    until the value is set, built without __init__ by split_headers
+    and ParsedHeaders.find
+    """
+
+    __slots__ = ('line', 'colon', 'assigned')
+
+    def get_value(self):
+        line = self.line
+        if line is None:
+            return self.assigned
+
+        value = line[self.colon + 1:].strip()
+
+        # folded lines (RFC 3261 7.3.1) are joined by a single space
+        if '\n' in value:
+            value = ' '.join(value.split())
+
+        return value
+
+    def assign_value(self, value):
+        self.assigned = value
+        self.line     = None
+
+    # overrides the slot of SipHeader
+    value = property(get_value, assign_value)
+
+    def set_name(self, name):
+        # the value is taken before the line is dropped
+        self.value = self.value
+        sipheader.SipHeader.set_name(self, name)
+
+    def encode_line(self):
+        # the received line is sent as is until the header is set
+        if self.encoded is None and self.line is not None:
+            self.encoded = sipheader.to_bytes(self.line) + self.NEW_LINE
+
+        return sipheader.SipHeader.encode_line(self)
+
+def split_headers(block, found=None):
+    """return the list of headers of the (text) header block, folded lines
+    are appended to the header they continue, found maps line numbers
+    to the headers already built for them
+    """
+
+    headers = []
+    new = object.__new__
+    number = -1
+    continued = True
+
+    # the block ends before the line break of its last line
+    if block[-1:] == '\r':
+        block = block[:-1]
+
+    # a few C level passes, the names are the only other strings built per
+    # header, no __init__ call, this loop is the cost of reading any header
+    for line in block.replace('\r\n', '\n').split('\n'):
+        number += 1
+
+        if line[:1] in FOLDING:
+            if headers and not continued:
+                headers[-1].line += '\r\n' + line
+            continue
+
+        if found is not None and number in found:
+            # built with its folded lines
+            headers.append(found[number])
+            continued = True
+            continue
+
+        colon = line.find(':')
+        if colon == -1:
+            if not line:
+                continue
+            colon = len(line)
+
+        header = new(ParsedHeader)
+        header.line    = line
+        header.colon   = colon
+        header.name    = line[:colon].strip()
+        header.parsed  = sipheader._UNPARSED
+        header.encoded = None
+        headers.append(header)
+        continued = False
+
+    return headers
+
+# line break and spellings of the keys searched so far
+TARGETS = {}
+
+def targets(k):
+    found = TARGETS.get(k)
+    if found is None:
+        found = TARGETS[k] = tuple('\n' + spelling for spelling in sipheaders.spellings(k))
+    return found
+
+class ParsedHeaders(sipheaders.SipHeaders):
+    """Headers of a received header block
+
+    The block is split into headers on the first access needing all of
+    them, e.g. iterating, indexing, adding or removing. Until then a
+    lookup searches the lower case block for the spellings of the name,
+    one find() per spelling, and builds only the headers found, which
+    are then kept by the split.
+
+    Attributes:
+        block: header block, None once split
+        lowered: line break and the lower case block, built by the first
+            lookup, False once split or if lower() moved the offsets
+        found: key -> [(line number, header)] of the lookups so far
+
+    Methods:
+        lower: return lowered, built on the first call
+        find: return the (line number, header) pairs of the given key,
+            once lower() returned the lowered block
+    """
+
+    __slots__ = ('block', 'lowered', 'found')
+
+    def __init__(self, block):
+        # headers is deliberately not set, see __getattr__
+        self.block   = block
+        self.lowered = None
+        self.found   = {}
+        self.index   = None
+        self.version = 0
+
+    def __getattr__(self, attribute):
+        # only called until the block is split
+        if attribute != 'headers':
+            raise AttributeError(attribute)
+
+        found = None
+        if self.found:
+            found = dict(pair for pairs in self.found.values() for pair in pairs)
+
+        self.headers = split_headers(self.block, found)
+        self.block   = None
+        self.lowered = False
+        self.found   = None
+
+        return self.headers
+
+    def lower(self):
+        lowered = self.lowered
+        if lowered is None:
+            lowered = '\n' + self.block.lower()
+
+            # lower() keeps the offsets of any ascii text, not of all unicode text
+            if len(lowered) != len(self.block) + 1:
+                lowered = False
+
+            self.lowered = lowered
+
+        return lowered
+
+    def find(self, k, new=object.__new__):
+        pairs = self.found.get(k)
+        if pairs is not None:
+            return pairs
+
+        block = self.block
+        lowered = self.lowered
+        pairs = self.found[k] = []
+
+        spelt = TARGETS.get(k)
+        if spelt is None:
+            spelt = targets(k)
+
+        for target in spelt:
+            # the line starting at position in the block starts at position + 1 in lowered
+            position = lowered.find(target)
+            while position != -1:
+                colon = position + len(target) - 1
+                while block[colon:colon + 1] in FOLDING:
+                    colon += 1
+
+                if block[colon:colon + 1] == ':':
+                    end = block.find('\n', colon)
+                    while end != -1 and block[end + 1:end + 2] in FOLDING:
+                        end = block.find('\n', end + 1)
+                    if end == -1:
+                        end = len(block)
+
+                    line = block[position:end]
+                    if line[-1:] == '\r':
+                        line = line[:-1]
+
+                    # folded as by split_headers
+                    if '\n' in line:
+                        line = line.replace('\r\n', '\n').replace('\n', '\r\n')
+
+                    colon -= position
+                    header = new(ParsedHeader)
+                    header.line    = line
+                    header.colon   = colon
+                    header.name    = line[:colon].strip()
+                    header.parsed  = sipheader._UNPARSED
+                    header.encoded = None
+                    pairs.append((block.count('\n', 0, position), header))
+
+                position = lowered.find(target, position + 1)
+
+        # in wire order, whatever the spelling, line numbers are unique
+        if len(pairs) > 1:
+            pairs.sort()
+
+        return pairs
+
+    def __contains__(self, name):
+        if not self.lower():
+            return sipheaders.SipHeaders.__contains__(self, name)
+        return len(self.find(sipheaders.key(name))) > 0
+
+    def get(self, name, default=None):
+        if not self.lower():
+            return sipheaders.SipHeaders.get(self, name, default)
+
+        pairs = self.find(sipheaders.key(name))
+        if not pairs:
+            return default
+        return pairs[0][1]
+
+    def get_all(self, name):
+        if not self.lower():
+            return sipheaders.SipHeaders.get_all(self, name)
+        return [header for number, header in self.find(sipheaders.key(name))]
+
+    def changed(self, version):
+        if self.block is not None:
+            # only the headers found may have been set
+            for pairs in self.found.values():
+                for number, header in pairs:
+                    if header.encoded is None and header.line is None:
+                        return True
+            return self.version != version
+
+        return sipheaders.SipHeaders.changed(self, version)
+
+def decode(content):
+    data = searchable(content)
+
+    new_line, carriage_return, empty_crlf, empty_lf = separators(data)
+
+    size = len(data)
+    start = 0
+
+    # CRLFs preceding the start line are ignored (RFC 3261 7.5)
+    while start < size and data[start:start + 1] in (new_line, carriage_return):
+        start += 1
+
+    intro_end = data.find(new_line, start)
+    if intro_end == -1:
+        intro_end = size
+
+    # the reason phrase may contain spaces
+    intro = text(data[start:intro_end]).strip().split(None, 2)
+
+    if len(intro) != 3:
+        return None
+
+    if intro[0].startswith('SIP/'):
+        message = sipresponse.SipResponse()
+    else:
+        message = siprequest.SipRequest()
+
+    message.raw = content
+    message.decode_intro(intro[0], intro[1], intro[2])
+
+    # the headers end at the first empty line, with or without CR
+    headers_end = size
+    body = size
+    for empty in (empty_crlf, empty_lf):
+        index = data.find(empty, intro_end, headers_end)
+        if index != -1:
+            headers_end = index
+            body = index + len(empty)
+
+    # the trailing line break is left out, just like by SipMessage.decode
+    body_end = size
+    if body_end > body and data[body_end - 1:body_end] == new_line:
+        body_end -= 1
+        if body_end > body and data[body_end - 1:body_end] == carriage_return:
+            body_end -= 1
+
+    message.defer('headers', lambda: ParsedHeaders(text(data[intro_end + 1:headers_end])))
+    message.defer('content', lambda: text(data[body:body_end]))
+
+    # the received head is forwarded as is until the message is changed
+    if headers_end < size:
+        message.defer('head', lambda: sipheader.to_bytes(data[start:body]))
+        message.head_version = 0
+
+    return message
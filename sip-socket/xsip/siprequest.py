@@ -2,6 +2,8 @@ import sipmessage
 
 class SipRequest(sipmessage.SipMessage):
 
+    __slots__ = ()
+
     def __init__(self):
         sipmessage.SipMessage.__init__(self)
 
@@ -9,9 +11,11 @@ class SipRequest(sipmessage.SipMessage):
 
     def set_method(self, method):
         self.method = method
+        self.head = None
 
     def set_uri(self, uri):
         self.uri = uri
+        self.head = None
 
     def decode_intro(self, s1, s2, s3):
         self.set_method(s1)
@@ -2,6 +2,8 @@ import sipmessage
 
 class SipResponse(sipmessage.SipMessage):
 
+    __slots__ = ()
+
     def __init__(self):
         sipmessage.SipMessage.__init__(self)
 
@@ -9,11 +11,13 @@ class SipResponse(sipmessage.SipMessage):
 
     def set_response_code(self, response_code):
         self.response_code = response_code
+        self.head = None
 
     def set_reason_phrase(self, reason_phrase):
         self.reason_phrase = reason_phrase
+        self.head = None
 
-    def decode_intro(s1, s2, s3):
+    def decode_intro(self, s1, s2, s3):
         self.set_sip_version(s1)
         self.set_response_code(s2)
         self.set_reason_phrase(s3)
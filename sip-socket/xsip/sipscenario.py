@@ -1,5 +1,6 @@
 import jobject
 import sipheader
+import sipheaders
 import siprequest
 import sipresponse
 
@@ -15,8 +16,14 @@ MESSAGE_RESPONSE = 'response'
 ACTION_SEND = 'send'
 ACTION_RECV = 'recv'
 
+# headers of a received message checked against the scenario,
+# the others (e.g. Via, tags, Contact) differ from peer to peer
+CHECKED_HEADERS = ('call-id', 'cseq')
+
 class Agent(jobject.JObject):
 
+    __slots__ = ('type', 'ip', 'protocol', 'port', 'buffersize', 'timeout')
+
     KEY_TYPE       = 'type'
     KEY_PROTOCOL   = 'protocol'
     KEY_IP         = 'ip'
@@ -60,6 +67,8 @@ class Agent(jobject.JObject):
 
 class AgentClient(Agent):
 
+    __slots__ = ()
+
     def __init__(self):
         Agent.__init__(self)
 
@@ -75,6 +84,8 @@ class AgentClient(Agent):
 
 class AgentServer(Agent):
 
+    __slots__ = ()
+
     def __init__(self):
         Agent.__init__(self)
 
@@ -87,6 +98,8 @@ class AgentServer(Agent):
 
 class Header(jobject.JObject):
 
+    __slots__ = ('name', 'value')
+
     KEY_NAME  = 'name'
     KEY_VALUE = 'value'
 
@@ -113,6 +126,8 @@ class Header(jobject.JObject):
 
 class Message(jobject.JObject):
 
+    __slots__ = ('version', 'action', 'type', 'method', 'uri', 'response_code', 'reason_phrase', 'headers')
+
     KEY_TYPE          = 'type'
     KEY_VERSION       = 'version'
     KEY_ACTION        = 'action'
@@ -194,8 +209,34 @@ class Message(jobject.JObject):
 
         return sip_message
 
+    def checkx(self, received):
+        raise Exception('Message::checkx method must be implemented by child class')
+
+    def check(self, received):
+        """raise if the received sip message does not match the scenario message,
+        only the start line and the Call-ID and CSeq headers are compared
+        """
+
+        if received is None:
+            raise Exception('invalid sip message received')
+
+        fields = self.checkx(received)
+
+        for header in self.headers:
+            if sipheaders.key(header.name) in CHECKED_HEADERS:
+                fields.append((header.name, header.value, received.headers.get_value(header.name)))
+
+        for name, expected, value in fields:
+            if expected != value:
+                raise Exception('expected {name} {expected} but received {value}'.format(
+                    name=name,
+                    expected=expected,
+                    value=value))
+
 class MessageRequest(Message):
 
+    __slots__ = ()
+
     def __init__(self):
         Message.__init__(self)
 
@@ -214,8 +255,16 @@ class MessageRequest(Message):
 
         return sip_message
 
+    def checkx(self, received):
+        if received.message_type != received.MESSAGE_TYPE_REQUEST:
+            raise Exception('expected a request but received a response')
+
+        return [('method', self.method, received.method)]
+
 class MessageResponse(Message):
 
+    __slots__ = ()
+
     def __init__(self):
         Message.__init__(self)
 
@@ -234,8 +283,17 @@ class MessageResponse(Message):
 
         return sip_message
 
+    def checkx(self, received):
+        if received.message_type != received.MESSAGE_TYPE_RESPONSE:
+            raise Exception('expected a response but received a request')
+
+        # decoded response codes are text
+        return [('response code', str(self.response_code), str(received.response_code))]
+
 class Scenario(jobject.JObject):
 
+    __slots__ = ('agent', 'messages')
+
     KEY_AGENT    = 'agent'
     KEY_MESSAGES = 'messages'
 
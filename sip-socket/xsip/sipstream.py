@@ -0,0 +1,169 @@
+"""provides incremental decoding of SIP message streams
+
+Classes:
+    SipStreamDecoder: decodes the complete SIP messages of a fed byte stream
+
+Constants:
+    START_LINE: pattern of a request or status line
+"""
+
+
+import re
+
+import sipparser
+
+START_LINE = re.compile(br'(?:[A-Za-z]+ [^ \r\n]+ SIP/\d\.\d|SIP/\d\.\d \d{3}[ \r\n])')
+
+# Content-Length header (or its compact form) within a header block
+CONTENT_LENGTH = re.compile(br'\n(?:content-length|l)[ \t]*:[ \t]*(\d+)', re.IGNORECASE)
+
+HEADER_TERMINATORS = (b'\r\n\r\n', b'\n\n')
+
+LINE_BREAKS = (b'\r', b'\n')
+
+class SipStreamDecoder(object):
+    """SIP Stream Decoder
+
+    Bytes are fed as they are received, in chunks of any size, and every
+    message completed by a chunk is decoded. Only the incomplete tail of
+    the stream is kept. Bytes not starting a message (garbage, or a
+    message over the size limits) are discarded up to the next line
+    looking like a start line, so a single corrupt message does not
+    break the rest of the stream.
+
+    Attributes:
+        buffer: received bytes not decoded yet
+        maximum_header_size: maximum size of a start line and header block
+        maximum_body_size: maximum Content-Length
+        discarded: number of bytes discarded while resynchronizing
+        errors: number of times the decoder had to resynchronize
+        keep_raw: whether the decoded messages keep their raw bytes
+
+    Methods:
+        feed: add received bytes, return the messages they complete
+        pending: return the number of buffered bytes
+        reset: drop the buffered bytes
+    """
+
+    def __init__(self, maximum_header_size=16384, maximum_body_size=65536, keep_raw=True):
+        self.buffer              = bytearray()
+        self.maximum_header_size = maximum_header_size
+        self.maximum_body_size   = maximum_body_size
+        self.discarded           = 0
+        self.errors              = 0
+        self.keep_raw            = keep_raw
+
+    def pending(self):
+        return len(self.buffer)
+
+    def reset(self):
+        self.buffer = bytearray()
+
+    def resync(self, start):
+        """return the offset of the next start line after start,
+        or of the last incomplete line if there is none yet
+        """
+
+        self.errors += 1
+
+        end = len(self.buffer)
+        line = self.buffer.find(b'\n', start)
+
+        while line != -1:
+            match = START_LINE.match(self.buffer, line + 1)
+            if match is not None:
+                end = line + 1
+                break
+
+            # the next line is too short to tell yet
+            if self.buffer.find(b'\n', line + 1) == -1:
+                end = line + 1
+                break
+
+            line = self.buffer.find(b'\n', line + 1)
+
+        self.discarded += end - start
+        return end
+
+    def locate(self, start):
+        """return (offset of the next message, its end offset),
+        the end is -1 if the message is not complete yet
+        """
+
+        buffer = self.buffer
+        size = len(buffer)
+
+        while True:
+            # CRLFs between messages are keep-alives (RFC 5626)
+            while start < size and buffer[start:start + 1] in LINE_BREAKS:
+                start += 1
+
+            line = buffer.find(b'\n', start)
+            if line == -1:
+                if size - start > self.maximum_header_size:
+                    start = self.resync(start)
+                    continue
+                return start, -1
+
+            if START_LINE.match(buffer, start) is None:
+                start = self.resync(start)
+                continue
+
+            # the earliest empty line ends the headers
+            headers_end = -1
+            for terminator in HEADER_TERMINATORS:
+                index = buffer.find(terminator, start, start + self.maximum_header_size + len(terminator))
+                if index != -1 and (headers_end == -1 or index + len(terminator) < headers_end):
+                    headers_end = index + len(terminator)
+
+            if headers_end == -1:
+                if size - start > self.maximum_header_size:
+                    start = self.resync(start)
+                    continue
+                return start, -1
+
+            # search from the start line end, so the first header is matched too
+            match = CONTENT_LENGTH.search(buffer, line, headers_end)
+            length = int(match.group(1)) if match else 0
+
+            if length > self.maximum_body_size:
+                start = self.resync(start)
+                continue
+
+            end = headers_end + length
+            if end > size:
+                return start, -1
+
+            return start, end
+
+    def feed(self, data):
+        """add the received bytes, return the messages completed by them,
+        invalid messages are discarded
+        """
+
+        self.buffer += data
+
+        messages = []
+        start = 0
+
+        while True:
+            start, end = self.locate(start)
+            if end == -1:
+                break
+
+            message = sipparser.decode(memoryview(self.buffer)[start:end].tobytes())
+            if message is None:
+                self.errors += 1
+                self.discarded += end - start
+            else:
+                if not self.keep_raw:
+                    message.drop_raw()
+                messages.append(message)
+
+            start = end
+
+        # a single move per chunk, however many messages it completed
+        if start > 0:
+            del self.buffer[:start]
+
+        return messages
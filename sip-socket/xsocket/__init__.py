@@ -1,8 +1,40 @@
+import asyncclient
+import asyncserver
+import asyncsession
+import asynctcpclient
+import asynctcpserver
+import asyncudpclient
+import asyncudpserver
+import benchmark
+import bufferpool
+import capture
 import client
+import coroutine
+import dispatcher
+import eventloop
+import framing
+import histogram
+import iovec
+import loadgen
+import log
 import notifier
+import pool
+import prefork
+import ratelimit
+import replay
 import server
 import session
+import sessiontable
+import stats
 import tcpclient
 import tcpserver
+import timerwheel
+import tlscache
 import udpclient
 import udpserver
+import unixdgramclient
+import unixdgramserver
+import unixpath
+import unixstreamclient
+import unixstreamserver
+import writequeue
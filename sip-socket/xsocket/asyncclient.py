@@ -0,0 +1,202 @@
+"""provides the common interface of coroutine based client classes
+
+Classes:
+    AsyncClient: base class for event loop driven UDP/TCP clients
+"""
+
+
+import errno
+import socket
+import ssl
+
+import client
+import coroutine
+
+WOULD_BLOCK = (errno.EAGAIN, errno.EWOULDBLOCK)
+
+class AsyncClient(object):
+    """Base Class for event loop driven UDP/TCP Client
+
+    Unlike Client, no thread is used: every operation is a coroutine
+    run by the given event loop, so a single process can drive
+    thousands of clients at once.
+
+    Constants:
+        UDP: socket constants for UDP
+        TCP: socket constants for TCP
+        SSL_VERSION_MAP: ssl version string map
+
+    Attributes:
+        loop: driving event loop
+        protocol: protocol (UDP/TCP)
+        ip_address: server ip address
+        port: server port
+        timeout: timeout for connect/send/recv
+        address: server address object
+        socket: underlying non-blocking socket object (possibly with TLS)
+        root_socket: underlying socket object
+        sslversion: SSL/TLS version
+        maximum_trial_count: connect attemp limit
+        trial_period: wait duration between connect attempts
+        trial_count: trial_count
+
+    Coroutines:
+        connect: connect to server
+        send: send message to server
+        recv: recv from server
+        sendrecv: send to and then recv from server
+        disconnect: disconnect from server
+
+    Child Interface Coroutines:
+        connectx: connect callback
+        sendx: send callback
+        recvx: recv callback
+        closex: close callback
+
+    Internal Methods:
+        connectssl: perform non-blocking ssl handshake
+        wait_request: map a non-blocking error to a readiness wait
+    """
+
+    UDP = client.Client.UDP
+    TCP = client.Client.TCP
+
+    SSL_VERSION_MAP = client.Client.SSL_VERSION_MAP
+
+    tls_cache = client.Client.tls_cache
+
+    def __init__(self, loop, protocol, ip_address, port, timeout, sslversion, maximum_trial_count):
+        self.loop = loop
+        self.protocol = protocol
+        self.ip_address = ip_address
+        self.port = port
+        self.timeout = timeout
+        self.address = (self.ip_address, self.port)
+        self.socket = socket.socket(socket.AF_INET, self.protocol)
+        self.socket.setblocking(0)
+        self.root_socket = self.socket
+        self.sslversion = sslversion
+        self.maximum_trial_count = maximum_trial_count
+        self.trial_period = 1
+        self.trial_count = 0
+
+    def wait_request(self, error, writing=False):
+        """return the readiness wait resolving the given non-blocking error,
+        None if the error is a real failure
+        """
+
+        if isinstance(error, ssl.SSLError):
+            if error.args[0] == ssl.SSL_ERROR_WANT_READ:
+                return coroutine.Readable(self.socket, self.timeout)
+            if error.args[0] == ssl.SSL_ERROR_WANT_WRITE:
+                return coroutine.Writable(self.socket, self.timeout)
+            return None
+
+        if error.errno in WOULD_BLOCK:
+            if writing:
+                return coroutine.Writable(self.socket, self.timeout)
+            return coroutine.Readable(self.socket, self.timeout)
+
+        return None
+
+    def connectx(self):
+        """abstract connect coroutine expected to be implemented by child class
+        """
+
+        raise Exception('AsyncClient::connectx method must be implemented by child class')
+
+    def connectssl(self, sslversion):
+        """wrap socket by the shared ssl context of the given sslversion
+        and perform the handshake without blocking the loop
+        """
+
+        ssl_version = self.SSL_VERSION_MAP.get(sslversion)
+
+        if ssl_version is None:
+            raise Exception('invalid ssl version: {}'.format(sslversion))
+
+        self.socket = self.tls_cache.wrap(self.root_socket, ssl_version, self.address)
+
+        while True:
+            try:
+                self.socket.do_handshake()
+                break
+            except ssl.SSLError as error:
+                request = self.wait_request(error)
+                if request is None:
+                    raise
+                yield request
+
+        self.tls_cache.remember(self.address, sslversion, ssl_version, self.socket)
+
+    def connect(self):
+        """connect to the socket, retrying up to maximum_trial_count times
+        """
+
+        while True:
+            try:
+                yield self.connectx()
+                break
+            except socket.error as error:
+                self.trial_count += 1
+                if self.trial_count >= self.maximum_trial_count:
+                    raise Exception('maximum trial count reached\n{0}'.format(error))
+                yield coroutine.Sleep(self.trial_period)
+
+        if self.sslversion == 'all':
+            error = None
+            for sslversion in self.tls_cache.order(self.address, self.SSL_VERSION_MAP):
+                try:
+                    yield self.connectssl(sslversion)
+                    break
+                except Exception as exception:
+                    error = exception
+            else:
+                raise error
+        elif self.sslversion is not None:
+            yield self.connectssl(self.sslversion)
+
+    def sendx(self, message):
+        """abstract send coroutine expected to be implemented by child class
+        """
+
+        raise Exception('AsyncClient::sendx method must be implemented by child class')
+
+    def send(self, message):
+        """send the given message to the server
+        """
+
+        yield self.sendx(message)
+
+    def recvx(self, buffersize):
+        """abstract recv coroutine expected to be implemented by child class
+        """
+
+        raise Exception('AsyncClient::recvx method must be implemented by child class')
+
+    def recv(self, buffersize):
+        """recv from the server setting the given buffersize
+        """
+
+        message = yield self.recvx(buffersize)
+        raise coroutine.Return(message)
+
+    def sendrecv(self, message, buffersize):
+        """first send to and then recv from the server
+        """
+
+        yield self.send(message)
+        message = yield self.recv(buffersize)
+        raise coroutine.Return(message)
+
+    def closex(self):
+        """abstract close coroutine expected to be implemented by child class
+        """
+
+        raise Exception('AsyncClient::closex method must be implemented by child class')
+
+    def disconnect(self):
+        """disconnect from server
+        """
+
+        yield self.closex()
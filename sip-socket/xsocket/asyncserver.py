@@ -0,0 +1,117 @@
+import socket
+
+import coroutine
+import notifier
+import server
+
+class AsyncServer(notifier.Notifier):
+
+    UDP = server.Server.UDP
+    TCP = server.Server.TCP
+
+    WILL_START = server.Server.WILL_START
+    DID_START  = server.Server.DID_START
+
+    WILL_ACCEPT = server.Server.WILL_ACCEPT
+    DID_ACCEPT  = server.Server.DID_ACCEPT
+
+    WILL_STOP = server.Server.WILL_STOP
+    DID_STOP  = server.Server.DID_STOP
+
+    WILL_RUN = server.Server.WILL_RUN
+    DID_RUN  = server.Server.DID_RUN
+
+    EVENTS = (
+        WILL_START, DID_START,
+        WILL_ACCEPT, DID_ACCEPT,
+        WILL_STOP, DID_STOP,
+        WILL_RUN, DID_RUN,
+    )
+
+    def __init__(self, loop, protocol, port, buffersize):
+        notifier.Notifier.__init__(self)
+
+        self.loop        = loop
+        self.protocol    = protocol
+        self.port        = port
+        self.buffersize  = buffersize
+        self.socket      = socket.socket(socket.AF_INET, self.protocol)
+        self.socket.setblocking(0)
+        self.root_socket = self.socket
+        self.sessions    = {}
+        self.running     = False
+        self.task        = None
+
+    def startx(self):
+        raise Exception('AsyncServer::startx method must be implemented by child class')
+
+    def start(self):
+        self.notify_all(self.WILL_START)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind(('', self.port))
+        self.startx()
+        self.running = True
+        self.notify_all(self.DID_START)
+
+    def acceptx(self):
+        raise Exception('AsyncServer::acceptx method must be implemented by child class')
+
+    def accept(self):
+        self.notify_all(self.WILL_ACCEPT)
+        session = yield self.acceptx()
+        if session.address not in self.sessions:
+            session.register(self)
+            self.sessions[session.address] = session
+            self.servex(session)
+            self.notify_all(self.DID_ACCEPT, session)
+        raise coroutine.Return(session)
+
+    def servex(self, session):
+        raise Exception('AsyncServer::servex method must be implemented by child class')
+
+    def serve_session(self, session):
+        while self.running:
+            message = yield session.recv(self.buffersize)
+            if not message:
+                break
+
+        self.sessions.pop(session.address, None)
+        try:
+            yield session.close()
+        except socket.error:
+            pass
+
+    def loop_accept(self):
+        while self.running:
+            try:
+                yield self.accept()
+            except socket.error as error:
+                # the socket closed under a stopping accept loop
+                if self.running:
+                    print('accept error: {error}'.format(error=error))
+
+    def stop(self):
+        self.notify_all(self.WILL_STOP)
+        self.running = False
+
+        # the accept loop waits on the socket, wake it up to exit, so that
+        # the task returned by run completes and no reader is left behind
+        task = self.task
+        if task is not None and not task.done:
+            task.release()
+            self.loop.call_soon(task.step)
+
+        self.loop.remove(self.socket)
+        self.socket.close()
+        self.notify_all(self.DID_STOP)
+
+    def run(self):
+        """start the server and serve until stopped,
+        the returned task completes once the server is stopped
+        """
+
+        self.notify_all(self.WILL_RUN)
+        self.start()
+        self.task = self.loop.spawn(self.loop_accept())
+        self.task.add_done_callback(lambda task: self.notify_all(self.DID_RUN))
+        return self.task
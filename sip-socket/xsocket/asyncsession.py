@@ -0,0 +1,71 @@
+import socket
+
+import coroutine
+import notifier
+import session
+
+class AsyncSession(notifier.Notifier):
+
+    ON_SENDING      = session.Session.ON_SENDING
+    ON_SEND_SUCCESS = session.Session.ON_SEND_SUCCESS
+    ON_SEND_FAILURE = session.Session.ON_SEND_FAILURE
+
+    ON_RECVING      = session.Session.ON_RECVING
+    ON_RECV_SUCCESS = session.Session.ON_RECV_SUCCESS
+    ON_RECV_FAILURE = session.Session.ON_RECV_FAILURE
+
+    ON_CLOSING       = session.Session.ON_CLOSING
+    ON_CLOSE_SUCCESS = session.Session.ON_CLOSE_SUCCESS
+    ON_CLOSE_FAILURE = session.Session.ON_CLOSE_FAILURE
+
+    EVENTS = session.Session.EVENTS
+
+    def __init__(self, loop, connection, address):
+        notifier.Notifier.__init__(self)
+
+        self.loop       = loop
+        self.connection = connection
+        self.address    = address
+        self.timeout    = None
+
+    def sendx(self, message):
+        raise Exception('AsyncSession::sendx method must be implemented by child class')
+
+    def send(self, message):
+        self.notify_all(self.ON_SENDING, message)
+
+        try:
+            yield self.sendx(message)
+        except socket.error as error:
+            self.notify_all(self.ON_SEND_FAILURE, message, error)
+        else:
+            self.notify_all(self.ON_SEND_SUCCESS, message)
+
+    def recvx(self, buffersize):
+        raise Exception('AsyncSession::recvx method must be implemented by child class')
+
+    def recv(self, buffersize):
+        self.notify_all(self.ON_RECVING, buffersize)
+
+        try:
+            message = yield self.recvx(buffersize)
+        except socket.error as error:
+            self.notify_all(self.ON_RECV_FAILURE, buffersize, error)
+            raise coroutine.Return(None)
+
+        self.notify_all(self.ON_RECV_SUCCESS, buffersize, message)
+        raise coroutine.Return(message)
+
+    def closex(self):
+        raise Exception('AsyncSession::closex method must be implemented by child class')
+
+    def close(self):
+        self.notify_all(self.ON_CLOSING)
+
+        try:
+            yield self.closex()
+        except socket.error as error:
+            self.notify_all(self.ON_CLOSE_FAILURE, error)
+            raise
+        else:
+            self.notify_all(self.ON_CLOSE_SUCCESS)
@@ -0,0 +1,52 @@
+import errno
+import os
+import socket
+
+import asyncclient
+import coroutine
+
+CONNECTING = (errno.EINPROGRESS, errno.EALREADY, errno.EWOULDBLOCK)
+
+class AsyncClient(asyncclient.AsyncClient):
+
+    def __init__(self, loop, ip, port, timeout, sslversion, maximum_trial_count):
+        asyncclient.AsyncClient.__init__(self, loop, self.TCP, ip, port, timeout, sslversion, maximum_trial_count)
+
+    def connectx(self):
+        code = self.socket.connect_ex(self.address)
+
+        if code in CONNECTING:
+            yield coroutine.Writable(self.socket, self.timeout)
+            code = self.socket.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+
+        if code not in (0, errno.EISCONN):
+            raise socket.error(code, os.strerror(code))
+
+    def sendx(self, message):
+        offset = 0
+        while offset < len(message):
+            try:
+                offset += self.socket.send(message[offset:] if offset else message)
+            except socket.error as error:
+                request = self.wait_request(error, writing=True)
+                if request is None:
+                    raise
+                yield request
+
+    def recvx(self, buffersize):
+        while True:
+            try:
+                message = self.socket.recv(buffersize)
+                break
+            except socket.error as error:
+                request = self.wait_request(error)
+                if request is None:
+                    raise
+                yield request
+
+        raise coroutine.Return(message)
+
+    def closex(self):
+        self.socket.close()
+        return
+        yield
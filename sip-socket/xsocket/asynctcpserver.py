@@ -0,0 +1,63 @@
+import socket
+
+import asyncclient
+import asyncserver
+import asyncsession
+import coroutine
+
+class AsyncSession(asyncsession.AsyncSession):
+
+    def __init__(self, loop, connection, address):
+        asyncsession.AsyncSession.__init__(self, loop, connection, address)
+
+    def sendx(self, message):
+        offset = 0
+        while offset < len(message):
+            try:
+                offset += self.connection.send(message[offset:] if offset else message)
+            except socket.error as error:
+                if error.errno not in asyncclient.WOULD_BLOCK:
+                    raise
+                yield coroutine.Writable(self.connection, self.timeout)
+
+    def recvx(self, buffersize):
+        while True:
+            try:
+                message = self.connection.recv(buffersize)
+                break
+            except socket.error as error:
+                if error.errno not in asyncclient.WOULD_BLOCK:
+                    raise
+                yield coroutine.Readable(self.connection, self.timeout)
+
+        raise coroutine.Return(message)
+
+    def closex(self):
+        self.loop.remove(self.connection)
+        self.connection.close()
+        return
+        yield
+
+class AsyncServer(asyncserver.AsyncServer):
+
+    def __init__(self, loop, port, buffersize):
+        asyncserver.AsyncServer.__init__(self, loop, self.TCP, port, buffersize)
+
+    def startx(self):
+        self.socket.listen(socket.SOMAXCONN)
+
+    def acceptx(self):
+        while True:
+            try:
+                connection, address = self.socket.accept()
+                break
+            except socket.error as error:
+                if error.errno not in asyncclient.WOULD_BLOCK:
+                    raise
+                yield coroutine.Readable(self.socket)
+
+        connection.setblocking(0)
+        raise coroutine.Return(AsyncSession(self.loop, connection, address))
+
+    def servex(self, session):
+        self.loop.spawn(self.serve_session(session))
@@ -0,0 +1,42 @@
+import socket
+
+import asyncclient
+import coroutine
+
+class AsyncClient(asyncclient.AsyncClient):
+
+    def __init__(self, loop, ip, port, timeout, sslversion, maximum_trial_count):
+        asyncclient.AsyncClient.__init__(self, loop, self.UDP, ip, port, timeout, sslversion, maximum_trial_count)
+
+    def connectx(self):
+        return
+        yield
+
+    def sendx(self, message):
+        while True:
+            try:
+                self.socket.sendto(message, self.address)
+                break
+            except socket.error as error:
+                request = self.wait_request(error, writing=True)
+                if request is None:
+                    raise
+                yield request
+
+    def recvx(self, buffersize):
+        while True:
+            try:
+                message, address = self.socket.recvfrom(buffersize)
+                break
+            except socket.error as error:
+                request = self.wait_request(error)
+                if request is None:
+                    raise
+                yield request
+
+        raise coroutine.Return(message)
+
+    def closex(self):
+        self.socket.close()
+        return
+        yield
@@ -0,0 +1,68 @@
+import socket
+
+import asyncclient
+import asyncserver
+import asyncsession
+import coroutine
+
+class AsyncSession(asyncsession.AsyncSession):
+
+    def __init__(self, loop, connection, address):
+        asyncsession.AsyncSession.__init__(self, loop, connection, address)
+
+        # last datagram received by the server for this session
+        self.datagram = None
+
+    def sendx(self, message):
+        while True:
+            try:
+                self.connection.sendto(message, self.address)
+                break
+            except socket.error as error:
+                if error.errno not in asyncclient.WOULD_BLOCK:
+                    raise
+                yield coroutine.Writable(self.connection, self.timeout)
+
+    def recvx(self, buffersize):
+        raise Exception('AsyncSession::recvx datagrams are received by the server')
+
+    def closex(self):
+        return
+        yield
+
+class AsyncServer(asyncserver.AsyncServer):
+
+    def __init__(self, loop, port, buffersize):
+        asyncserver.AsyncServer.__init__(self, loop, self.UDP, port, buffersize)
+
+    def startx(self):
+        pass
+
+    def acceptx(self):
+        while True:
+            try:
+                message, address = self.socket.recvfrom(self.buffersize)
+                break
+            except socket.error as error:
+                if error.errno not in asyncclient.WOULD_BLOCK:
+                    raise
+                yield coroutine.Readable(self.socket)
+
+        if address in self.sessions:
+            session = self.sessions[address]
+        else:
+            session = AsyncSession(self.loop, self.socket, address)
+
+        session.datagram = message
+        raise coroutine.Return(session)
+
+    def accept(self):
+        # notify once the session is registered, so the server observes
+        # the very first datagram of a new session as well
+        session = yield asyncserver.AsyncServer.accept(self)
+        session.notify_all(session.ON_RECV_SUCCESS, self.buffersize, session.datagram)
+        raise coroutine.Return(session)
+
+    def servex(self, session):
+        # datagrams of all sessions are received by the accept loop
+        pass
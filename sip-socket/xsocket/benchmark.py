@@ -0,0 +1,315 @@
+"""provides a loopback benchmark of the xsocket transports
+
+Every transport gets an echo server on loopback, driven by a matching
+client. For every payload size the client measures the message and
+byte rates and the round trip times, stream transports also measure
+the connection setup rate. The results are plain data, so they can be
+written as json and compared with the results of another commit.
+
+Classes:
+    Echo: server observer echoing every received message
+    Benchmark: runs the cases and collects the results
+
+Functions:
+    sip_message: build a SIP request of the given size
+    report: print a single result
+    compare: compare the results with a baseline
+"""
+
+
+import platform
+import socket
+import threading
+import time
+
+import histogram
+import tcpclient
+import tcpserver
+import udpclient
+import udpserver
+
+INTRO = '{method} sip:b@127.0.0.1 SIP/2.0'
+
+HEADERS = [
+    'Via: SIP/2.0/TCP 127.0.0.1;branch=z9hG4bK7',
+    'To: <sip:b@127.0.0.1>',
+    'From: <sip:a@127.0.0.1>;tag=9fx',
+    'Call-ID: 38482762{padding}@127.0.0.1',
+    'CSeq: 1 {method}',
+]
+
+SDP = [
+    'v=0',
+    'o=load 2890844526 2890844526 IN IP4 127.0.0.1',
+    's=-',
+    'c=IN IP4 127.0.0.1',
+    't=0 0',
+    'm=audio 49170 RTP/AVP 0 8 97',
+    'a=rtpmap:0 PCMU/8000',
+    'a=rtpmap:8 PCMA/8000',
+    'a=rtpmap:97 iLBC/8000',
+]
+
+NEW_LINE = '\r\n'
+
+def build(method, padding):
+    # OPTIONS are padded by the Call-ID, INVITEs by an SDP attribute
+    if method == 'OPTIONS':
+        headers = HEADERS
+        body = ''
+    else:
+        headers = HEADERS + ['Content-Type: application/sdp']
+        body = NEW_LINE.join(SDP + ['a=x-padding:' + 'x' * padding]) + NEW_LINE
+
+    lines = [INTRO] + headers + ['Content-Length: {0}'.format(len(body)), '', '']
+
+    header = NEW_LINE.join(lines).format(method=method, padding='x' * padding if method == 'OPTIONS' else '')
+
+    return header + body
+
+def sip_message(size):
+    """build an OPTIONS request, or an INVITE with SDP once it fits in,
+    padded up to the given size
+    """
+
+    method = 'INVITE' if len(build('INVITE', 0)) <= size else 'OPTIONS'
+
+    padding = 0
+    message = build(method, padding)
+
+    # a longer body may add a digit to the Content-Length, so correct twice
+    for i in range(3):
+        padding = max(0, padding + size - len(message))
+        message = build(method, padding)
+
+    return message
+
+class Echo(object):
+    """Server observer echoing every received message back to its session
+    """
+
+    def __init__(self):
+        self.started = threading.Event()
+
+    def did_start(self, server):
+        self.started.set()
+
+    def did_accept(self, server, session):
+        session.register(self)
+
+    def on_recv_success(self, session, buffersize, message):
+        if message:
+            session.send(message)
+
+class Benchmark(object):
+    """Loopback Benchmark
+
+    Attributes:
+        port: port of the echo servers
+        buffersize: recv buffer size, large enough for the largest payload
+        timeout: client timeout, a lost datagram costs that much
+        sizes: payload sizes in bytes
+        transports: 'udp', 'tcp' and/or 'tls'
+        duration: seconds of message exchange per case
+        warmup: messages exchanged before measuring
+        connections: connections set up per stream case
+        certfile: certificate of the tls server
+        keyfile: private key of the tls server
+        sslversion: ssl/tls version of the tls client
+        results: results of the cases run so far
+
+    Methods:
+        run: run every case and return the results
+        run_transport: run the cases of a single transport
+        measure_messages: measure message rates and round trip times
+        measure_connections: measure the connection setup rate
+    """
+
+    TRANSPORTS = ('udp', 'tcp', 'tls')
+
+    def __init__(self, port, sizes, transports=TRANSPORTS):
+        self.port        = port
+        self.buffersize  = 8192
+        self.timeout     = 1
+        self.sizes       = sizes
+        self.transports  = transports
+        self.duration    = 2.0
+        self.warmup      = 100
+        self.connections = 200
+        self.certfile    = None
+        self.keyfile     = None
+        self.sslversion  = 'tlsv12'
+        self.results     = []
+
+    def create_server(self, transport):
+        if transport == 'udp':
+            server = udpserver.Server(self.port, self.buffersize, False, False)
+        else:
+            server = tcpserver.Server(self.port, self.buffersize, False, False)
+            server.use_framing()
+            if transport == 'tls':
+                server.use_tls(self.certfile, self.keyfile)
+
+        server.use_eventloop()
+
+        return server
+
+    def create_client(self, transport):
+        if transport == 'udp':
+            client = udpclient.Client('127.0.0.1', self.port, self.timeout, False, False, False, None, 1)
+        else:
+            sslversion = self.sslversion if transport == 'tls' else None
+            client = tcpclient.Client('127.0.0.1', self.port, self.timeout, False, False, False, sslversion, 1)
+            client.loop_buffersize = self.buffersize
+            client.use_framing()
+
+        return client
+
+    def measure_messages(self, transport, message):
+        client = self.create_client(transport)
+        client.connect()
+
+        for i in range(self.warmup):
+            client.send(message)
+            client.recv(self.buffersize)
+
+        rtt = histogram.Histogram()
+        errors = 0
+
+        started = time.time()
+        deadline = started + self.duration
+
+        while time.time() < deadline:
+            sent = time.time()
+            try:
+                client.send(message)
+                response = client.recv(self.buffersize)
+            except socket.error:
+                errors += 1
+                continue
+
+            if len(response) != len(message):
+                errors += 1
+                continue
+
+            rtt.record((time.time() - sent) * 1000000)
+
+        elapsed = time.time() - started
+
+        client.disconnect()
+
+        return {
+            'messages'            : rtt.count,
+            'errors'              : errors,
+            'elapsed'             : elapsed,
+            'messages_per_second' : rtt.count / elapsed,
+            'bytes_per_second'    : rtt.count * len(message) / elapsed,
+            'rtt_us'              : rtt.summary(),
+        }
+
+    def measure_connections(self, transport):
+        setup = histogram.Histogram()
+
+        started = time.time()
+
+        for i in range(self.connections):
+            connecting = time.time()
+            client = self.create_client(transport)
+            client.connect()
+            setup.record((time.time() - connecting) * 1000000)
+            client.disconnect()
+
+        elapsed = time.time() - started
+
+        return {
+            'connections'            : setup.count,
+            'connections_per_second' : setup.count / elapsed,
+            'setup_us'               : setup.summary(),
+        }
+
+    def run_transport(self, transport):
+        echo = Echo()
+
+        server = self.create_server(transport)
+        server.register(echo)
+
+        thread = threading.Thread(target=server.run)
+        thread.start()
+
+        results = []
+
+        try:
+            if not echo.started.wait(self.timeout * 5):
+                raise Exception('{transport} server did not start'.format(transport=transport))
+
+            for size in self.sizes:
+                message = sip_message(size)
+
+                result = {
+                    'transport' : transport,
+                    'size'      : len(message),
+                    'method'    : message.split(' ', 1)[0],
+                }
+                result.update(self.measure_messages(transport, message))
+
+                if transport != 'udp':
+                    result.update(self.measure_connections(transport))
+
+                report(result)
+                results.append(result)
+        finally:
+            server.stop()
+            thread.join()
+
+        return results
+
+    def run(self):
+        for transport in self.transports:
+            if transport == 'tls' and self.certfile is None:
+                print('tls skipped, no certificate file given')
+                continue
+
+            self.results.extend(self.run_transport(transport))
+
+        return {
+            'time'     : time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python'   : platform.python_version(),
+            'platform' : platform.platform(),
+            'duration' : self.duration,
+            'results'  : self.results,
+        }
+
+def report(result):
+    line = '{transport:<4} {method:<7} {size:>6}B {messages_per_second:>10.1f} msg/s {bytes_per_second:>12.1f} B/s rtt(us) p50: {p50} p99: {p99} p999: {p999}'.format(
+        p50=result['rtt_us']['p50'],
+        p99=result['rtt_us']['p99'],
+        p999=result['rtt_us']['p999'],
+        **result)
+
+    if 'connections_per_second' in result:
+        line += ' setup: {0:.1f} conn/s'.format(result['connections_per_second'])
+
+    print(line)
+
+def compare(baseline, current):
+    """print the relative change of the message rate, p99 round trip
+    time and connection setup rate of every case found in both results
+    """
+
+    cases = dict(((result['transport'], result['size']), result) for result in baseline['results'])
+
+    for result in current['results']:
+        old = cases.get((result['transport'], result['size']))
+        if old is None:
+            continue
+
+        changes = [
+            ('msg/s', old['messages_per_second'], result['messages_per_second']),
+            ('p99', old['rtt_us']['p99'], result['rtt_us']['p99']),
+        ]
+        if 'connections_per_second' in result and 'connections_per_second' in old:
+            changes.append(('conn/s', old['connections_per_second'], result['connections_per_second']))
+
+        print('{transport:<4} {size:>6}B '.format(**result) + ' '.join(
+            '{name}: {change:+.1f}%'.format(name=name, change=(new - old_value) * 100.0 / old_value if old_value else 0)
+            for name, old_value, new in changes))
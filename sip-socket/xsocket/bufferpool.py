@@ -0,0 +1,95 @@
+"""provides a pool of recycled receive buffers
+
+Classes:
+    PooledBuffer: bytearray borrowed from a pool
+    BufferPool: fixed size bytearrays borrowed and returned by receivers
+
+Functions:
+    is_pooled: return whether a buffer may be a recycled pooled buffer
+"""
+
+
+import collections
+import threading
+
+class PooledBuffer(bytearray):
+    """bytearray borrowed from a pool, told apart from the buffers of the handlers
+    """
+
+    __slots__ = ()
+
+def is_pooled(buffer):
+    """return whether the buffer is a pooled buffer or a view of one,
+    python 2 memoryviews do not expose their object, so they all may be
+    """
+
+    if isinstance(buffer, memoryview):
+        buffer = getattr(buffer, 'obj', None)
+        if buffer is None:
+            return True
+
+    return isinstance(buffer, PooledBuffer)
+
+class BufferPool(object):
+    """Receive Buffer Pool
+
+    Receivers borrow a buffer, receive into it and hand a memoryview of
+    the received bytes to the handlers, then return the buffer once the
+    handlers are done with it. Handlers keeping a message beyond their
+    call have to copy it. A buffer larger than the pool size, or one
+    borrowed while the pool is empty, is allocated and counted as a miss.
+    Returned buffers beyond the capacity, or of another size, are dropped.
+
+    Attributes:
+        size: size of the pooled buffers
+        capacity: maximum number of idle buffers kept
+        buffers: idle buffers
+        borrowed: number of buffers currently borrowed
+        hits: number of borrows served from the pool
+        misses: number of borrows allocating a new buffer
+        lock: guards the idle buffers, sessions receive on any thread
+
+    Methods:
+        borrow: return a buffer of at least the given size
+        release: return a borrowed buffer
+        stats: return the hit, miss and occupancy counts
+    """
+
+    def __init__(self, size, capacity=256):
+        self.size     = size
+        self.capacity = capacity
+        self.buffers  = collections.deque()
+        self.borrowed = 0
+        self.hits     = 0
+        self.misses   = 0
+        self.lock     = threading.Lock()
+
+    def borrow(self, size=None):
+        with self.lock:
+            self.borrowed += 1
+
+            if (size is None or size <= self.size) and self.buffers:
+                self.hits += 1
+                return self.buffers.pop()
+
+            self.misses += 1
+
+        return PooledBuffer(max(size or 0, self.size))
+
+    def release(self, buffer):
+        with self.lock:
+            self.borrowed -= 1
+
+            if len(buffer) == self.size and len(self.buffers) < self.capacity:
+                self.buffers.append(buffer)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'size'      : self.size,
+                'capacity'  : self.capacity,
+                'available' : len(self.buffers),
+                'borrowed'  : self.borrowed,
+                'hits'      : self.hits,
+                'misses'    : self.misses,
+            }
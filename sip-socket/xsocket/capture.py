@@ -0,0 +1,182 @@
+"""provides a compact binary capture of the traffic
+
+A capture file starts with a magic string followed by records of
+
+    timestamp (double), direction (byte), peer host length (byte),
+    peer port (unsigned short), message length (unsigned int),
+    peer host, message
+
+in little endian, so a capture is appended with a single write per
+message and read back through mmap without copying the messages.
+
+Constants:
+    RECEIVED: direction of received messages
+    SENT: direction of sent messages
+
+Classes:
+    Writer: appends records to a capture file
+    Capture: session observer capturing the traffic of a server
+    Reader: iterates the records of a capture file
+"""
+
+
+import mmap
+import struct
+import threading
+import time
+
+import iovec
+
+MAGIC = b'XSCAP001'
+
+RECORD = struct.Struct('<dBBHI')
+
+RECEIVED = 0
+SENT     = 1
+
+DIRECTIONS = {
+    'received' : RECEIVED,
+    'sent'     : SENT,
+}
+
+class Writer(object):
+    """Capture Writer
+
+    Attributes:
+        path: capture file path
+        file: capture file opened for appending
+        lock: serializes the records of concurrent sessions
+        count: number of records written
+        flush_period: seconds the records stay buffered at most,
+            while records keep coming
+        flushed: time of the last flush
+
+    Methods:
+        write: append a record
+        flush: flush the buffered records
+        close: flush and close the file
+    """
+
+    def __init__(self, path):
+        self.path  = path
+        self.file  = open(path, 'ab')
+        self.lock  = threading.Lock()
+        self.count = 0
+
+        self.flush_period = 1.0
+        self.flushed      = time.time()
+
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+            self.file.flush()
+
+    def write(self, direction, address, message):
+        # unix datagram peers are addressed by their socket path
+        if not isinstance(address, tuple):
+            address = (address or '', 0)
+
+        host = iovec.to_bytes(address[0])
+        message = iovec.to_bytes(iovec.join(message))
+
+        now = time.time()
+        header = RECORD.pack(now, direction, len(host), address[1], len(message))
+
+        with self.lock:
+            # sessions may still be sending while the server stops
+            if self.file.closed:
+                return
+            self.file.write(header + host + message)
+            self.count += 1
+
+            if now - self.flushed >= self.flush_period:
+                self.file.flush()
+                self.flushed = now
+
+    def flush(self):
+        with self.lock:
+            self.file.flush()
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+class Capture(object):
+    """Session observer writing the sent and received messages to a capture,
+    registered by the server on every session it admits
+    """
+
+    def __init__(self, writer):
+        self.writer = writer
+
+    def on_send_success(self, session, message):
+        self.writer.write(SENT, session.address, message)
+
+    def on_recv_success(self, session, buffersize, message):
+        # an empty message only reports a closed connection
+        if message:
+            self.writer.write(RECEIVED, session.address, message)
+
+class Reader(object):
+    """Capture Reader
+
+    Records are yielded as (timestamp, direction, (host, port), message)
+    where message is a memoryview (a buffer on python 2) of the mapped file,
+    valid until close.
+
+    Attributes:
+        path: capture file path
+        file: capture file
+        map: read-only mapping of the file
+
+    Methods:
+        records: iterate the records
+        close: release the mapping
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.map  = None
+
+        # an empty file cannot be mapped
+        if self.file.read(len(MAGIC)) != MAGIC:
+            self.file.close()
+            raise Exception('not a capture file: {path}'.format(path=path))
+
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def records(self):
+        # python 2 maps only expose the old buffer interface
+        try:
+            view = memoryview(self.map)
+        except TypeError:
+            view = None
+        offset = len(MAGIC)
+        end = len(self.map)
+
+        while offset + RECORD.size <= end:
+            timestamp, direction, host_length, port, length = RECORD.unpack_from(self.map, offset)
+            offset += RECORD.size
+
+            host = self.map[offset:offset + host_length].decode()
+            offset += host_length
+
+            # a record cut short by a crash ends the capture
+            if offset + length > end:
+                break
+
+            if view is not None:
+                yield timestamp, direction, (host, port), view[offset:offset + length]
+            else:
+                yield timestamp, direction, (host, port), buffer(self.map, offset, length)
+            offset += length
+
+    def close(self):
+        if self.map is not None:
+            # still referenced message views keep the mapping until collected
+            try:
+                self.map.close()
+            except BufferError:
+                pass
+            self.map = None
+        self.file.close()
@@ -5,19 +5,34 @@ Classes:
 """
 
 
+import logging
 import socket
 import ssl
 import sys
 import threading
 import time
 
+import capture
+import framing
+import iovec
+import log
+import timerwheel
+import tlscache
+
+logger = log.get_logger('client')
+
+def first_line(message):
+    return message.split(b'\n', 1)[0].rstrip()
+
 class Client(object):
     """Base Class for UDP/TCP Client
 
     Constants:
         UDP: socket constants for UDP
         TCP: socket constants for TCP
+        FAMILY: address family of the socket
         SSL_VERSION_MAP: ssl version string map
+        tls_cache: TLS contexts, sessions and versions shared by all clients
 
     Attributes:
         protocol: protocol (UDP/TCP)
@@ -41,10 +56,16 @@ class Client(object):
         recv_thread: recv_thread
         sendrecv_thread: sendrecv_thread
         trial_count: trial_count
+        framer: splits the received stream into SIP messages, if enabled
+        timer_wheel: runs the send/sendrecv/keep-alive loops, if enabled
+        keepalive_period: period of the keep-alive pings (with a timer wheel)
+        timers: timers of the loops
+        done: set once a loop running on the timer wheel failed
+        capture: writer of the sent and received messages, if enabled
 
     Methods:
         connect: connect to server
-        send: send message to server
+        send: send message (or sequence of buffers) to server
         send_loop: send periodically
         recv: recv from server
         recv_loop: recv periodically
@@ -52,19 +73,27 @@ class Client(object):
         sendrecv_loop: sendrecv periodically
         disconnect: disconnect from server
         run: run the client as configured
+        use_framing: receive exactly one complete SIP message per recv
+        use_timer_wheel: run the periodic loops as timers of a shared wheel
+        use_capture: append the sent and received messages to a capture file
 
     Child Interface Methods:
         connectx: connect callback
         sendx: send callback
+        sendvx: scatter-gather send callback
         recvx: recv callback
 
     Internal Methods:
         connectssl: perform ssl wrapping
+        loop_timer: run a function periodically on the timer wheel
+        run_timers: run the enabled loops on the timer wheel
     """
 
     UDP = socket.SOCK_DGRAM
     TCP = socket.SOCK_STREAM
 
+    FAMILY = socket.AF_INET
+
     SSL_VERSION_MAP = {
         #"tls"      : ssl.PROTOCOL_TLS,
         #"tlsclient": ssl.PROTOCOL_TLS_CLIENT,
@@ -77,18 +106,23 @@ class Client(object):
         "tlsv12"   : ssl.PROTOCOL_TLSv1_2,
     }
 
+    tls_cache = tlscache.TlsCache()
+
+    # double CRLF keep-alive ping (RFC 5626)
+    KEEPALIVE = framing.KEEPALIVE * 2
+
     def __init__(
             self, protocol, ip_address, port, timeout,
             sendloop, recvloop, sendrecvloop,
             sslversion, maximum_trial_count):
-        print('client configuring...')
+        logger.info('client configuring...')
 
         self.protocol = protocol
         self.ip_address = ip_address
         self.port = port
         self.timeout = timeout
         self.address = (self.ip_address, self.port)
-        self.socket = socket.socket(socket.AF_INET, self.protocol)
+        self.socket = socket.socket(self.FAMILY, self.protocol)
         self.root_socket = self.socket
         self.sslversion = sslversion
         self.maximum_trial_count = maximum_trial_count
@@ -110,6 +144,35 @@ class Client(object):
 
         self.trial_count = 0
 
+        self.framer = None
+
+        self.timer_wheel = None
+        self.keepalive_period = None
+        self.timers = []
+        self.done = threading.Event()
+
+        self.capture = None
+
+    def use_framing(self):
+        """make recv return exactly one complete SIP message,
+        only meaningful for stream transports
+        """
+
+        self.framer = framing.StreamFramer(self.loop_buffersize)
+
+    def use_timer_wheel(self, wheel=None):
+        """run the send, sendrecv and keep-alive loops as timers of the given
+        (by default the shared) timer wheel instead of sleeping threads
+        """
+
+        self.timer_wheel = wheel or timerwheel.shared()
+
+    def use_capture(self, path):
+        """append every message sent and received to the given capture file
+        """
+
+        self.capture = capture.Writer(path)
+
     def connectx(self):
         """abstract connect method expected to be implemented by child class
         """
@@ -117,7 +180,8 @@ class Client(object):
         raise Exception('Client::connectx method must be implemented by child class')
 
     def connectssl(self, sslversion):
-        """wrap socket by ssl context with the given sslversion
+        """wrap socket by the shared ssl context of the given sslversion,
+        resuming the last tls session with the server if any
         """
 
         ssl_version = self.SSL_VERSION_MAP.get(sslversion)
@@ -125,12 +189,7 @@ class Client(object):
         if ssl_version is None:
             raise Exception('invalid ssl version: {}'.format(sslversion))
 
-        self.socket = ssl.wrap_socket(
-            self.root_socket,
-            ssl_version=ssl_version,
-            do_handshake_on_connect=False,
-            suppress_ragged_eofs=False,
-            ciphers='AES128-SHA256')
+        self.socket = self.tls_cache.wrap(self.root_socket, ssl_version, self.address)
 
         try:
             self.socket.do_handshake()
@@ -141,11 +200,13 @@ class Client(object):
             print('socket error')
             sys.exit(error)
 
+        self.tls_cache.remember(self.address, sslversion, ssl_version, self.socket)
+
     def connect(self):
         """connect to the socket
         """
 
-        print('client connecting...')
+        logger.info('client connecting...')
 
         if self.sslversion is None:
             self.socket.settimeout(self.timeout)
@@ -167,7 +228,7 @@ class Client(object):
         if self.sslversion == 'all':
             connected = False
             error = None
-            for sslversion in self.SSL_VERSION_MAP:
+            for sslversion in self.tls_cache.order(self.address, self.SSL_VERSION_MAP):
                 try:
                     self.connectssl(sslversion)
                     connected = True
@@ -179,7 +240,7 @@ class Client(object):
         elif self.sslversion is not None:
             self.connectssl(self.sslversion)
 
-        print('client connected')
+        logger.info('client connected')
 
     def sendx(self, message):
         """abstract send method expected to be implemented by child class
@@ -187,13 +248,28 @@ class Client(object):
 
         raise Exception('Client::sendx method must be implemented by child class')
 
+    def sendvx(self, buffers):
+        """send the given buffers, joined unless overridden by child class
+        """
+
+        self.sendx(iovec.join(buffers))
+
     def send(self, message):
-        """send the given message to the server
+        """send the given message to the server, a sequence of buffers
+        (e.g. header block and body) is sent without joining them
         """
 
-        self.sendx(message)
-        print('send ({length})'.format(length=len(message)))
-        print(message.splitlines()[0])
+        if iovec.is_buffers(message):
+            self.sendvx(message)
+        else:
+            self.sendx(message)
+
+        if self.capture is not None:
+            self.capture.write(capture.SENT, self.address, message)
+
+        # nothing is formatted unless debug logging is enabled
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('send (%d)\n%s', iovec.length(message), first_line(iovec.join(message)))
 
     def send_loop(self):
         """send the loop message to the server periodically
@@ -218,8 +294,12 @@ class Client(object):
         """
 
         message = self.recvx(buffersize)
-        print('recv ({length})'.format(length=len(message)))
-        print(message.splitlines()[0])
+
+        if self.capture is not None and message:
+            self.capture.write(capture.RECEIVED, self.address, message)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('recv (%d)\n%s', len(message), first_line(message))
 
         return message
 
@@ -254,12 +334,54 @@ class Client(object):
                 break
             time.sleep(self.loop_period_sendrecv)
 
+    def loop_timer(self, name, period, function, *args):
+        """call the function periodically on the timer wheel,
+        a failure stops the client just like it stops a loop thread
+        """
+
+        def tick():
+            try:
+                function(*args)
+            except Exception as error:
+                print('{name} error: {error}'.format(name=name, error=error))
+                self.done.set()
+
+        self.timers.append(self.timer_wheel.call_every(period, tick))
+
+    def run_timers(self):
+        """start the enabled loops on the timer wheel and wait until one fails,
+        receiving still needs its own thread as recv blocks
+        """
+
+        if self.enable_send_loop:
+            self.loop_timer('send_loop', self.loop_period_send, self.send, self.loop_message)
+        if self.enable_sendrecv_loop:
+            self.loop_timer('sendrecv_loop', self.loop_period_sendrecv, self.sendrecv)
+        if self.keepalive_period:
+            self.loop_timer('keepalive', self.keepalive_period, self.send, self.KEEPALIVE)
+
+        if self.enable_recv_loop:
+            self.recv_thread.start()
+
+        if self.timers:
+            # waits with a timeout, so that the main thread stays interruptible
+            while not self.done.wait(1):
+                pass
+            for timer in self.timers:
+                timer.cancel()
+            self.timers = []
+
+        if self.enable_recv_loop:
+            self.recv_thread.join()
+
     def disconnect(self):
         """disconnect from server
         """
 
-        print('client disconnecting...')
+        logger.info('client disconnecting...')
         self.socket.close()
+        if self.capture is not None:
+            self.capture.close()
 
     def run(self):
         """connect to the server
@@ -268,6 +390,10 @@ class Client(object):
         """
 
         self.connect()
+        if self.timer_wheel is not None:
+            self.run_timers()
+            self.disconnect()
+            return
         if self.enable_send_loop:
             self.send_thread.start()
         if self.enable_recv_loop:
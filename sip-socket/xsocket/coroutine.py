@@ -0,0 +1,173 @@
+"""provides generator based coroutines driven by the xsocket event loop
+
+A coroutine is a generator yielding what it waits for:
+
+    yield coroutine.Readable(sock, timeout)
+    yield coroutine.Writable(sock, timeout)
+    yield coroutine.Sleep(seconds)
+    result = yield another_coroutine()
+    result = yield task
+
+and returning its result by raising coroutine.Return(value).
+
+Classes:
+    Return: carries the result of a coroutine
+    Readable: wait until the socket is readable
+    Writable: wait until the socket is writable
+    Sleep: wait for the given duration
+    Task: runs a coroutine on an event loop
+
+Functions:
+    is_coroutine: check whether the given object is a coroutine
+"""
+
+
+import socket
+import sys
+import types
+
+class Return(Exception):
+
+    def __init__(self, value=None):
+        Exception.__init__(self, value)
+        self.value = value
+
+class Readable(object):
+
+    def __init__(self, fileobj, timeout=None):
+        self.fileobj = fileobj
+        self.timeout = timeout
+
+class Writable(object):
+
+    def __init__(self, fileobj, timeout=None):
+        self.fileobj = fileobj
+        self.timeout = timeout
+
+class Sleep(object):
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+def is_coroutine(obj):
+    return isinstance(obj, types.GeneratorType)
+
+class Task(object):
+    """Coroutine Task
+
+    Attributes:
+        loop: driving event loop
+        stack: generators of the coroutine and its nested coroutines
+        done: coroutine has completed
+        result: value returned by the coroutine
+        error: exception raised by the coroutine
+        callbacks: functions to call with the task on completion
+        waiting: socket the task is waiting for and its remover
+        timer: pending timer of the task
+
+    Methods:
+        step: resume the coroutine with a value or an exception
+        add_done_callback: call the function when the task completes
+    """
+
+    def __init__(self, loop, generator):
+        self.loop      = loop
+        self.stack     = [generator]
+        self.done      = False
+        self.result    = None
+        self.error     = None
+        self.callbacks = []
+        self.waiting   = None
+        self.timer     = None
+
+    def add_done_callback(self, callback):
+        if self.done:
+            callback(self)
+        else:
+            self.callbacks.append(callback)
+
+    def step(self, value=None, error=None):
+        while self.stack:
+            generator = self.stack[-1]
+
+            try:
+                if error is not None:
+                    request = generator.throw(error)
+                else:
+                    request = generator.send(value)
+            except Return as result:
+                self.stack.pop()
+                value, error = result.value, None
+                continue
+            except StopIteration as stop:
+                self.stack.pop()
+                value, error = getattr(stop, 'value', None), None
+                continue
+            except Exception as exception:
+                self.stack.pop()
+                value, error = None, exception
+                continue
+
+            value, error = None, None
+
+            if is_coroutine(request):
+                self.stack.append(request)
+            elif isinstance(request, Task):
+                request.add_done_callback(self.on_task_done)
+                return
+            elif isinstance(request, Readable):
+                self.wait(request, self.loop.add_reader, self.loop.remove_reader)
+                return
+            elif isinstance(request, Writable):
+                self.wait(request, self.loop.add_writer, self.loop.remove_writer)
+                return
+            elif isinstance(request, Sleep):
+                self.timer = self.loop.call_later(request.seconds, self.on_timer)
+                return
+            else:
+                error = TypeError('unsupported coroutine request: {request}'.format(request=request))
+
+        self.finish(value, error)
+
+    def wait(self, request, add, remove):
+        self.waiting = (request.fileobj, remove)
+        add(request.fileobj, self.on_ready)
+        if request.timeout is not None:
+            self.timer = self.loop.call_later(request.timeout, self.on_timeout)
+
+    def release(self):
+        if self.waiting is not None:
+            fileobj, remove = self.waiting
+            self.waiting = None
+            remove(fileobj)
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    def on_ready(self):
+        self.release()
+        self.step()
+
+    def on_timer(self):
+        self.timer = None
+        self.step()
+
+    def on_timeout(self):
+        self.timer = None
+        self.release()
+        self.step(error=socket.timeout('timed out'))
+
+    def on_task_done(self, task):
+        self.step(task.result, task.error)
+
+    def finish(self, result, error):
+        self.done   = True
+        self.result = result
+        self.error  = error
+
+        if error is not None and not self.callbacks:
+            sys.stderr.write('task error: {error}\n'.format(error=error))
+
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback(self)
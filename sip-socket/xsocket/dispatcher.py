@@ -0,0 +1,100 @@
+"""provides background delivery of notifier events
+
+Classes:
+    Dispatcher: delivers queued events on a dedicated thread
+"""
+
+
+import sys
+import threading
+import time
+
+import histogram
+
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
+class Dispatcher(object):
+    """Event Dispatcher
+
+    Notifiers using a dispatcher only enqueue their events, so slow
+    observers never block the socket I/O thread. Events are delivered
+    in batches, in the order they were notified.
+
+    Attributes:
+        queue: pending (notifier, handlers, args) events
+        batchsize: maximum number of events delivered per wakeup
+        submitted: number of events submitted
+        dropped: number of events dropped as the queue was full
+        lock: guards the counters, events are submitted from any thread
+        latency: submit to delivery latency (microseconds)
+        thread: delivering thread
+
+    Methods:
+        start: start delivering events
+        submit: enqueue an event without blocking
+        stats: return the counters and the latency summary
+        stop: deliver the pending events and stop
+    """
+
+    def __init__(self, maximum_size=0, batchsize=64):
+        self.queue     = queue.Queue(maximum_size)
+        self.batchsize = batchsize
+        self.submitted = 0
+        self.dropped   = 0
+        self.lock      = threading.Lock()
+        self.latency   = histogram.Histogram()
+        self.thread    = threading.Thread(target=self.run)
+        self.thread.daemon = True
+
+    def start(self):
+        self.thread.start()
+
+    def submit(self, notifier, handlers, args):
+        # notified from any thread
+        with self.lock:
+            self.submitted += 1
+
+        try:
+            self.queue.put_nowait((notifier, handlers, args, time.time()))
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+
+    def deliver(self, event):
+        notifier, handlers, args, submitted = event
+        for handler in handlers:
+            try:
+                handler(notifier, *args)
+            except Exception as error:
+                sys.stderr.write('dispatch error: {error}\n'.format(error=error))
+        self.latency.record((time.time() - submitted) * 1000000)
+
+    def stats(self):
+        return {
+            'submitted'  : self.submitted,
+            'dropped'    : self.dropped,
+            'queued'     : self.queue.qsize(),
+            'latency_us' : self.latency.summary(),
+        }
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+
+            while len(batch) < self.batchsize:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for event in batch:
+                if event is None:
+                    return
+                self.deliver(event)
+
+    def stop(self):
+        self.queue.put(None)
+        self.thread.join()
@@ -0,0 +1,386 @@
+"""provides a single-threaded readiness based event loop
+
+Constants:
+    READ: readiness event for readable sockets
+    WRITE: readiness event for writable sockets
+
+Classes:
+    SelectSelector: select(2) based readiness selector
+    PollSelector: poll(2) based readiness selector
+    EpollSelector: epoll(7) based readiness selector
+    Timer: handle of a scheduled callback
+    EventLoop: dispatches readiness and timer callbacks
+
+Functions:
+    create_selector: create the most scalable selector of the platform
+"""
+
+
+import collections
+import errno
+import heapq
+import itertools
+import select
+import socket
+import time
+
+import coroutine
+import timerwheel
+
+READ  = 1
+WRITE = 4
+
+def is_interrupted(error):
+    """check whether the given select/poll error is caused by a signal
+    """
+
+    return len(error.args) > 0 and error.args[0] == errno.EINTR
+
+class SelectSelector(object):
+    """select(2) based selector, available on every platform
+    """
+
+    def __init__(self):
+        self.readers = set()
+        self.writers = set()
+
+    def register(self, fd, events):
+        if events & READ:
+            self.readers.add(fd)
+        if events & WRITE:
+            self.writers.add(fd)
+
+    def modify(self, fd, events):
+        self.unregister(fd)
+        self.register(fd, events)
+
+    def unregister(self, fd):
+        self.readers.discard(fd)
+        self.writers.discard(fd)
+
+    def select(self, timeout):
+        try:
+            readable, writable, _ = select.select(self.readers, self.writers, [], timeout)
+        except (select.error, IOError, OSError) as error:
+            if is_interrupted(error):
+                return []
+            raise
+
+        ready = {}
+        for fd in readable:
+            ready[fd] = READ
+        for fd in writable:
+            ready[fd] = ready.get(fd, 0) | WRITE
+
+        return list(ready.items())
+
+    def close(self):
+        self.readers.clear()
+        self.writers.clear()
+
+class PollSelector(object):
+    """poll(2) based selector
+    """
+
+    def __init__(self):
+        self.poller = select.poll()
+        self.error = select.POLLERR | select.POLLHUP | select.POLLNVAL
+
+    def register(self, fd, events):
+        self.poller.register(fd, events)
+
+    def modify(self, fd, events):
+        self.poller.modify(fd, events)
+
+    def unregister(self, fd):
+        self.poller.unregister(fd)
+
+    def select(self, timeout):
+        if timeout is not None:
+            timeout = int(timeout * 1000)
+
+        try:
+            events = self.poller.poll(timeout)
+        except (select.error, IOError, OSError) as error:
+            if is_interrupted(error):
+                return []
+            raise
+
+        # errors are reported as both readable and writable,
+        # so the handlers get the chance to observe them
+        return [(fd, event | READ | WRITE if event & self.error else event) for fd, event in events]
+
+    def close(self):
+        pass
+
+class EpollSelector(object):
+    """epoll(7) based selector, scales to large number of idle sockets
+    """
+
+    def __init__(self):
+        self.epoll = select.epoll()
+        self.error = select.EPOLLERR | select.EPOLLHUP
+
+    def register(self, fd, events):
+        self.epoll.register(fd, events)
+
+    def modify(self, fd, events):
+        self.epoll.modify(fd, events)
+
+    def unregister(self, fd):
+        self.epoll.unregister(fd)
+
+    def select(self, timeout):
+        if timeout is None:
+            timeout = -1
+
+        try:
+            events = self.epoll.poll(timeout)
+        except (select.error, IOError, OSError) as error:
+            if is_interrupted(error):
+                return []
+            raise
+
+        return [(fd, event | READ | WRITE if event & self.error else event) for fd, event in events]
+
+    def close(self):
+        self.epoll.close()
+
+def create_selector():
+    """create the most scalable selector available on the platform
+    """
+
+    if hasattr(select, 'epoll'):
+        return EpollSelector()
+    if hasattr(select, 'poll'):
+        return PollSelector()
+    return SelectSelector()
+
+class Timer(object):
+    """handle of a callback scheduled by EventLoop.call_later
+    """
+
+    def __init__(self, when, callback):
+        self.when      = when
+        self.callback  = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+class EventLoop(object):
+    """Single-threaded Event Loop
+
+    Attributes:
+        selector: underlying readiness selector
+        handlers: registered handlers [fileobj, events, reader, writer] per fd
+        timers: heap of scheduled timers
+        wheel: timer wheel driven by the loop, if any
+        poll_timeout: maximum time to block in the selector
+        running: loop is running
+        pending: callbacks submitted by other threads
+        waker: socket pair waking the selector up for the pending callbacks
+
+    Methods:
+        add_reader: call the callback whenever the socket is readable
+        remove_reader: stop watching the socket for readability
+        add_writer: call the callback whenever the socket is writable
+        remove_writer: stop watching the socket for writability
+        remove: stop watching the socket at all
+        call_later: call the callback after the given delay
+        call_soon: call the callback on the next iteration
+        call_soon_threadsafe: call the callback on the next iteration, from any thread
+        use_timer_wheel: drive a timer wheel from the loop
+        spawn: run the given coroutine as a task
+        run_once: wait for and dispatch a single batch of events
+        run: dispatch events until stopped
+        run_until: dispatch events until the given tasks are done
+        stop: stop the loop
+        close: release the selector
+    """
+
+    def __init__(self, selector=None):
+        self.selector = selector or create_selector()
+        self.handlers = {}
+        self.timers = []
+        self.sequence = itertools.count()
+        self.poll_timeout = 1
+        self.wheel = None
+        self.running = False
+
+        # not one of the handlers, the loop owns it
+        self.pending = collections.deque()
+        self.waker = socket.socketpair()
+        for s in self.waker:
+            s.setblocking(0)
+        self.selector.register(self.waker[0].fileno(), READ)
+
+    def update(self, fileobj, reader, writer):
+        fd = fileobj.fileno()
+        handler = self.handlers.get(fd)
+
+        # the descriptor was reused after its previous owner has been closed
+        if handler is not None and handler[0] is not fileobj:
+            self.forget(fd)
+            handler = None
+
+        events = 0
+        if reader is not None:
+            events |= READ
+        if writer is not None:
+            events |= WRITE
+
+        if handler is None:
+            if events == 0:
+                return
+            self.selector.register(fd, events)
+            self.handlers[fd] = [fileobj, events, reader, writer]
+        elif events == 0:
+            self.forget(fd)
+        else:
+            if events != handler[1]:
+                self.selector.modify(fd, events)
+            handler[1:] = [events, reader, writer]
+
+    def forget(self, fd):
+        del self.handlers[fd]
+        try:
+            self.selector.unregister(fd)
+        except (KeyError, ValueError, IOError, OSError):
+            # closed descriptors are already dropped by the kernel
+            pass
+
+    def get_handler(self, fileobj):
+        handler = self.handlers.get(fileobj.fileno())
+        if handler is None or handler[0] is not fileobj:
+            return None, None
+        return handler[2], handler[3]
+
+    def add_reader(self, fileobj, callback):
+        reader, writer = self.get_handler(fileobj)
+        self.update(fileobj, callback, writer)
+
+    def remove_reader(self, fileobj):
+        reader, writer = self.get_handler(fileobj)
+        self.update(fileobj, None, writer)
+
+    def add_writer(self, fileobj, callback):
+        reader, writer = self.get_handler(fileobj)
+        self.update(fileobj, reader, callback)
+
+    def remove_writer(self, fileobj):
+        reader, writer = self.get_handler(fileobj)
+        self.update(fileobj, reader, None)
+
+    def remove(self, fileobj):
+        try:
+            fd = fileobj.fileno()
+        except socket.error:
+            # already closed, the stale entry is replaced on fd reuse
+            return
+
+        handler = self.handlers.get(fd)
+        if handler is not None and handler[0] is fileobj:
+            self.forget(fd)
+
+    def call_later(self, delay, callback):
+        timer = Timer(time.time() + delay, callback)
+        heapq.heappush(self.timers, (timer.when, next(self.sequence), timer))
+        return timer
+
+    def call_soon(self, callback):
+        return self.call_later(0, callback)
+
+    def call_soon_threadsafe(self, callback):
+        # a deque append is atomic, the timer heap is not
+        self.pending.append(callback)
+        try:
+            self.waker[1].send(b'\0')
+        except socket.error:
+            # already woken up (the pair is full) or closed
+            pass
+
+    def run_pending(self):
+        try:
+            while self.waker[0].recv(4096):
+                pass
+        except socket.error:
+            pass
+
+        while self.pending:
+            self.pending.popleft()()
+
+    def spawn(self, generator):
+        task = coroutine.Task(self, generator)
+        self.call_soon(task.step)
+        return task
+
+    def use_timer_wheel(self, wheel=None):
+        """drive the given (or a new) timer wheel, so that its callbacks
+        run on the loop thread, return the wheel
+        """
+
+        self.wheel = wheel or timerwheel.TimerWheel()
+        return self.wheel
+
+    def run_timers(self):
+        now = time.time()
+        while self.timers and self.timers[0][0] <= now:
+            when, sequence, timer = heapq.heappop(self.timers)
+            if not timer.cancelled:
+                timer.callback()
+
+    def get_timeout(self, timeout):
+        # the wheel is checked every tick while it has timers
+        if self.wheel is not None and self.wheel.count > 0:
+            timeout = self.wheel.tick if timeout is None else min(timeout, self.wheel.tick)
+
+        if self.pending:
+            return 0
+
+        if not self.timers:
+            return timeout
+        delay = max(0, self.timers[0][0] - time.time())
+        if timeout is None:
+            return delay
+        return min(delay, timeout)
+
+    def run_once(self, timeout=None):
+        for fd, events in self.selector.select(self.get_timeout(timeout)):
+            if fd == self.waker[0].fileno():
+                continue
+
+            handler = self.handlers.get(fd)
+            if handler is not None and events & READ and handler[2] is not None:
+                handler[2]()
+
+            # the reader may have removed the handler
+            handler = self.handlers.get(fd)
+            if handler is not None and events & WRITE and handler[3] is not None:
+                handler[3]()
+
+        self.run_pending()
+        self.run_timers()
+
+        if self.wheel is not None:
+            self.wheel.advance()
+
+    def run(self):
+        self.running = True
+        while self.running:
+            self.run_once(self.poll_timeout)
+
+    def run_until(self, tasks):
+        self.running = True
+        while self.running and not all(task.done for task in tasks):
+            self.run_once(self.poll_timeout)
+
+    def stop(self):
+        self.running = False
+
+    def close(self):
+        self.handlers.clear()
+        del self.timers[:]
+        self.selector.close()
+        for s in self.waker:
+            s.close()
@@ -0,0 +1,110 @@
+"""provides SIP message framing over stream transports
+
+Classes:
+    StreamFramer: splits a byte stream into complete SIP messages
+"""
+
+
+import re
+
+HEADER_TERMINATOR = b'\r\n\r\n'
+KEEPALIVE         = b'\r\n'
+
+# Content-Length header (or its compact form) within a header block
+CONTENT_LENGTH = re.compile(br'\r\n(?:content-length|l)[ \t]*:[ \t]*(\d+)', re.IGNORECASE)
+
+class StreamFramer(object):
+    """Stream Framer
+
+    Received data is read straight into a reusable buffer by recv_into,
+    messages are located by the header terminator and Content-Length,
+    so pipelined messages are split without copying the stream around.
+
+    Attributes:
+        buffer: reusable receive buffer
+        start: offset of the first unconsumed byte
+        end: offset past the last received byte
+        maximum_size: maximum size of a single message
+
+    Methods:
+        fill: recv once from the connection into the buffer
+        pop: remove and return the next complete message
+        pending: check whether a complete message is buffered
+    """
+
+    def __init__(self, buffersize, maximum_size=65536):
+        self.buffer       = bytearray(buffersize)
+        self.start        = 0
+        self.end          = 0
+        self.maximum_size = maximum_size
+
+    def reserve(self, size):
+        """make room for a message of the given size at the buffer start
+        """
+
+        if size > self.maximum_size:
+            raise Exception('sip message exceeds {maximum} bytes'.format(maximum=self.maximum_size))
+
+        if self.start > 0:
+            length = self.end - self.start
+            self.buffer[0:length] = self.buffer[self.start:self.end]
+            self.start, self.end = 0, length
+
+        if size > len(self.buffer):
+            self.buffer.extend(bytearray(max(size, 2 * len(self.buffer)) - len(self.buffer)))
+
+    def fill(self, connection):
+        if self.end == len(self.buffer):
+            self.reserve(self.end - self.start + 1)
+
+        received = connection.recv_into(memoryview(self.buffer)[self.end:])
+        self.end += received
+
+        return received
+
+    def skip_keepalives(self):
+        while self.buffer.startswith(KEEPALIVE, self.start, self.end):
+            self.start += len(KEEPALIVE)
+
+    def locate(self):
+        """return the end offset of the next complete message, -1 if incomplete
+        """
+
+        self.skip_keepalives()
+
+        terminator = self.buffer.find(HEADER_TERMINATOR, self.start, self.end)
+
+        if terminator < 0:
+            if self.end - self.start > self.maximum_size:
+                raise Exception('sip header exceeds {maximum} bytes'.format(maximum=self.maximum_size))
+            return -1
+
+        # search from the start line end, so the first header is matched too
+        match = CONTENT_LENGTH.search(self.buffer, self.start, terminator + 2)
+        length = int(match.group(1)) if match else 0
+
+        end = terminator + len(HEADER_TERMINATOR) + length
+
+        if end > self.end:
+            self.reserve(end - self.start)
+            return -1
+
+        return end
+
+    def pending(self):
+        return self.locate() >= 0
+
+    def pop(self):
+        end = self.locate()
+
+        if end < 0:
+            return None
+
+        message = memoryview(self.buffer)[self.start:end].tobytes()
+
+        if end == self.end:
+            self.start, self.end = 0, 0
+        else:
+            self.start = end
+
+        return message
@@ -0,0 +1,119 @@
+"""provides a high dynamic range histogram
+
+Classes:
+    Histogram: log-linear histogram with bounded relative error
+"""
+
+
+class Histogram(object):
+    """HDR style Histogram
+
+    Values are non-negative integers (e.g. microseconds). Each power of
+    two range is split into 2^significant_bits sub-buckets, so every
+    value is recorded in O(1) with a relative error below
+    2^-(significant_bits - 1), whatever its magnitude.
+
+    Attributes:
+        significant_bits: resolution of the sub-buckets
+        counts: number of values per bucket index
+        count: number of recorded values
+        total: sum of recorded values
+        minimum: smallest recorded value
+        maximum: largest recorded value
+
+    Methods:
+        record: record a value
+        merge: add the values of another histogram
+        percentile: return the value at the given percentile
+        mean: return the mean of the recorded values
+        reset: forget all values
+        summary: return count, mean and the usual percentiles
+    """
+
+    def __init__(self, significant_bits=7):
+        self.significant_bits = significant_bits
+        self.reset()
+
+    def reset(self):
+        self.counts  = []
+        self.count   = 0
+        self.total   = 0
+        self.minimum = None
+        self.maximum = None
+
+    def index(self, value):
+        shift = max(0, value.bit_length() - self.significant_bits)
+        return (shift << self.significant_bits) + (value >> shift)
+
+    def value(self, index):
+        """highest value recorded in the bucket of the given index
+        """
+
+        shift = index >> self.significant_bits
+        sub = index & ((1 << self.significant_bits) - 1)
+        if shift == 0:
+            return sub
+        return ((sub + 1) << shift) - 1
+
+    def record(self, value, count=1):
+        value = max(0, int(value))
+        index = self.index(value)
+
+        if index >= len(self.counts):
+            self.counts.extend([0] * (index + 1 - len(self.counts)))
+
+        self.counts[index] += count
+        self.count += count
+        self.total += value * count
+
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def merge(self, other):
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+
+        self.count += other.count
+        self.total += other.total
+
+        for value in (other.minimum, other.maximum):
+            if value is not None:
+                if self.minimum is None or value < self.minimum:
+                    self.minimum = value
+                if self.maximum is None or value > self.maximum:
+                    self.maximum = value
+
+    def percentile(self, percentile):
+        if self.count == 0:
+            return 0
+
+        rank = max(1, int(round(self.count * percentile / 100.0)))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.value(index), self.maximum)
+
+        return self.maximum
+
+    def mean(self):
+        if self.count == 0:
+            return 0
+        return float(self.total) / self.count
+
+    def summary(self):
+        return {
+            'count' : self.count,
+            'min'   : self.minimum or 0,
+            'mean'  : self.mean(),
+            'p50'   : self.percentile(50),
+            'p90'   : self.percentile(90),
+            'p99'   : self.percentile(99),
+            'p999'  : self.percentile(99.9),
+            'max'   : self.maximum or 0,
+        }
@@ -0,0 +1,96 @@
+"""provides scatter-gather sends of buffer sequences
+
+A message can be handed over as a sequence of buffers (e.g. a header
+block and a memoryview of a large body), which goes out through a
+single sendmsg(2) call without being concatenated first. Sockets
+without sendmsg (python 2, TLS) fall back to a single joined send.
+
+Constants:
+    SENDMSG: scatter-gather sends are supported by the socket module
+    IOV_MAX: maximum number of buffers per sendmsg call
+
+Functions:
+    is_buffers: check whether the message is a buffer sequence
+    length: return the total size of a message or buffer sequence
+    join: return the message as a single string
+    to_bytes: return the message (e.g. a pooled memoryview) as a string
+    send: send as much of the buffers as possible with a single call
+    sendall: send the buffers over a stream socket
+    sendto: send the buffers as a single datagram
+"""
+
+
+import socket
+import ssl
+
+SENDMSG = hasattr(socket.socket, 'sendmsg')
+
+IOV_MAX = 1024
+
+def is_buffers(message):
+    return isinstance(message, (list, tuple))
+
+def length(message):
+    if is_buffers(message):
+        return sum(len(buffer) for buffer in message)
+    return len(message)
+
+def join(message):
+    if not is_buffers(message):
+        return message
+    return b''.join(buffer.tobytes() if isinstance(buffer, memoryview) else buffer for buffer in message)
+
+def to_bytes(message):
+    if isinstance(message, bytes):
+        return message
+    if isinstance(message, memoryview):
+        return message.tobytes()
+    if isinstance(message, bytearray):
+        return bytes(message)
+    return message.encode()
+
+def supports_sendmsg(sock):
+    # ssl sockets expose sendmsg, but do not implement it
+    return SENDMSG and not isinstance(sock, ssl.SSLSocket)
+
+def send(sock, buffers):
+    """send the buffers with a single system call, return the number of bytes sent
+    """
+
+    if not supports_sendmsg(sock):
+        return sock.send(join(buffers))
+
+    return sock.sendmsg(buffers[:IOV_MAX])
+
+def sendall(sock, buffers):
+    """send the buffers in order, resuming partial sends
+    in the middle of a buffer without copying it
+    """
+
+    if not supports_sendmsg(sock):
+        sock.sendall(join(buffers))
+        return
+
+    buffers = [memoryview(buffer) for buffer in buffers if len(buffer) > 0]
+
+    index = 0
+    while index < len(buffers):
+        sent = sock.sendmsg(buffers[index:index + IOV_MAX])
+
+        # skip the buffers sent completely, slice the partially sent one
+        while index < len(buffers) and sent >= len(buffers[index]):
+            sent -= len(buffers[index])
+            index += 1
+
+        if sent > 0:
+            buffers[index] = buffers[index][sent:]
+
+def sendto(sock, buffers, address):
+    """send the buffers as a single datagram to the given address
+    """
+
+    if not supports_sendmsg(sock) or len(buffers) > IOV_MAX:
+        sock.sendto(join(buffers), address)
+        return
+
+    sock.sendmsg([memoryview(buffer) for buffer in buffers], [], 0, address)
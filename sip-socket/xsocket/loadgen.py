@@ -0,0 +1,148 @@
+"""provides a SIP load generator
+
+Classes:
+    LoadGenerator: drives virtual clients at a target message rate
+"""
+
+
+import socket
+import time
+
+import asynctcpclient
+import asyncudpclient
+import coroutine
+import eventloop
+import histogram
+
+class LoadGenerator(object):
+    """Load Generator
+
+    Every virtual client is a coroutine on a single event loop sending
+    the message and waiting for the response. Sends follow an absolute
+    schedule (start + n * period), so time spent sending and receiving
+    never accumulates as drift. Round trip times are recorded in
+    microseconds into HDR style histograms.
+
+    Attributes:
+        protocol: 'udp' or 'tcp'
+        ip_address: server ip address
+        port: server port
+        timeout: response timeout
+        message: message to send
+        buffersize: recv buffer size
+        clients: number of virtual clients
+        rate: target messages per second over all clients
+        duration: seconds to run
+        report_period: period of the interim reports
+        loop: driving event loop
+        total: round trip times of the whole run
+        interval: round trip times since the last report
+        sent: number of messages sent
+        timeouts: number of responses not received in time
+        failures: number of failed sends/recvs
+        late: number of sends behind schedule by more than a period
+
+    Methods:
+        run: generate the load and report when done
+        report: print throughput and round trip time percentiles
+    """
+
+    CLIENTS = {
+        'udp' : asyncudpclient.AsyncClient,
+        'tcp' : asynctcpclient.AsyncClient,
+    }
+
+    def __init__(self, protocol, ip_address, port, timeout, message, buffersize):
+        self.protocol      = protocol
+        self.ip_address    = ip_address
+        self.port          = port
+        self.timeout       = timeout
+        self.message       = message
+        self.buffersize    = buffersize
+        self.clients       = 1
+        self.rate          = 1.0
+        self.duration      = 10
+        self.report_period = 1
+        self.loop          = eventloop.EventLoop()
+        self.total         = histogram.Histogram()
+        self.interval      = histogram.Histogram()
+        self.sent          = 0
+        self.timeouts      = 0
+        self.failures      = 0
+        self.late          = 0
+        self.started       = None
+        self.reported      = None
+
+    def virtual_client(self, index):
+        client = self.CLIENTS[self.protocol](self.loop, self.ip_address, self.port, self.timeout, None, 1)
+        yield client.connect()
+
+        period = float(self.clients) / self.rate
+
+        # spread the clients evenly over the first period
+        scheduled = self.started + period * index / self.clients
+        deadline = self.started + self.duration
+
+        while scheduled < deadline:
+            delay = scheduled - time.time()
+            if delay > 0:
+                yield coroutine.Sleep(delay)
+            elif -delay > period:
+                self.late += 1
+
+            sent = time.time()
+            try:
+                yield client.sendrecv(self.message, self.buffersize)
+            except socket.timeout:
+                self.timeouts += 1
+            except socket.error:
+                self.failures += 1
+            else:
+                rtt = int((time.time() - sent) * 1000000)
+                self.total.record(rtt)
+                self.interval.record(rtt)
+            self.sent += 1
+
+            scheduled += period
+
+        yield client.disconnect()
+
+    def report(self, histogram, elapsed, title):
+        summary = histogram.summary()
+        print('{title} {elapsed:.1f}s sent: {sent} responses: {count} ({throughput:.1f}/s) timeouts: {timeouts} failures: {failures} late: {late} '
+              'rtt(us) p50: {p50} p99: {p99} p999: {p999} max: {max}'.format(
+            title=title,
+            elapsed=elapsed,
+            sent=self.sent,
+            count=summary['count'],
+            throughput=summary['count'] / elapsed if elapsed > 0 else 0,
+            timeouts=self.timeouts,
+            failures=self.failures,
+            late=self.late,
+            p50=summary['p50'],
+            p99=summary['p99'],
+            p999=summary['p999'],
+            max=summary['max']))
+
+    def report_interval(self):
+        now = time.time()
+        self.report(self.interval, now - self.reported, '[interval]')
+        self.interval.reset()
+        self.reported = now
+        self.loop.call_later(self.report_period, self.report_interval)
+
+    def run(self):
+        self.started = time.time()
+        self.reported = self.started
+
+        tasks = [self.loop.spawn(self.virtual_client(index)) for index in range(self.clients)]
+
+        self.loop.call_later(self.report_period, self.report_interval)
+        self.loop.run_until(tasks)
+
+        for task in tasks:
+            if task.error is not None:
+                self.failures += 1
+
+        self.report(self.total, time.time() - self.started, '[total]')
+        self.loop.close()
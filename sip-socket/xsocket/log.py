@@ -0,0 +1,116 @@
+"""provides the non-blocking logging surface of xsocket
+
+Records of the xsocket loggers are put on a queue as they are,
+formatting and writing happen on a background thread, so socket
+threads never wait for the terminal or a file. Callers on the hot path
+check the level first, so nothing is formatted when it is disabled:
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug('send (%d)', len(message))
+
+Classes:
+    QueueHandler: enqueues records without formatting them
+    QueueListener: formats and emits queued records on a thread
+
+Functions:
+    get_logger: return the xsocket logger of the given module
+    start: route the xsocket records through a queue to a stream
+    stop: flush the pending records and stop the listener
+"""
+
+
+import logging
+import sys
+import threading
+
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
+ROOT = 'xsocket'
+
+FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+
+LEVELS = {
+    'debug'   : logging.DEBUG,
+    'info'    : logging.INFO,
+    'warning' : logging.WARNING,
+    'error'   : logging.ERROR,
+}
+
+class QueueHandler(logging.Handler):
+    """enqueues records, dropping them rather than blocking if the queue is full
+    """
+
+    def __init__(self, records):
+        logging.Handler.__init__(self)
+        self.records = records
+        self.dropped = 0
+
+    def emit(self, record):
+        try:
+            self.records.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class QueueListener(object):
+    """emits the queued records through the given handler on a background thread
+    """
+
+    def __init__(self, records, handler):
+        self.records = records
+        self.handler = handler
+        self.thread  = threading.Thread(target=self.run)
+        self.thread.daemon = True
+
+    def start(self):
+        self.thread.start()
+
+    def run(self):
+        while True:
+            record = self.records.get()
+            if record is None:
+                break
+            self.handler.handle(record)
+
+    def stop(self):
+        self.records.put(None)
+        self.thread.join()
+        self.handler.flush()
+
+logging.getLogger(ROOT).addHandler(logging.NullHandler())
+
+listener = None
+
+def get_logger(name):
+    return logging.getLogger('{root}.{name}'.format(root=ROOT, name=name))
+
+def start(level='info', stream=None, maximum_size=100000):
+    """route the xsocket records through a bounded queue to the given stream
+    """
+
+    global listener
+
+    if listener is not None:
+        return
+
+    records = queue.Queue(maximum_size)
+
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(logging.Formatter(FORMAT))
+
+    logger = logging.getLogger(ROOT)
+    logger.setLevel(LEVELS.get(level, level))
+    logger.addHandler(QueueHandler(records))
+    logger.propagate = False
+
+    listener = QueueListener(records, handler)
+    listener.start()
+
+def stop():
+    global listener
+
+    if listener is not None:
+        listener.stop()
+        listener = None
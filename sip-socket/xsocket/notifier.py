@@ -1,25 +1,54 @@
 class Notifier(object):
 
+    # events whose handlers are resolved at register time,
+    # any other event is resolved once, on its first notification
+    EVENTS = ()
+
     def __init__(self):
-        self.observers = []
+        self.observers  = []
+        self.handlers   = {}
+        self.dispatcher = None
+
+    def resolve(self, method):
+        handlers = [getattr(observer, method) for observer in self.observers if hasattr(observer, method)]
+
+        # replaced as well, notifying threads may be reading the table
+        table = dict(self.handlers)
+        table[method] = handlers
+        self.handlers = table
+
+        return handlers
+
+    def rebuild(self):
+        # replaced rather than updated, so notifying threads never see a partial table
+        handlers = {}
+        for method in self.EVENTS:
+            handlers[method] = [getattr(observer, method) for observer in self.observers if hasattr(observer, method)]
+        self.handlers = handlers
 
     def register(self, observer):
-        self.observers.append(observer)
+        self.observers = self.observers + [observer]
+        self.rebuild()
 
     def unregister(self, observer):
-        pass
-
-    def notify(self, observer, method, *args):
-        if hasattr(observer, method):
-            f = getattr(observer, method)
-            new_args = []
-            new_args.append(self)
-            for arg in args:
-                new_args.append(arg)
-            f(*new_args)
-        else:
-            pass
+        if observer in self.observers:
+            self.observers = [o for o in self.observers if o is not observer]
+            self.rebuild()
+
+    def use_dispatcher(self, dispatcher):
+        self.dispatcher = dispatcher
 
     def notify_all(self, method, *args):
-        for observer in self.observers:
-            self.notify(observer, method, *args)
+        handlers = self.handlers.get(method)
+        if handlers is None:
+            handlers = self.resolve(method)
+
+        if not handlers:
+            return
+
+        if self.dispatcher is not None:
+            self.dispatcher.submit(self, handlers, args)
+            return
+
+        for handler in handlers:
+            handler(self, *args)
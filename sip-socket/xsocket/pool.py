@@ -0,0 +1,122 @@
+"""provides a pool of connected TCP clients
+
+Classes:
+    ConnectionPool: reuses warm tcpclient.Client connections
+"""
+
+
+import select
+import socket
+import threading
+import time
+
+import tcpclient
+
+class ConnectionPool(object):
+    """Connection Pool
+
+    Idle connections are kept per (ip, port, sslversion) key, so repeated
+    scenarios and request bursts skip the TCP (and TLS) handshake.
+
+    Attributes:
+        maximum_size: maximum number of idle connections per key
+        idle_timeout: seconds after which an idle connection is closed
+        keepalive: TCP keep-alive (idle, interval, count) of new connections, None to disable
+        idle: key -> [(client, release time)] of idle connections
+        lock: guards idle
+        hits: number of acquisitions served by an idle connection
+        misses: number of acquisitions opening a new connection
+
+    Methods:
+        acquire: return a connected client for the given server
+        release: give a client back to the pool
+        discard: close a client instead of giving it back
+        close: close all idle connections
+    """
+
+    def __init__(self, maximum_size=8, idle_timeout=60):
+        self.maximum_size = maximum_size
+        self.idle_timeout = idle_timeout
+        self.keepalive    = (30, 10, 3)
+        self.idle         = {}
+        self.lock         = threading.Lock()
+        self.hits         = 0
+        self.misses       = 0
+
+    def key(self, client):
+        return (client.ip_address, client.port, client.sslversion)
+
+    def is_healthy(self, client):
+        """an idle connection must have nothing to read,
+        readable means either closed by the peer or unsolicited data
+        """
+
+        try:
+            fd = client.socket.fileno()
+            if hasattr(select, 'poll'):
+                poller = select.poll()
+                poller.register(fd, select.POLLIN)
+                return len(poller.poll(0)) == 0
+            readable, _, _ = select.select([fd], [], [], 0)
+            return len(readable) == 0
+        except (select.error, socket.error, ValueError):
+            return False
+
+    def acquire(self, ip, port, timeout, sslversion=None, maximum_trial_count=1):
+        key = (ip, port, sslversion)
+        deadline = time.time() - self.idle_timeout
+
+        with self.lock:
+            idle = self.idle.get(key, [])
+            while idle:
+                client, released = idle.pop()
+                if released > deadline and self.is_healthy(client):
+                    self.hits += 1
+                    return client
+                self.discard(client)
+            self.misses += 1
+
+        client = tcpclient.Client(ip, port, timeout, False, False, False, sslversion, maximum_trial_count)
+        if self.keepalive is not None:
+            client.use_keepalive(*self.keepalive)
+
+        try:
+            client.connect()
+        except Exception:
+            # no connection was opened after all
+            self.discard(client)
+            with self.lock:
+                self.misses -= 1
+            raise
+
+        return client
+
+    def release(self, client):
+        key = self.key(client)
+
+        with self.lock:
+            idle = self.idle.setdefault(key, [])
+
+            # the oldest connections are at the front
+            deadline = time.time() - self.idle_timeout
+            while idle and idle[0][1] <= deadline:
+                self.discard(idle.pop(0)[0])
+
+            if len(idle) < self.maximum_size and self.is_healthy(client):
+                idle.append((client, time.time()))
+                return
+
+        self.discard(client)
+
+    def discard(self, client):
+        try:
+            client.disconnect()
+        except socket.error:
+            pass
+
+    def close(self):
+        with self.lock:
+            for idle in self.idle.values():
+                for client, released in idle:
+                    self.discard(client)
+            self.idle.clear()
@@ -0,0 +1,282 @@
+"""provides a pre-forking supervisor for xsocket servers
+
+Every worker process runs its own server bound to the same port
+through SO_REUSEPORT, so the kernel spreads connections and datagrams
+across all workers (and cores). The supervisor restarts dead workers
+and aggregates the counters reported by them. Workers dying right after
+their start (e.g. unable to bind) are restarted with an exponential
+backoff, and given up on after a number of such failures in a row.
+Workers send a final report when terminated, which the supervisor
+reads up to the end of their pipe before counting them out.
+
+Constants:
+    KEYS: server stats aggregated over the workers
+
+Classes:
+    Supervisor: forks, restarts and monitors worker processes
+"""
+
+
+import json
+import os
+import select
+import signal
+import threading
+import time
+import traceback
+
+import stats
+
+KEYS = ('accepted',) + stats.Counters.KEYS
+
+class Supervisor(object):
+    """Worker Process Supervisor
+
+    Attributes:
+        factory: callable building the (configured, not started) server of a worker
+        workers: number of worker processes
+        report_period: period of counter reports
+        processes: pid -> [index, pipe fd, pending report data] of live workers
+        counters: latest counters of the live worker per index
+        retired: counters accumulated by dead workers
+        restarts: number of restarted workers
+        minimum_uptime: seconds a worker has to live for its death not to count as a failure
+        backoff: delay of the first restart after a failure, doubled per further failure
+        maximum_backoff: maximum delay of a restart
+        maximum_failures: failures in a row after which a worker is not restarted
+        started: index -> start time of the live worker
+        failures: index -> failures in a row
+        scheduled: index -> time of the pending restart
+        running: supervisor is running
+
+    Methods:
+        spawn: fork the worker of the given index
+        work: worker process body
+        terminate: SIGTERM handler of the workers
+        collect: read the reports of the workers
+        receive: parse the report data read from a worker
+        drain: read the reports left in the pipe of a dead worker
+        reap: schedule the restart of dead workers
+        respawn: restart the workers whose restart is due
+        totals: aggregated counters of all workers
+        report: print the aggregated counters
+        run: start the workers and supervise them until interrupted
+        stop: terminate all workers
+    """
+
+    def __init__(self, factory, workers):
+        self.factory          = factory
+        self.workers          = workers
+        self.report_period    = 5
+        self.processes        = {}
+        self.counters         = {}
+        self.retired          = dict.fromkeys(KEYS, 0)
+        self.restarts         = 0
+        self.minimum_uptime   = 1.0
+        self.backoff          = 0.5
+        self.maximum_backoff  = 30.0
+        self.maximum_failures = 10
+        self.started          = {}
+        self.failures         = {}
+        self.scheduled        = {}
+        self.running          = False
+
+    def spawn(self, index):
+        read_fd, write_fd = os.pipe()
+
+        pid = os.fork()
+
+        if pid == 0:
+            os.close(read_fd)
+            code = 0
+            try:
+                self.work(write_fd)
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            os._exit(code)
+
+        os.close(write_fd)
+        self.processes[pid] = [index, read_fd, b'']
+        self.counters[index] = dict.fromkeys(KEYS, 0)
+        self.started[index] = time.time()
+
+    def work(self, fd):
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, self.terminate)
+
+        server = self.factory()
+        server.reuseport = True
+
+        # the server runs aside, so that the main thread reports
+        # and handles SIGTERM without waiting for the server
+        runner = threading.Thread(target=server.run)
+        runner.daemon = True
+        runner.start()
+
+        def report():
+            os.write(fd, (json.dumps(server.stats()) + '\n').encode())
+
+        try:
+            while runner.is_alive():
+                runner.join(self.report_period)
+                report()
+        except SystemExit:
+            pass
+
+        # counted since the last periodic report
+        report()
+
+        # the buffered capture records, the exit skips the file buffers
+        if getattr(server, 'capture', None) is not None:
+            server.capture.writer.close()
+
+    def terminate(self, signum, frame):
+        raise SystemExit(0)
+
+    def collect(self, timeout):
+        fds = dict((process[1], process) for process in self.processes.values())
+
+        try:
+            readable, _, _ = select.select(list(fds), [], [], timeout)
+        except (select.error, IOError, OSError):
+            return
+
+        for fd in readable:
+            data = os.read(fd, 65536)
+            if data:
+                self.receive(fds[fd], data)
+
+    def receive(self, process, data):
+        lines = (process[2] + data).split(b'\n')
+        process[2] = lines.pop()
+
+        for line in lines:
+            if line:
+                self.counters[process[0]] = json.loads(line.decode())
+
+    def drain(self, process):
+        # the write end is closed once the worker is dead
+        while True:
+            data = os.read(process[1], 65536)
+            if not data:
+                return
+            self.receive(process, data)
+
+    def reap(self):
+        while self.processes:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except OSError:
+                return
+
+            if pid == 0:
+                return
+
+            process = self.processes.pop(pid)
+            self.drain(process)
+            os.close(process[1])
+            index = process[0]
+
+            counters = self.counters.pop(index)
+            for key in self.retired:
+                self.retired[key] += counters.get(key, 0)
+
+            if self.running:
+                self.schedule(index, pid, status)
+
+    def schedule(self, index, pid, status):
+        now = time.time()
+
+        if now - self.started.pop(index, now) < self.minimum_uptime:
+            self.failures[index] = self.failures.get(index, 0) + 1
+        else:
+            self.failures[index] = 0
+
+        failures = self.failures[index]
+
+        if os.WIFSIGNALED(status):
+            reason = 'signal {0}'.format(os.WTERMSIG(status))
+        else:
+            reason = 'status {0}'.format(os.WEXITSTATUS(status))
+
+        if failures >= self.maximum_failures:
+            print('worker {index} (pid {pid}) died with {reason}, {failures} failures in a row, giving up'.format(
+                index=index, pid=pid, reason=reason, failures=failures))
+            return
+
+        # a worker failing at startup would otherwise be forked in a tight loop
+        delay = 0
+        if failures > 0:
+            delay = min(self.maximum_backoff, self.backoff * 2 ** (failures - 1))
+
+        print('worker {index} (pid {pid}) died with {reason}, restarting in {delay:.1f}s...'.format(
+            index=index, pid=pid, reason=reason, delay=delay))
+
+        self.scheduled[index] = now + delay
+
+    def respawn(self):
+        now = time.time()
+
+        for index, when in list(self.scheduled.items()):
+            if when <= now:
+                del self.scheduled[index]
+                self.restarts += 1
+                self.spawn(index)
+
+    def totals(self):
+        totals = dict(self.retired)
+        for counters in self.counters.values():
+            for key in totals:
+                totals[key] += counters.get(key, 0)
+        return totals
+
+    def report(self):
+        totals = self.totals()
+        print('workers: {workers} restarts: {restarts} {counters}'.format(
+            workers=len(self.processes),
+            restarts=self.restarts,
+            counters=' '.join('{0}: {1}'.format(key, totals[key]) for key in KEYS)))
+
+    def run(self):
+        self.running = True
+
+        for index in range(self.workers):
+            self.spawn(index)
+
+        deadline = time.time() + self.report_period
+
+        try:
+            while self.running:
+                wakeup = min([deadline] + list(self.scheduled.values()))
+                self.collect(max(0, wakeup - time.time()))
+                self.reap()
+                self.respawn()
+
+                if not self.processes and not self.scheduled:
+                    print('no workers left')
+                    break
+
+                if time.time() >= deadline:
+                    self.report()
+                    deadline = time.time() + self.report_period
+        except KeyboardInterrupt:
+            pass
+
+        self.stop()
+
+    def stop(self):
+        self.running = False
+
+        for pid in list(self.processes):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+
+        # the final reports are read while the workers exit
+        while self.processes:
+            self.collect(0.1)
+            self.reap()
+
+        self.report()
@@ -0,0 +1,102 @@
+"""provides token bucket rate limiting
+
+Buckets are refilled lazily on every check, so a check is a handful of
+arithmetic operations, and nothing runs while a source is silent.
+
+Classes:
+    TokenBucket: limits a single flow to a rate with bursts
+    RateLimiter: bounded set of token buckets keyed by source
+"""
+
+
+import collections
+import time
+
+class TokenBucket(object):
+    """Token Bucket
+
+    Not locked, every bucket is checked by a single receiving thread.
+
+    Attributes:
+        rate: tokens added per second
+        burst: maximum number of tokens
+        tokens: available tokens
+        stamp: time of the last refill
+        dropped: number of rejected checks
+
+    Methods:
+        consume: take a token if available
+    """
+
+    def __init__(self, rate, burst, now=None):
+        self.rate    = float(rate)
+        self.burst   = float(burst)
+        self.tokens  = self.burst
+        self.stamp   = now or time.time()
+        self.dropped = 0
+
+    def consume(self, now=None, count=1):
+        """take count tokens, return whether they were available
+        """
+
+        now = now or time.time()
+
+        # clocks read on other threads may be slightly behind
+        elapsed = now - self.stamp
+        if elapsed > 0:
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.stamp = now
+
+        if self.tokens >= count:
+            self.tokens -= count
+            return True
+
+        self.dropped += 1
+        return False
+
+class RateLimiter(object):
+    """Rate Limiter per Source
+
+    Buckets are kept in least recently used order, so that the number
+    of tracked sources stays bounded under a flood of spoofed addresses.
+
+    Attributes:
+        rate: tokens added per second to every bucket
+        burst: maximum number of tokens of every bucket
+        maximum_sources: maximum number of tracked sources
+        buckets: source -> token bucket
+        dropped: number of rejected checks over all sources
+
+    Methods:
+        allow: check the source against its bucket
+        stats: return the drop and source counts
+    """
+
+    def __init__(self, rate, burst, maximum_sources=10000):
+        self.rate            = rate
+        self.burst           = burst
+        self.maximum_sources = maximum_sources
+        self.buckets         = collections.OrderedDict()
+        self.dropped         = 0
+
+    def allow(self, source, now=None):
+        now = now or time.time()
+
+        bucket = self.buckets.pop(source, None)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.burst, now)
+            if len(self.buckets) >= self.maximum_sources:
+                self.buckets.popitem(last=False)
+        self.buckets[source] = bucket
+
+        if bucket.consume(now):
+            return True
+
+        self.dropped += 1
+        return False
+
+    def stats(self):
+        return {
+            'dropped' : self.dropped,
+            'sources' : len(self.buckets),
+        }
@@ -0,0 +1,177 @@
+"""provides the replay of captured traffic
+
+Classes:
+    Replayer: re-sends the messages of a capture file to a server
+"""
+
+
+import socket
+import time
+
+import asynctcpclient
+import asyncudpclient
+import capture
+import coroutine
+import eventloop
+
+class Replayer(object):
+    """Capture Replayer
+
+    The records of the capture are read in order from the mapped file
+    and sent without copying, every original peer getting its own client
+    so that dialogs keep their connection. Sends follow the captured
+    timestamps divided by the speed (2 replays twice as fast), or go out
+    back to back at the maximum speed if the speed is 0. Responses are
+    drained and counted by a coroutine per client.
+
+    Attributes:
+        path: capture file path
+        protocol: 'udp' or 'tcp'
+        ip_address: server ip address
+        port: server port
+        timeout: connect/send timeout, and the time responses are awaited after the last send
+        buffersize: recv buffer size
+        direction: direction of the replayed records (capture.RECEIVED or capture.SENT)
+        speed: time scale of the replay, maximum if 0
+        repeat: number of passes over the capture
+        loop: driving event loop
+        clients: client of every original peer
+        drains: response draining tasks
+        sent: number of messages sent
+        bytes_sent: number of bytes sent
+        received: number of responses received
+        failures: number of failed sends/recvs
+        late: number of sends behind schedule by more than 10 ms
+        finished: all passes have been sent
+
+    Methods:
+        run: replay the capture and report when done
+        report: print the replay summary
+    """
+
+    CLIENTS = {
+        'udp' : asyncudpclient.AsyncClient,
+        'tcp' : asynctcpclient.AsyncClient,
+    }
+
+    LATE = 0.01
+
+    def __init__(self, path, protocol, ip_address, port, timeout, buffersize):
+        self.path       = path
+        self.protocol   = protocol
+        self.ip_address = ip_address
+        self.port       = port
+        self.timeout    = timeout
+        self.buffersize = buffersize
+        self.direction  = capture.RECEIVED
+        self.speed      = 1.0
+        self.repeat     = 1
+        self.loop       = eventloop.EventLoop()
+        self.clients    = {}
+        self.drains     = []
+        self.sent       = 0
+        self.bytes_sent = 0
+        self.received   = 0
+        self.failures   = 0
+        self.late       = 0
+        self.finished   = False
+        self.started    = None
+
+    def drain(self, client):
+        while True:
+            try:
+                message = yield client.recv(self.buffersize)
+            except socket.timeout:
+                if self.finished:
+                    break
+                continue
+            except socket.error:
+                self.failures += 1
+                break
+            if not message:
+                break
+            self.received += 1
+
+    def get_client(self, peer):
+        client = self.clients.get(peer)
+
+        if client is None:
+            client = self.CLIENTS[self.protocol](self.loop, self.ip_address, self.port, self.timeout, None, 1)
+            yield client.connect()
+            self.clients[peer] = client
+            self.drains.append(self.loop.spawn(self.drain(client)))
+
+        raise coroutine.Return(client)
+
+    def replay(self, reader):
+        first = None
+        offset = 0.0
+
+        for index in range(self.repeat):
+            last = None
+
+            for timestamp, direction, peer, message in reader.records():
+                if direction != self.direction:
+                    continue
+
+                if first is None:
+                    first = timestamp
+                last = timestamp
+
+                if self.speed > 0:
+                    scheduled = self.started + (offset + timestamp - first) / self.speed
+                    delay = scheduled - time.time()
+                    if delay > 0:
+                        yield coroutine.Sleep(delay)
+                    elif -delay > self.LATE:
+                        self.late += 1
+
+                try:
+                    client = yield self.get_client(peer)
+                    yield client.send(message)
+                except Exception:
+                    self.failures += 1
+                    continue
+
+                self.sent += 1
+                self.bytes_sent += len(message)
+
+            # the next pass starts right after the last record of this one
+            if last is not None:
+                offset += last - first
+                first = None
+
+        self.finished = True
+
+    def report(self, elapsed):
+        print('[replay] {elapsed:.3f}s peers: {peers} sent: {sent} ({rate:.1f}/s, {bytes} bytes) '
+              'responses: {received} failures: {failures} late: {late}'.format(
+            elapsed=elapsed,
+            peers=len(self.clients),
+            sent=self.sent,
+            rate=self.sent / elapsed if elapsed > 0 else 0,
+            bytes=self.bytes_sent,
+            received=self.received,
+            failures=self.failures,
+            late=self.late))
+
+    def run(self):
+        reader = capture.Reader(self.path)
+
+        self.started = time.time()
+        task = self.loop.spawn(self.replay(reader))
+        self.loop.run_until([task])
+        elapsed = time.time() - self.started
+
+        # the responses to the last messages arrive within the timeout
+        self.loop.run_until(self.drains)
+
+        for client in self.clients.values():
+            client.socket.close()
+
+        if task.error is not None:
+            self.failures += 1
+
+        self.report(elapsed)
+        self.loop.close()
+        reader.close()
@@ -1,15 +1,33 @@
-import datetime
+import errno
+import logging
 import socket
 import ssl
 import threading
+import time
 
+import bufferpool
+import capture
+import eventloop
+import histogram
+import iovec
+import log
 import notifier
+import ratelimit
+import stats
+import timerwheel
+
+logger = log.get_logger('server')
+
+# not exposed by the socket module of older pythons, 15 on linux
+SO_REUSEPORT = getattr(socket, 'SO_REUSEPORT', 15)
 
 class Server(notifier.Notifier):
 
     UDP = socket.SOCK_DGRAM
     TCP = socket.SOCK_STREAM
 
+    FAMILY = socket.AF_INET
+
     WILL_START = 'will_start'
     DID_START  = 'did_start'
 
@@ -25,6 +43,17 @@ class Server(notifier.Notifier):
     WILL_RUN = 'will_run'
     DID_RUN  = 'did_run'
 
+    DID_EVICT = 'did_evict'
+
+    EVENTS = (
+        WILL_START, DID_START,
+        WILL_ACCEPT, DID_ACCEPT,
+        WILL_STOP, DID_STOP,
+        WILL_SHUTDOWN, DID_SHUTDOWN,
+        WILL_RUN, DID_RUN,
+        DID_EVICT,
+    )
+
     def __init__(self, protocol, port, buffersize, sendloop, recvloop):
         notifier.Notifier.__init__(self)
 
@@ -35,20 +64,124 @@ class Server(notifier.Notifier):
         self.buffersize  = buffersize
         self.sendloop    = sendloop
         self.recvloop    = recvloop
-        self.socket      = socket.socket(socket.AF_INET, self.protocol)
+        self.socket      = socket.socket(self.FAMILY, self.protocol)
         self.root_socket = self.socket
         self.loop_thread = threading.Thread(target=self.loop)
         self.sessions    = {}
+        self.backlog     = 1
+        self.eventloop   = None
+        self.framing     = False
+        self.reuseport   = False
+
+        # (high, low) watermarks of the session write queues, if enabled
+        self.write_watermarks = None
+
+        # timer wheel of the sessions, keep-alive period and recv timeout of the sessions
+        self.timer_wheel      = None
+        self.keepalive_period = None
+        self.recv_timeout     = None
+
+        # counters of the sessions gone, recv to dispatch latency of all sessions
+        self.started  = None
+        self.accepted = 0
+        self.evicted  = 0
+        self.retired  = stats.Counters()
+        self.latency  = histogram.Histogram()
+
+        # maximum number of accepts (datagrams) per readiness event
+        self.accept_batchsize = 64
+
+        # observer writing the traffic of all sessions to a capture file, if enabled
+        self.capture = None
+
+        # recycled receive buffers of all sessions, if enabled
+        self.buffer_pool = None
+
+        # (rate, burst) of the messages of every session, limiter of the
+        # connections (datagrams) of every source address, if enabled
+        self.session_limit  = None
+        self.source_limiter = None
+
+    def use_eventloop(self, loop=None):
+        self.eventloop = loop or eventloop.EventLoop()
+        self.backlog   = socket.SOMAXCONN
+
+    def use_framing(self):
+        self.framing = True
+
+    def use_write_queue(self, high_watermark=65536, low_watermark=16384):
+        self.write_watermarks = (high_watermark, low_watermark)
+
+    def use_timer_wheel(self, wheel=None):
+        """run the periodic work of the sessions on a timer wheel, driven by the
+        event loop if used (so call use_eventloop first), by a shared thread otherwise
+        """
+
+        if wheel is None:
+            if self.eventloop is not None:
+                wheel = self.eventloop.use_timer_wheel()
+            else:
+                wheel = timerwheel.shared()
+
+        self.timer_wheel = wheel
+
+    def use_session_limit(self, rate, burst=None):
+        """drop the received messages of a session beyond rate per second,
+        allowing bursts of burst (by default rate) messages
+        """
+
+        self.session_limit = (rate, burst or rate)
+
+    def use_source_limit(self, rate, burst=None, maximum_sources=10000):
+        """reject the connections (datagrams for connectionless servers)
+        of a source address beyond rate per second, before any session work
+        """
+
+        self.source_limiter = ratelimit.RateLimiter(rate, burst or rate, maximum_sources)
+
+    def limit_source(self, address, now=None):
+        """return whether the source address is within its rate
+        """
+
+        if self.source_limiter is None:
+            return True
+
+        # unix datagram peers are addressed by their socket path
+        source = address[0] if isinstance(address, tuple) else address
+        return self.source_limiter.allow(source, now)
+
+    def use_buffer_pool(self, capacity=256):
+        """receive into recycled buffers of the buffer size, so that the
+        handlers get memoryviews valid only during their call,
+        not applied to sessions delivering through a dispatcher
+        """
+
+        self.buffer_pool = bufferpool.BufferPool(self.buffersize, capacity)
+
+    def use_capture(self, path):
+        """append every message sent and received by the sessions to the given capture file
+        """
+
+        self.capture = capture.Capture(capture.Writer(path))
 
     def startx(self):
         raise Exception('Server::startx method must be implemented by child class')
 
+    def bindx(self):
+        """bind the server socket, to the port on all interfaces unless overridden by child class
+        """
+
+        self.socket.bind(('', self.port))
+
     def start(self):
         self.notify_all(self.WILL_START)
         print('server starting...')
         self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.socket.bind(('', self.port))
+        if self.reuseport:
+            self.socket.setsockopt(socket.SOL_SOCKET, SO_REUSEPORT, 1)
+        self.bindx()
         self.startx()
+        self.started = time.time()
         self.notify_all(self.DID_START)
 
     def acceptx(self):
@@ -56,25 +189,143 @@ class Server(notifier.Notifier):
 
     def accept(self):
         self.notify_all(self.WILL_ACCEPT)
-        print('waiting for client...')
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('waiting for client...')
         session = self.acceptx()
+        # rejected by the source limit
+        if session is not None:
+            self.admit(session)
+
+    def admit(self, session):
         if session.address not in self.sessions:
+            self.accepted += 1
+            session.latency = self.latency
             session.enable_send_loop = self.sendloop
-            session.enable_recv_loop = self.recvloop
+            session.enable_recv_loop = self.recvloop and self.eventloop is None
             session.register(self)
+            if self.capture is not None:
+                session.register(self.capture)
+            if self.dispatcher is not None:
+                session.use_dispatcher(self.dispatcher)
+            elif self.buffer_pool is not None:
+                session.use_buffer_pool(self.buffer_pool)
+            if self.session_limit is not None:
+                session.use_rate_limit(self.session_limit[0], self.session_limit[1])
+            if self.write_watermarks is not None:
+                session.use_write_queue(self.write_watermarks[0], self.write_watermarks[1], self.eventloop)
+            if self.timer_wheel is not None:
+                session.use_timer_wheel(self.timer_wheel)
+                session.keepalive_period = self.keepalive_period
+                session.recv_timeout = self.recv_timeout
             session.start()
+            if self.eventloop is not None:
+                self.watchx(session)
             self.sessions[session.address] = session
-            print('client registered: {address}'.format(address=session.address))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug('client registered: %s', session.address)
             self.notify_all(self.DID_ACCEPT, session)
 
+    def accept_batch(self):
+        for i in range(self.accept_batchsize):
+            self.accept()
+
     def loop(self):
         while True:
-            self.accept()
+            self.accept_batch()
+
+    def watchx(self, session):
+        raise Exception('Server::watchx method must be implemented by child class')
+
+    def unwatchx(self, session):
+        raise Exception('Server::unwatchx method must be implemented by child class')
+
+    def drop(self, session):
+        self.unwatchx(session)
+        self.sessions.pop(session.address, None)
+        self.retired.add(session.counters)
+        try:
+            session.close()
+        except socket.error:
+            pass
+
+    def evict(self, session):
+        self.evicted += 1
+        self.retired.add(session.counters)
+        self.unwatchx(session)
+        try:
+            session.close()
+        except socket.error:
+            pass
+        self.notify_all(self.DID_EVICT, session)
+
+    def stats(self):
+        """snapshot of the counters of all sessions, alive or gone
+        """
+
+        now = time.time()
+        uptime = now - self.started if self.started is not None else 0
+
+        counters = stats.Counters()
+        counters.add(self.retired)
+        for session in list(self.sessions.values()):
+            counters.add(session.counters)
+
+        snapshot = counters.snapshot()
+        snapshot.update({
+            'time'                : now,
+            'uptime'              : uptime,
+            'accepted'            : self.accepted,
+            'evicted'             : self.evicted,
+            'active_sessions'     : len(self.sessions),
+            'accept_rate'         : self.accepted / uptime if uptime > 0 else 0.0,
+            'dispatch_latency_us' : self.latency.summary(),
+        })
+
+        if self.dispatcher is not None:
+            snapshot['dispatcher'] = self.dispatcher.stats()
+
+        if self.buffer_pool is not None:
+            snapshot['buffer_pool'] = self.buffer_pool.stats()
+
+        if self.source_limiter is not None:
+            snapshot['source_limit'] = self.source_limiter.stats()
+
+        return snapshot
+
+    def on_ready_accept(self):
+        try:
+            self.accept_batch()
+        except socket.error as error:
+            if error.errno not in (errno.EAGAIN, errno.EWOULDBLOCK):
+                logger.warning('accept error: %s', error)
+
+    def on_ready_recv(self, session):
+        message = session.recv(self.buffersize)
+
+        # deliver pipelined messages already buffered by the session,
+        # an incomplete message may still be completed from the buffers
+        while (message is None or message) and session.pending():
+            message = session.recv(self.buffersize)
+
+        if message is not None and len(message) == 0:
+            self.drop(session)
+
+    def loop_select(self):
+        self.socket.setblocking(0)
+        self.eventloop.add_reader(self.socket, self.on_ready_accept)
+        self.eventloop.run()
+        self.eventloop.remove(self.socket)
+        for session in list(self.sessions.values()):
+            self.drop(session)
 
     def stop(self):
         self.notify_all(self.WILL_STOP)
+        if self.eventloop is not None:
+            self.eventloop.stop()
         print('server stopping...')
         self.socket.close()
+        if self.capture is not None:
+            self.capture.writer.close()
         self.notify_all(self.DID_STOP)
 
     def shutdown(self):
@@ -86,21 +337,36 @@ class Server(notifier.Notifier):
     def run(self):
         self.notify_all(self.WILL_RUN)
         self.start()
-        self.loop_thread.start()
-        self.loop_thread.join()
-        for address, session in self.sessions:
-            session.join()
-        self.stop()
+        if self.eventloop is None:
+            self.loop_thread.start()
+            self.loop_thread.join()
+            for session in self.sessions.values():
+                session.join()
+            self.stop()
+        else:
+            # the event loop returns once the server is stopped
+            self.loop_select()
         self.notify_all(self.DID_RUN)
 
+    def on_recv_timeout(self, session):
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('client timed out: %s', session.address)
+
+        # delivered on the dispatcher thread if any, the event loop is not thread-safe
+        if self.eventloop is not None and self.dispatcher is not None:
+            self.eventloop.call_soon_threadsafe(lambda: self.drop_timed_out(session))
+        else:
+            self.drop_timed_out(session)
+
+    def drop_timed_out(self, session):
+        # the session may have been dropped meanwhile
+        if self.sessions.get(session.address) is session:
+            self.drop(session)
+
     def on_send_success(self, session, message):
-        print('*** SEND [{timestamp}] ***\n[{address}] <= "{message}"\n***  END [{timestamp}] ***\n'.format(
-            timestamp=datetime.datetime.now().strftime('%Y%m%d%H%M%S'),
-            address=session.address,
-            message=message))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('*** SEND ***\n[%s] <= "%s"\n***  END ***\n', session.address, iovec.join(message))
 
     def on_recv_success(self, session, buffersize, message):
-        print('*** RECV [{timestamp}] ***\n[{address}] => "{message}"\n***  END [{timestamp}] ***\n'.format(
-            timestamp=datetime.datetime.now().strftime('%Y%m%d%H%M%S'),
-            address=session.address,
-            message=message))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('*** RECV ***\n[%s] => "%s"\n***  END ***\n', session.address, iovec.to_bytes(message))
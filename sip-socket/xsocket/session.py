@@ -1,8 +1,14 @@
+import errno
 import socket
 import threading
 import time
 
+import framing
+import iovec
 import notifier
+import ratelimit
+import stats
+import writequeue
 
 class Session(notifier.Notifier):
 
@@ -18,6 +24,22 @@ class Session(notifier.Notifier):
     ON_CLOSE_SUCCESS = 'on_close_success'
     ON_CLOSE_FAILURE = 'on_close_failure'
 
+    ON_PAUSE_WRITING  = 'on_pause_writing'
+    ON_RESUME_WRITING = 'on_resume_writing'
+
+    ON_RECV_TIMEOUT = 'on_recv_timeout'
+
+    EVENTS = (
+        ON_SENDING, ON_SEND_SUCCESS, ON_SEND_FAILURE,
+        ON_RECVING, ON_RECV_SUCCESS, ON_RECV_FAILURE,
+        ON_CLOSING, ON_CLOSE_SUCCESS, ON_CLOSE_FAILURE,
+        ON_PAUSE_WRITING, ON_RESUME_WRITING,
+        ON_RECV_TIMEOUT,
+    )
+
+    # double CRLF keep-alive ping (RFC 5626), skipped by stream framers
+    KEEPALIVE = framing.KEEPALIVE * 2
+
     def __init__(self, connection, address):
         notifier.Notifier.__init__(self)
 
@@ -32,24 +54,171 @@ class Session(notifier.Notifier):
         self.enable_send_loop = False
         self.enable_recv_loop = False
 
-        self.send_thread = threading.Thread(target=self.send_loop)
-        self.recv_thread = threading.Thread(target=self.recv_loop)
+        self.closed = False
+
+        self.counters = stats.Counters()
+
+        # recv to dispatch latency histogram (microseconds) shared by the server, if any
+        self.latency = None
+
+        # periodic sends, keep-alives and recv timeouts are timers on a
+        # shared wheel instead of sleeping threads, if enabled
+        self.timer_wheel      = None
+        self.timers           = []
+        self.keepalive_period = None
+        self.recv_timeout     = None
+        self.recv_timer       = None
+
+        # received messages over the rate are dropped before dispatch, if enabled
+        self.bucket = None
+
+        # received messages are views of recycled buffers, if enabled
+        self.buffer_pool = None
+        self.recv_buffer = None
+
+        # outbound messages are queued instead of sent by the caller, if enabled
+        self.write_queue = None
+        self.eventloop   = None
+
+        # threads are created on start, so that idle sessions
+        # driven by an event loop do not hold any thread objects
+        self.send_thread  = None
+        self.recv_thread  = None
+        self.write_thread = None
+
+    def use_timer_wheel(self, wheel):
+        self.timer_wheel = wheel
+
+    def use_rate_limit(self, rate, burst):
+        self.bucket = ratelimit.TokenBucket(rate, burst)
+
+    def use_buffer_pool(self, pool):
+        self.buffer_pool = pool
+
+    def borrow_buffer(self, buffersize):
+        self.recv_buffer = self.buffer_pool.borrow(buffersize)
+        return self.recv_buffer
+
+    def release_buffer(self):
+        if self.recv_buffer is not None:
+            self.buffer_pool.release(self.recv_buffer)
+            self.recv_buffer = None
+
+    def use_write_queue(self, high_watermark, low_watermark, eventloop=None):
+        self.write_queue = writequeue.WriteQueue(high_watermark, low_watermark)
+        self.eventloop   = eventloop
+
+        # the event loop writes whatever the socket accepts and waits for
+        # writability, without a loop the session writes on its own thread
+        if self.eventloop is not None:
+            self.connection.setblocking(0)
 
     def sendx(self, message):
         raise Exception('Session::sendx method must be implemented by child class')
 
+    def sendvx(self, buffers):
+        # transports without scatter-gather sends get a joined message
+        self.sendx(iovec.join(buffers))
+
+    def writex(self, buffers):
+        raise Exception('Session::writex method must be implemented by child class')
+
     def send(self, message):
         self.notify_all(self.ON_SENDING, message)
 
+        if self.write_queue is not None:
+            self.enqueue(message)
+            return
+
         try:
-            self.sendx(message)
+            # a message may be a sequence of buffers, sent without joining them
+            if iovec.is_buffers(message):
+                self.sendvx(message)
+            else:
+                self.sendx(message)
         except socket.error as error:
+            self.counters.send_failures += 1
             self.notify_all(self.ON_SEND_FAILURE, message, error)
         else:
+            self.counters.messages_sent += 1
+            self.counters.bytes_sent += iovec.length(message)
             self.notify_all(self.ON_SEND_SUCCESS, message)
 
-    def send_loop(self):
+    def enqueue(self, message):
+        if self.write_queue.push(message):
+            self.notify_all(self.ON_PAUSE_WRITING)
+
+        if self.eventloop is not None:
+            self.flush()
+
+    def written(self, sent):
+        messages, resumed = self.write_queue.consume(sent)
+
+        self.counters.messages_sent += len(messages)
+        self.counters.bytes_sent += sent
+
+        for message in messages:
+            self.notify_all(self.ON_SEND_SUCCESS, message)
+
+        if resumed:
+            self.notify_all(self.ON_RESUME_WRITING)
+
+    def write_failed(self, error):
+        for message in self.write_queue.clear():
+            self.counters.send_failures += 1
+            self.notify_all(self.ON_SEND_FAILURE, message, error)
+
+    def flush(self):
+        # runs on the event loop, the connection is non-blocking
         while True:
+            buffers = self.write_queue.peek()
+
+            if not buffers:
+                self.written(0)
+                self.eventloop.remove_writer(self.connection)
+                return
+
+            try:
+                sent = self.writex(buffers)
+            except socket.error as error:
+                if error.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    self.eventloop.add_writer(self.connection, self.flush)
+                else:
+                    self.eventloop.remove_writer(self.connection)
+                    self.write_failed(error)
+                return
+
+            self.written(sent)
+
+    def write_loop(self):
+        while not self.closed:
+            # woken by new messages and on close, the timeout only guards a missed wake
+            buffers = self.write_queue.wait(1)
+
+            if not buffers:
+                self.written(0)
+                continue
+
+            try:
+                sent = self.writex(buffers)
+            except socket.error as error:
+                self.write_failed(error)
+                break
+
+            self.written(sent)
+
+    def send_loop_message(self):
+        self.send(self.loop_message)
+
+    def send_keepalive(self):
+        self.send(self.KEEPALIVE)
+
+    def expire_recv(self):
+        self.recv_timer = None
+        self.notify_all(self.ON_RECV_TIMEOUT)
+
+    def send_loop(self):
+        while not self.closed:
             try:
                 self.send(self.loop_message)
             except Exception as error:
@@ -66,14 +235,59 @@ class Session(notifier.Notifier):
         try:
             message = self.recvx(buffersize)
         except socket.error as error:
+            self.release_buffer()
+            self.counters.recv_failures += 1
             self.notify_all(self.ON_RECV_FAILURE, buffersize, error)
-        else:
-            self.notify_all(self.ON_RECV_SUCCESS, buffersize, message)
+            # a failed connection is reported just like a closed one
+            return ''
+
+        try:
+            # framed sessions return None until a complete message arrives
+            if message is not None:
+                self.dispatch(buffersize, message)
+        finally:
+            # the handlers are done with the view, so its buffer is recycled
+            self.release_buffer()
+
+        return message
+
+    def dispatch(self, buffersize, message):
+        received = time.time()
+
+        # a flood is dropped before any handler spends work on it,
+        # an empty message still reports a closed connection
+        if message and self.bucket is not None and not self.bucket.consume(received):
+            self.counters.messages_dropped += 1
+            return
+
+        # O(1) on the wheel, so rearmed on every message
+        if self.recv_timer is not None:
+            self.recv_timer.cancel()
+            self.recv_timer = self.timer_wheel.call_later(self.recv_timeout, self.expire_recv)
+
+        if message:
+            self.counters.messages_received += 1
+            self.counters.bytes_received += len(message)
+
+        self.notify_all(self.ON_RECV_SUCCESS, buffersize, message)
+
+        if message and self.latency is not None:
+            self.latency.record((time.time() - received) * 1000000)
+
+    def stats(self):
+        snapshot = self.counters.snapshot()
+        snapshot['queued_bytes'] = self.write_queue.size if self.write_queue is not None else 0
+        return snapshot
+
+    def pending(self):
+        return False
 
     def recv_loop(self):
-        while True:
+        while not self.closed:
             try:
                 self.recv(self.loop_buffersize)
+                while self.pending():
+                    self.recv(self.loop_buffersize)
             except Exception as error:
                 print('recv_loop error: {error}'.format(error=error))
                 break
@@ -91,19 +305,54 @@ class Session(notifier.Notifier):
             self.notify_all(self.ON_CLOSE_FAILURE, error)
             raise
         else:
+            self.closed = True
+            self.cancel_timers()
+            if self.write_queue is not None:
+                self.write_queue.wake()
             self.notify_all(self.ON_CLOSE_SUCCESS)
 
-    def start(self):
+    def start_timers(self):
         if self.enable_send_loop:
+            self.timers.append(self.timer_wheel.call_every(self.loop_period_send, self.send_loop_message))
+
+        if self.keepalive_period:
+            self.timers.append(self.timer_wheel.call_every(self.keepalive_period, self.send_keepalive))
+
+        if self.recv_timeout:
+            self.recv_timer = self.timer_wheel.call_later(self.recv_timeout, self.expire_recv)
+
+    def cancel_timers(self):
+        for timer in self.timers:
+            timer.cancel()
+        self.timers = []
+
+        if self.recv_timer is not None:
+            self.recv_timer.cancel()
+            self.recv_timer = None
+
+    def start(self):
+        if self.timer_wheel is not None:
+            self.start_timers()
+        elif self.enable_send_loop:
+            self.send_thread = threading.Thread(target=self.send_loop)
             self.send_thread.start()
 
         if self.enable_recv_loop:
+            self.recv_thread = threading.Thread(target=self.recv_loop)
             self.recv_thread.start()
 
+        if self.write_queue is not None and self.eventloop is None:
+            self.write_thread = threading.Thread(target=self.write_loop)
+            self.write_thread.start()
+
     def join(self):
-        if self.enable_send_loop:
+        if self.send_thread is not None:
             self.send_thread.join()
-        if self.enable_recv_loop:
+        if self.recv_thread is not None:
             self.recv_thread.join()
 
         self.close()
+
+        # the writer waits for messages until the session is closed
+        if self.write_thread is not None:
+            self.write_thread.join()
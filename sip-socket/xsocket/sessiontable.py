@@ -0,0 +1,113 @@
+"""provides a bounded session table for connectionless servers
+
+Classes:
+    SessionTable: LRU session map bounded in size and idle time
+"""
+
+
+import collections
+import time
+
+class SessionTable(object):
+    """Session Table
+
+    Sessions are kept in least recently used order, so both the size
+    bound and the idle timeout evict from the front in O(1). Idle sessions
+    are expired on insertion, and at most every expire_period on activity,
+    so that they are reclaimed under a stable set of peers as well.
+
+    Attributes:
+        maximum_size: maximum number of sessions, None for unbounded
+        idle_timeout: seconds after which an idle session is evicted, None for never
+        on_evict: called with each evicted session
+        entries: address -> [session, last activity time]
+        expire_period: minimum seconds between two expiries on activity
+        next_expiry: time of the next expiry on activity
+
+    Methods:
+        touch: mark the session of the address as active and return it
+        expire: evict the sessions idle for longer than idle_timeout
+    """
+
+    def __init__(self, maximum_size, idle_timeout, on_evict=None):
+        self.maximum_size  = maximum_size
+        self.idle_timeout  = idle_timeout
+        self.on_evict      = on_evict
+        self.entries       = collections.OrderedDict()
+        self.expire_period = 1.0
+        self.next_expiry   = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, address):
+        return address in self.entries
+
+    def __getitem__(self, address):
+        return self.entries[address][0]
+
+    def __setitem__(self, address, session):
+        self.entries.pop(address, None)
+        self.entries[address] = [session, time.time()]
+
+        self.expire()
+
+        while self.maximum_size is not None and len(self.entries) > self.maximum_size:
+            self.evict()
+
+    def get(self, address, default=None):
+        entry = self.entries.get(address)
+        if entry is None:
+            return default
+        return entry[0]
+
+    def pop(self, address, default=None):
+        entry = self.entries.pop(address, None)
+        if entry is None:
+            return default
+        return entry[0]
+
+    def touch(self, address):
+        now = time.time()
+
+        # the session of the address itself may be the one expiring
+        if now >= self.next_expiry:
+            self.expire(now)
+
+        entry = self.entries.pop(address, None)
+        if entry is None:
+            return None
+
+        entry[1] = now
+        self.entries[address] = entry
+
+        return entry[0]
+
+    def evict(self):
+        address, entry = self.entries.popitem(last=False)
+        if self.on_evict is not None:
+            self.on_evict(entry[0])
+
+    def expire(self, now=None):
+        if self.idle_timeout is None:
+            return
+
+        now = now or time.time()
+        self.next_expiry = now + self.expire_period
+
+        deadline = now - self.idle_timeout
+
+        while self.entries:
+            oldest = self.entries[next(iter(self.entries))]
+            if oldest[1] > deadline:
+                break
+            self.evict()
+
+    def keys(self):
+        return list(self.entries.keys())
+
+    def values(self):
+        return [entry[0] for entry in self.entries.values()]
+
+    def items(self):
+        return [(address, entry[0]) for address, entry in self.entries.items()]
@@ -0,0 +1,175 @@
+"""provides traffic counters and the export of their snapshots
+
+Snapshots are plain dicts of numbers, nested dicts and histogram
+summaries, as returned by Server.stats(), so that they can be written
+as json lines or in the Prometheus text exposition format.
+
+Classes:
+    Counters: message, byte and failure counters of a session
+    Reporter: writes snapshots periodically
+
+Functions:
+    to_json: render a snapshot as a single json line
+    to_prometheus: render a snapshot in the Prometheus text format
+"""
+
+
+import json
+import os
+import sys
+import threading
+
+QUANTILES = (
+    ('0.5', 'p50'),
+    ('0.9', 'p90'),
+    ('0.99', 'p99'),
+    ('0.999', 'p999'),
+)
+
+class Counters(object):
+    """Traffic Counters
+
+    Plain attributes incremented by the owning session only,
+    so counting takes no lock and no call.
+
+    Attributes:
+        messages_sent: number of messages sent
+        bytes_sent: number of bytes sent
+        messages_received: number of messages received
+        bytes_received: number of bytes received
+        send_failures: number of failed sends
+        recv_failures: number of failed recvs
+        messages_dropped: number of received messages over the rate limit
+
+    Methods:
+        add: add the counts of other counters
+        snapshot: return the counts as a dict
+    """
+
+    KEYS = (
+        'messages_sent', 'bytes_sent',
+        'messages_received', 'bytes_received',
+        'send_failures', 'recv_failures',
+        'messages_dropped',
+    )
+
+    def __init__(self):
+        self.messages_sent     = 0
+        self.bytes_sent        = 0
+        self.messages_received = 0
+        self.bytes_received    = 0
+        self.send_failures     = 0
+        self.recv_failures     = 0
+        self.messages_dropped  = 0
+
+    def add(self, other):
+        for key in self.KEYS:
+            setattr(self, key, getattr(self, key) + getattr(other, key))
+
+    def snapshot(self):
+        return dict((key, getattr(self, key)) for key in self.KEYS)
+
+# monotonically increasing values, exported as Prometheus counters
+COUNTERS = Counters.KEYS + ('accepted', 'evicted', 'submitted', 'dropped', 'hits', 'misses')
+
+def format_value(value):
+    # full precision floats, and no long suffix on python 2
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+def to_json(snapshot):
+    return json.dumps(snapshot, sort_keys=True)
+
+def is_summary(value):
+    return isinstance(value, dict) and 'p50' in value and 'count' in value
+
+def to_prometheus(snapshot, prefix='xsocket'):
+    lines = []
+
+    for key in sorted(snapshot):
+        value = snapshot[key]
+        name = '{prefix}_{key}'.format(prefix=prefix, key=key)
+
+        if is_summary(value):
+            lines.append('# TYPE {name} summary'.format(name=name))
+            for quantile, field in QUANTILES:
+                lines.append('{name}{{quantile="{quantile}"}} {value}'.format(name=name, quantile=quantile, value=format_value(value[field])))
+            lines.append('{name}_sum {value}'.format(name=name, value=format_value(value['mean'] * value['count'])))
+            lines.append('{name}_count {value}'.format(name=name, value=format_value(value['count'])))
+        elif isinstance(value, dict):
+            lines.append(to_prometheus(value, name).rstrip('\n'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            if key in COUNTERS:
+                name += '_total'
+                lines.append('# TYPE {name} counter'.format(name=name))
+            else:
+                lines.append('# TYPE {name} gauge'.format(name=name))
+            lines.append('{name} {value}'.format(name=name, value=format_value(value)))
+
+    return '\n'.join(line for line in lines if line) + '\n'
+
+class Reporter(object):
+    """Periodic Stats Reporter
+
+    Json snapshots are appended as lines, Prometheus snapshots replace
+    the file (e.g. for a textfile collector) through an atomic rename.
+
+    Attributes:
+        source: callable returning the snapshot
+        period: seconds between snapshots
+        format: 'json' or 'prometheus'
+        path: file to write to, stdout if None
+        thread: reporting thread
+        stopped: stops the reporting thread
+
+    Methods:
+        start: start reporting
+        report: write a single snapshot
+        stop: stop reporting
+    """
+
+    FORMATS = ('json', 'prometheus')
+
+    def __init__(self, source, period, format='json', path=None):
+        if format not in self.FORMATS:
+            raise Exception('unknown stats format: {format}'.format(format=format))
+
+        self.source  = source
+        self.period  = period
+        self.format  = format
+        self.path    = path
+        self.stopped = threading.Event()
+        self.thread  = threading.Thread(target=self.run)
+        self.thread.daemon = True
+
+    def start(self):
+        self.thread.start()
+
+    def report(self):
+        snapshot = self.source()
+
+        if self.format == 'json':
+            text = to_json(snapshot) + '\n'
+        else:
+            text = to_prometheus(snapshot)
+
+        if self.path is None:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+        elif self.format == 'json':
+            with open(self.path, 'a') as f:
+                f.write(text)
+        else:
+            temporary = self.path + '.tmp'
+            with open(temporary, 'w') as f:
+                f.write(text)
+            os.rename(temporary, self.path)
+
+    def run(self):
+        while not self.stopped.wait(self.period):
+            self.report()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
@@ -1,17 +1,43 @@
+import socket
+
 import client
 import constants
+import iovec
 
 class Client(client.Client):
 
     def __init__(self, ip, port, timeout, sendloop, recvloop, sendrecvloop, sslversion, maximum_trial_count):
         client.Client.__init__(self, self.TCP, ip, port, timeout, sendloop, recvloop, sendrecvloop, sslversion, maximum_trial_count)
 
+    def use_keepalive(self, idle, interval, count):
+        self.root_socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+        # fine tuning is not available on every platform
+        if hasattr(socket, 'TCP_KEEPIDLE'):
+            self.root_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, idle)
+        if hasattr(socket, 'TCP_KEEPINTVL'):
+            self.root_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, interval)
+        if hasattr(socket, 'TCP_KEEPCNT'):
+            self.root_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, count)
+
     def connectx(self):
         self.socket.connect(self.address)
 
     def sendx(self, message):
         self.socket.sendall(message)
 
+    def sendvx(self, buffers):
+        iovec.sendall(self.socket, buffers)
+
     def recvx(self, buffersize):
-        message = self.socket.recv(buffersize)
+        if self.framer is None:
+            message = self.socket.recv(buffersize)
+            return message
+
+        message = self.framer.pop()
+        while message is None:
+            if self.framer.fill(self.socket) == 0:
+                return ''
+            message = self.framer.pop()
+
         return message
@@ -1,22 +1,60 @@
 import socket
+import ssl
 
 import constants
+import framing
+import iovec
+import log
 import server
 import session
 
+logger = log.get_logger('tcpserver')
+
 class Session(session.Session):
 
     def __init__(self, connection, address):
         session.Session.__init__(self, connection, address)
 
+        self.framer = None
+
     def sendx(self, message):
         self.connection.sendall(message)
 
+    def sendvx(self, buffers):
+        iovec.sendall(self.connection, buffers)
+
+    def writex(self, buffers):
+        return iovec.send(self.connection, buffers)
+
     def recvx(self, buffersize):
-        message = self.connection.recv(buffersize)
-        return message
+        if self.framer is None:
+            if self.buffer_pool is not None:
+                buffer = self.borrow_buffer(buffersize)
+                received = self.connection.recv_into(buffer, buffersize)
+                return memoryview(buffer)[:received]
+
+            message = self.connection.recv(buffersize)
+            return message
+
+        message = self.framer.pop()
+        if message is None and self.framer.fill(self.connection) == 0:
+            return ''
+
+        return message or self.framer.pop()
+
+    def pending(self):
+        if self.framer is not None and self.framer.pending():
+            return True
+
+        # data decrypted by the ssl layer is invisible to select
+        return hasattr(self.connection, 'pending') and self.connection.pending() > 0
 
     def closex(self):
+        try:
+            # also wakes up a recv blocked on another thread
+            self.connection.shutdown(socket.SHUT_RDWR)
+        except socket.error:
+            pass
         self.connection.close()
 
 class Server(server.Server):
@@ -24,10 +62,104 @@ class Server(server.Server):
     def __init__(self, port, buffersize, sendloop, recvloop):
         server.Server.__init__(self, self.TCP, port, buffersize, sendloop, recvloop)
 
+        self.ssl_context       = None
+        self.handshake_timeout = None
+
+    def use_tls(self, certfile, keyfile=None, ssl_version=ssl.PROTOCOL_SSLv23, handshake_timeout=10):
+        """serve over tls, a client not completing its handshake within
+        handshake_timeout seconds is dropped
+        """
+
+        self.ssl_context = ssl.SSLContext(ssl_version)
+        self.ssl_context.load_cert_chain(certfile, keyfile)
+        self.handshake_timeout = handshake_timeout
+
     def startx(self):
-        self.socket.listen(1)
+        self.socket.listen(self.backlog)
 
-    def acceptx(self):
-        connection, address = self.socket.accept()
+    def accept_connection(self):
+        return self.socket.accept()
+
+    def create_session(self, connection, address):
         session = Session(connection, address)
+        if self.framing:
+            session.framer = framing.StreamFramer(self.buffersize)
         return session
+
+    def acceptx(self):
+        connection, address = self.accept_connection()
+        if not self.limit_source(address):
+            connection.close()
+            return None
+
+        if self.ssl_context is None:
+            return self.create_session(connection, address)
+
+        connection = self.ssl_context.wrap_socket(connection, server_side=True, do_handshake_on_connect=False)
+
+        # the event loop serves the other sessions during the handshake
+        if self.eventloop is not None:
+            connection.setblocking(0)
+            self.handshake(connection, address)
+            return None
+
+        # a silent client must not stall the accept thread for good
+        connection.settimeout(self.handshake_timeout)
+        try:
+            connection.do_handshake()
+        except (ssl.SSLError, socket.error) as error:
+            logger.warning('tls handshake failed: %s %s', address, error)
+            connection.close()
+            return None
+        connection.settimeout(None)
+
+        return self.create_session(connection, address)
+
+    def handshake(self, connection, address):
+        """complete the tls handshake of the connection on the event loop,
+        then admit its session, drop the connection on error or timeout
+        """
+
+        loop = self.eventloop
+
+        def drop():
+            loop.remove(connection)
+            connection.close()
+
+        timer = loop.call_later(self.handshake_timeout, drop)
+
+        def step():
+            try:
+                connection.do_handshake()
+            except ssl.SSLError as error:
+                if error.args[0] == ssl.SSL_ERROR_WANT_READ:
+                    loop.remove_writer(connection)
+                    loop.add_reader(connection, step)
+                    return
+                if error.args[0] == ssl.SSL_ERROR_WANT_WRITE:
+                    loop.remove_reader(connection)
+                    loop.add_writer(connection, step)
+                    return
+                logger.warning('tls handshake failed: %s %s', address, error)
+                timer.cancel()
+                drop()
+                return
+            except socket.error as error:
+                logger.warning('tls handshake failed: %s %s', address, error)
+                timer.cancel()
+                drop()
+                return
+
+            timer.cancel()
+            loop.remove(connection)
+            connection.setblocking(1)
+            self.admit(self.create_session(connection, address))
+
+        step()
+
+    def watchx(self, session):
+        self.eventloop.add_reader(session.connection, lambda: self.on_ready_recv(session))
+
+    def unwatchx(self, session):
+        if self.eventloop is not None:
+            self.eventloop.remove(session.connection)
@@ -0,0 +1,211 @@
+"""provides a hierarchical timer wheel
+
+Timers of all sessions share a single wheel (and thread), instead of a
+sleeping thread per session loop. Scheduling and cancelling a timer are
+O(1): a timer is put into (or removed from) the slot set of its tick,
+in the lowest level whose range covers its delay. Whenever a level
+wraps around, the next slot of the level above is cascaded down.
+
+Classes:
+    WheelTimer: handle of a scheduled callback
+    TimerWheel: schedules one-shot and periodic callbacks in ticks
+
+Functions:
+    shared: return the wheel shared by all sessions and clients
+"""
+
+
+import threading
+import time
+
+import log
+
+logger = log.get_logger('timerwheel')
+
+class WheelTimer(object):
+    """handle of a callback scheduled on a timer wheel
+    """
+
+    def __init__(self, wheel, first, deadline, callback, period):
+        self.wheel     = wheel
+        self.first     = first
+        self.calls     = 0
+        self.deadline  = deadline
+        self.callback  = callback
+        self.period    = period
+        self.slot      = None
+        self.active    = True
+        self.cancelled = False
+
+    def cancel(self):
+        self.wheel.cancel(self)
+
+class TimerWheel(object):
+    """Hierarchical Timer Wheel
+
+    Periodic timers are rescheduled from the time of their first call,
+    in seconds, not from the time their callback returned or from their
+    previous tick, so they do not drift (nor accumulate the rounding of
+    a period that is not a multiple of the tick).
+
+    Attributes:
+        tick: resolution in seconds
+        bits: log2 of the number of slots per level
+        levels: number of levels, covering 2^(bits * levels) ticks
+        wheels: slot sets of every level
+        current: last processed tick
+        count: number of scheduled timers
+        lock: guards the slots, timers are scheduled from any thread
+        thread: driving thread, if started
+        running: driving thread is running
+
+    Methods:
+        call_later: call the callback once after the given delay
+        call_every: call the callback periodically
+        cancel: cancel the timer
+        advance: fire the timers expired until now
+        start: drive the wheel from a dedicated thread
+        stop: stop the driving thread
+    """
+
+    def __init__(self, tick=0.05, bits=8, levels=4):
+        self.tick    = tick
+        self.bits    = bits
+        self.levels  = levels
+        self.mask    = (1 << bits) - 1
+        self.range   = 1 << (bits * levels)
+        self.wheels  = [[set() for i in range(1 << bits)] for level in range(levels)]
+        self.current = self.ticks(time.time())
+        self.count   = 0
+        self.lock    = threading.Lock()
+        self.thread  = None
+        self.running = False
+
+    def ticks(self, seconds):
+        return int(seconds / self.tick)
+
+    def place(self, timer, minimum):
+        # far away timers wait in the top level and are placed again when due
+        deadline = min(max(timer.deadline, minimum), self.current + self.range - 1)
+        delta = deadline - self.current
+
+        level = 0
+        while level < self.levels - 1 and delta >= 1 << (self.bits * (level + 1)):
+            level += 1
+
+        timer.slot = self.wheels[level][(deadline >> (self.bits * level)) & self.mask]
+        timer.slot.add(timer)
+
+    def schedule(self, delay, callback, period):
+        with self.lock:
+            first = time.time() + delay
+            timer = WheelTimer(self, first, self.ticks(first), callback, period)
+            self.place(timer, self.current + 1)
+            self.count += 1
+            return timer
+
+    def call_later(self, delay, callback):
+        return self.schedule(delay, callback, None)
+
+    def call_every(self, period, callback, delay=None):
+        return self.schedule(period if delay is None else delay, callback, period)
+
+    def cancel(self, timer):
+        with self.lock:
+            timer.cancelled = True
+            if not timer.active:
+                return
+            timer.active = False
+            if timer.slot is not None:
+                timer.slot.discard(timer)
+                timer.slot = None
+            self.count -= 1
+
+    def cascade(self, level, tick):
+        slot = self.wheels[level][(tick >> (self.bits * level)) & self.mask]
+        timers = list(slot)
+        slot.clear()
+        for timer in timers:
+            self.place(timer, tick)
+
+    def expire(self, tick):
+        # the highest level wrapping around is cascaded first,
+        # so that every level below is refilled before it is visited
+        level = 1
+        while level < self.levels and tick & ((1 << (self.bits * level)) - 1) == 0:
+            level += 1
+        for upper in range(level - 1, 0, -1):
+            self.cascade(upper, tick)
+
+        slot = self.wheels[0][tick & self.mask]
+        expired = []
+        for timer in list(slot):
+            slot.discard(timer)
+            if timer.deadline > tick:
+                self.place(timer, tick + 1)
+            else:
+                timer.slot = None
+                expired.append(timer)
+
+        return expired
+
+    def advance(self, now=None):
+        now = self.ticks(now or time.time())
+
+        expired = []
+        with self.lock:
+            while self.current < now:
+                self.current += 1
+                expired.extend(self.expire(self.current))
+
+            for timer in expired:
+                if timer.period is None:
+                    timer.active = False
+                    self.count -= 1
+                else:
+                    timer.calls += 1
+                    timer.deadline = self.ticks(timer.first + timer.calls * timer.period)
+                    self.place(timer, self.current + 1)
+
+        for timer in expired:
+            # an earlier callback may have cancelled it
+            if timer.cancelled:
+                continue
+            try:
+                timer.callback()
+            except Exception as error:
+                logger.error('timer error: %s', error)
+
+        return len(expired)
+
+    def run(self):
+        while self.running:
+            time.sleep(max(0, (self.current + 1) * self.tick - time.time()))
+            self.advance()
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+shared_wheel = None
+shared_lock  = threading.Lock()
+
+def shared():
+    """return the started wheel shared by all sessions and clients
+    """
+
+    global shared_wheel
+
+    with shared_lock:
+        if shared_wheel is None:
+            shared_wheel = TimerWheel()
+            shared_wheel.start()
+        return shared_wheel
@@ -0,0 +1,96 @@
+"""provides shared TLS state of clients
+
+Classes:
+    TlsCache: caches SSL contexts, TLS sessions and negotiated versions
+
+Constants:
+    RESUMPTION: TLS session resumption is supported by the ssl module
+"""
+
+
+import ssl
+import threading
+
+RESUMPTION = hasattr(ssl, 'SSLSession')
+
+class TlsCache(object):
+    """TLS Cache
+
+    A context is built once per configuration instead of once per
+    connect, the last session per server is resumed on reconnect
+    (abbreviated handshake) and the version a server accepted is tried
+    first next time.
+
+    Attributes:
+        ciphers: cipher list of the contexts
+        contexts: ssl_version -> SSLContext
+        sessions: (server address, ssl_version) -> last TLS session
+        versions: server address -> last negotiated sslversion name
+        lock: guards the caches
+
+    Methods:
+        context: return the shared context of the given ssl_version
+        wrap: wrap the socket, resuming the last session of the address
+        remember: store the session and version negotiated with the address
+        forget: drop the state of the address
+        order: order the sslversion names, last negotiated first
+    """
+
+    def __init__(self, ciphers='AES128-SHA256'):
+        self.ciphers  = ciphers
+        self.contexts = {}
+        self.sessions = {}
+        self.versions = {}
+        self.lock     = threading.Lock()
+
+    def context(self, ssl_version):
+        with self.lock:
+            context = self.contexts.get(ssl_version)
+            if context is None:
+                context = ssl.SSLContext(ssl_version)
+                context.verify_mode = ssl.CERT_NONE
+                context.set_ciphers(self.ciphers)
+                self.contexts[ssl_version] = context
+            return context
+
+    def wrap(self, sock, ssl_version, address):
+        # python versions without SSLContext
+        if not hasattr(ssl, 'SSLContext'):
+            return ssl.wrap_socket(
+                sock,
+                ssl_version=ssl_version,
+                do_handshake_on_connect=False,
+                suppress_ragged_eofs=False,
+                ciphers=self.ciphers)
+
+        kwargs = {}
+        # a session can only be resumed by the context that created it
+        session = self.sessions.get((address, ssl_version))
+        if RESUMPTION and session is not None:
+            kwargs['session'] = session
+
+        return self.context(ssl_version).wrap_socket(
+            sock,
+            do_handshake_on_connect=False,
+            suppress_ragged_eofs=False,
+            **kwargs)
+
+    def remember(self, address, sslversion, ssl_version, sock):
+        with self.lock:
+            self.versions[address] = sslversion
+            if RESUMPTION and sock.session is not None:
+                self.sessions[(address, ssl_version)] = sock.session
+
+    def forget(self, address):
+        with self.lock:
+            self.versions.pop(address, None)
+            for key in [key for key in self.sessions if key[0] == address]:
+                del self.sessions[key]
+
+    def order(self, address, sslversions):
+        sslversions = list(sslversions)
+        last = self.versions.get(address)
+        if last in sslversions:
+            sslversions.remove(last)
+            sslversions.insert(0, last)
+        return sslversions
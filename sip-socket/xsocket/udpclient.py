@@ -1,5 +1,6 @@
 import client
 import constants
+import iovec
 
 class Client(client.Client):
 
@@ -12,6 +13,9 @@ class Client(client.Client):
     def sendx(self, message):
         self.socket.sendto(message, self.address)
 
+    def sendvx(self, buffers):
+        iovec.sendto(self.socket, buffers, self.address)
+
     def recvx(self, buffersize):
-        message = self.socket.recvfrom(buffersize)
+        message, address = self.socket.recvfrom(buffersize)
         return message
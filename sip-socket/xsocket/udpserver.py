@@ -1,6 +1,15 @@
+import errno
+import socket
+import time
+
 import constants
+import iovec
 import server
 import session
+import sessiontable
+
+# not exposed by the socket module of older pythons, 0x40 on linux
+MSG_DONTWAIT = getattr(socket, 'MSG_DONTWAIT', 0x40)
 
 class Session(session.Session):
 
@@ -10,6 +19,9 @@ class Session(session.Session):
     def sendx(self, message):
         self.connection.sendto(message, self.address)
 
+    def sendvx(self, buffers):
+        iovec.sendto(self.connection, buffers, self.address)
+
     def recvx(self, buffersize):
         message, address = self.connection.recvfrom(buffersize)
         return message
@@ -19,25 +31,116 @@ class Session(session.Session):
 
 class Server(server.Server):
 
+    MAXIMUM_SESSIONS = 10000
+    IDLE_TIMEOUT     = 300
+    EXPIRE_PERIOD    = 5
+
     def __init__(self, port, buffersize, sendloop, recvloop):
         server.Server.__init__(self, self.UDP, port, buffersize, sendloop, recvloop)
 
+        # every source address gets a session, so bound them
+        self.sessions = sessiontable.SessionTable(self.MAXIMUM_SESSIONS, self.IDLE_TIMEOUT, self.evict)
+
+        # periodic expiry on the event loop, see expire
+        self.expire_timer = None
+
     def startx(self):
-        pass
+        if self.eventloop is not None:
+            self.expire()
 
-    def acceptx(self):
-        message, address = self.socket.recvfrom(self.buffersize)
-        if address in self.sessions:
-            session = self.sessions[address]
-        else:
+    def expire(self):
+        """evict the idle sessions even while no datagram arrives,
+        the sessions are expired on receipt otherwise (threaded mode)
+        """
+
+        self.sessions.expire()
+        self.expire_timer = self.eventloop.call_later(self.EXPIRE_PERIOD, self.expire)
+
+    def deliver(self, message, address):
+        session = self.sessions.touch(address)
+        if session is None:
             session = Session(self.socket, address)
+            self.admit(session)
 
-        session.notify_all(session.ON_RECV_SUCCESS, self.buffersize, message)
-        self.on_recv_success(session, self.buffersize, message)
+        # the server observes the session once admitted
+        session.dispatch(self.buffersize, message)
         return session
 
+    def recvfrom(self, flags=0):
+        """receive a datagram, into a recycled buffer if enabled,
+        return the message, the source address and the buffer to release
+        """
+
+        # dispatched handlers run after the buffer would be recycled
+        if self.buffer_pool is None or self.dispatcher is not None:
+            message, address = self.socket.recvfrom(self.buffersize, flags)
+            return message, address, None
+
+        buffer = self.buffer_pool.borrow()
+        try:
+            received, address = self.socket.recvfrom_into(buffer, self.buffersize, flags)
+        except socket.error:
+            self.buffer_pool.release(buffer)
+            raise
+
+        return memoryview(buffer)[:received], address, buffer
+
+    def release(self, buffer):
+        if buffer is not None:
+            self.buffer_pool.release(buffer)
+
+    def acceptx(self):
+        message, address, buffer = self.recvfrom()
+        try:
+            if not self.limit_source(address):
+                return None
+            return self.deliver(message, address)
+        finally:
+            self.release(buffer)
+
+    def recv_batch(self):
+        """drain the pending datagrams, the first recvfrom blocks
+        unless the socket is non-blocking
+        """
+
+        datagrams = [self.recvfrom()]
+
+        while len(datagrams) < self.accept_batchsize:
+            try:
+                datagrams.append(self.recvfrom(MSG_DONTWAIT))
+            except socket.error as error:
+                if error.errno not in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    raise
+                break
+
+        return datagrams
+
+    def accept_batch(self):
+        self.notify_all(self.WILL_ACCEPT)
+        now = time.time()
+        for message, address, buffer in self.recv_batch():
+            try:
+                if self.limit_source(address, now):
+                    self.deliver(message, address)
+            finally:
+                self.release(buffer)
+
+    def watchx(self, session):
+        # datagrams of all sessions arrive on the server socket
+        pass
+
+    def unwatchx(self, session):
+        pass
+
     def stopx(self):
         pass
 
+    def stop(self):
+        if self.expire_timer is not None:
+            self.expire_timer.cancel()
+            self.expire_timer = None
+
+        server.Server.stop(self)
+
     def shutdownx(self):
         pass
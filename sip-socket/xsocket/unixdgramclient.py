@@ -0,0 +1,24 @@
+import socket
+
+import udpclient
+import unixpath
+
+class Client(udpclient.Client):
+
+    FAMILY = socket.AF_UNIX
+
+    def __init__(self, path, timeout, sendloop, recvloop, sendrecvloop, sslversion, maximum_trial_count):
+        udpclient.Client.__init__(self, path, None, timeout, sendloop, recvloop, sendrecvloop, sslversion, maximum_trial_count)
+
+        self.path = path
+        self.address = path
+
+        # an unnamed datagram socket cannot be replied to
+        self.local_path = unixpath.temporary('xsocket-client')
+
+    def connectx(self):
+        unixpath.bind(self.socket, self.local_path)
+
+    def disconnect(self):
+        udpclient.Client.disconnect(self)
+        unixpath.unlink(self.local_path)
@@ -0,0 +1,20 @@
+import socket
+
+import udpserver
+import unixpath
+
+class Server(udpserver.Server):
+
+    FAMILY = socket.AF_UNIX
+
+    def __init__(self, path, buffersize, sendloop, recvloop):
+        udpserver.Server.__init__(self, path, buffersize, sendloop, recvloop)
+
+        self.path = path
+
+    def bindx(self):
+        unixpath.bind(self.socket, self.path)
+
+    def stop(self):
+        udpserver.Server.stop(self)
+        unixpath.unlink(self.path)
@@ -0,0 +1,40 @@
+"""provides the socket paths of the unix domain transports
+
+Functions:
+    bind: bind a unix domain socket, replacing a stale socket file
+    unlink: remove a socket file
+    temporary: return a unique temporary socket path
+"""
+
+
+import itertools
+import os
+import stat
+import tempfile
+
+sequence = itertools.count()
+
+def unlink(path):
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+    except OSError:
+        pass
+
+def bind(sock, path):
+    """bind the socket to the path, a socket file left behind by
+    a previous (crashed) process is removed first
+    """
+
+    unlink(path)
+    sock.bind(path)
+
+def temporary(prefix='xsocket'):
+    """return a socket path unique to this process,
+    e.g. to receive the replies of a datagram server
+    """
+
+    return os.path.join(tempfile.gettempdir(), '{prefix}-{pid}-{index}.sock'.format(
+        prefix=prefix,
+        pid=os.getpid(),
+        index=next(sequence)))
@@ -0,0 +1,13 @@
+import socket
+
+import tcpclient
+
+class Client(tcpclient.Client):
+
+    FAMILY = socket.AF_UNIX
+
+    def __init__(self, path, timeout, sendloop, recvloop, sendrecvloop, sslversion, maximum_trial_count):
+        tcpclient.Client.__init__(self, path, None, timeout, sendloop, recvloop, sendrecvloop, sslversion, maximum_trial_count)
+
+        self.path = path
+        self.address = path
@@ -0,0 +1,29 @@
+import socket
+
+import tcpserver
+import unixpath
+
+class Server(tcpserver.Server):
+
+    FAMILY = socket.AF_UNIX
+
+    def __init__(self, path, buffersize, sendloop, recvloop):
+        tcpserver.Server.__init__(self, path, buffersize, sendloop, recvloop)
+
+        self.path = path
+
+        # connects fail with EAGAIN instead of waiting once the backlog is full
+        self.backlog = socket.SOMAXCONN
+
+    def bindx(self):
+        unixpath.bind(self.socket, self.path)
+
+    def accept_connection(self):
+        connection, address = self.socket.accept()
+
+        # clients are unnamed, so their sessions are told apart by descriptor
+        return connection, (self.path, connection.fileno())
+
+    def stop(self):
+        tcpserver.Server.stop(self)
+        unixpath.unlink(self.path)
@@ -0,0 +1,138 @@
+"""provides the outbound write queue of stream sessions
+
+Classes:
+    WriteQueue: bounded queue of outbound messages with watermarks
+"""
+
+
+import collections
+import threading
+
+import bufferpool
+import iovec
+
+class WriteQueue(object):
+    """Write Queue
+
+    Senders push messages and return at once, the writer of the session
+    takes the head of the queue as a list of buffers, so many small
+    messages go out with a single system call, and consumes whatever
+    was written. Writing is paused once the queued size reaches the high
+    watermark and resumed once it drains to the low watermark.
+
+    Attributes:
+        high_watermark: queued size pausing the producers
+        low_watermark: queued size resuming the producers
+        maximum_write: maximum number of bytes taken per write
+        entries: queued [message, remaining buffers] pairs
+        size: number of queued bytes
+        paused: producers are asked to pause
+        ready: signals queued messages to a waiting writer
+
+    Methods:
+        push: queue a message
+        peek: return the buffers of the next write
+        consume: drop the written bytes, return the completed messages
+        clear: drop and return all queued messages
+        wait: wait for queued messages
+        wake: wake a waiting writer
+    """
+
+    def __init__(self, high_watermark=65536, low_watermark=16384):
+        self.high_watermark = high_watermark
+        self.low_watermark  = low_watermark
+        self.maximum_write  = 65536
+        self.entries        = collections.deque()
+        self.size           = 0
+        self.paused         = False
+        self.ready          = threading.Condition()
+
+    def push(self, message):
+        """queue the message (or sequence of buffers),
+        return whether the high watermark has just been reached
+        """
+
+        buffers = message if iovec.is_buffers(message) else [message]
+
+        # a pooled receive buffer is recycled once the handlers return,
+        # so it is copied, and so is the message given to the send handlers
+        if any(bufferpool.is_pooled(buffer) for buffer in buffers):
+            buffers = [iovec.to_bytes(buffer) if bufferpool.is_pooled(buffer) else buffer for buffer in buffers]
+            message = buffers if iovec.is_buffers(message) else buffers[0]
+
+        views = [memoryview(buffer) for buffer in buffers if len(buffer) > 0]
+
+        with self.ready:
+            self.entries.append([message, views])
+            self.size += sum(len(view) for view in views)
+
+            self.ready.notify()
+
+            if not self.paused and self.size >= self.high_watermark:
+                self.paused = True
+                return True
+
+        return False
+
+    def peek(self):
+        with self.ready:
+            buffers = []
+            size = 0
+
+            for message, views in self.entries:
+                for view in views:
+                    if size >= self.maximum_write or len(buffers) >= iovec.IOV_MAX:
+                        return buffers
+                    buffers.append(view)
+                    size += len(view)
+
+            return buffers
+
+    def consume(self, sent):
+        """drop the given number of written bytes,
+        return the completed messages and whether the low watermark has just been reached
+        """
+
+        completed = []
+
+        with self.ready:
+            self.size -= sent
+
+            while self.entries:
+                message, views = self.entries[0]
+
+                while views and sent >= len(views[0]):
+                    sent -= len(views.pop(0))
+
+                if views:
+                    if sent > 0:
+                        views[0] = views[0][sent:]
+                    break
+
+                completed.append(self.entries.popleft()[0])
+
+            resumed = self.paused and self.size <= self.low_watermark
+            if resumed:
+                self.paused = False
+
+        return completed, resumed
+
+    def clear(self):
+        with self.ready:
+            messages = [message for message, views in self.entries]
+            self.entries.clear()
+            self.size = 0
+            self.paused = False
+
+        return messages
+
+    def wait(self, timeout):
+        with self.ready:
+            if not self.entries:
+                self.ready.wait(timeout)
+
+        return self.peek()
+
+    def wake(self):
+        with self.ready:
+            self.ready.notify()